@@ -5,7 +5,7 @@ from alembic import context
 from app.core.config import settings
 from app.db.base import Base
 from app.api.v1.endpoints.user.models import User, OAuthAccount, UserProfile, Role, user_roles
-from app.api.v1.endpoints.tests.models import UserTest, UserTestCharLog
+from app.api.v1.endpoints.tests.models import UserTest, UserStats, UserTestRollup, UserCharStats
 import os
 from dotenv import load_dotenv
 
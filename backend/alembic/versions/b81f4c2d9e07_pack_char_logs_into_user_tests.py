@@ -0,0 +1,141 @@
+"""pack char logs into user tests
+
+Revision ID: b81f4c2d9e07
+Revises: 7d2e9a41c3b8
+Create Date: 2026-10-17 11:02:31.540718
+
+"""
+import logging
+import struct
+import uuid
+from itertools import groupby
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b81f4c2d9e07'
+down_revision: Union[str, None] = '7d2e9a41c3b8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Character log format 1 (see app/api/v1/endpoints/tests/codec.py), repeated here so
+# the migration does not change when the application codec does
+_HEADER = struct.Struct("<BxH")
+_BATCH = 1000
+# Longest char accepted by new submissions (schemas.MAX_CHAR_LOG_KEY_BYTES); the old
+# column had no limit, and format 1 cannot hold more than 255 bytes anyway
+_MAX_CHAR_BYTES = 32
+
+logger = logging.getLogger(f"alembic.{__name__}")
+
+user_tests = sa.table(
+    'user_tests',
+    sa.column('id', sa.String()),
+    sa.column('char_logs_packed', sa.LargeBinary()),
+)
+char_logs = sa.table(
+    'user_test_char_logs',
+    sa.column('id', sa.String()),
+    sa.column('test_id', sa.String()),
+    sa.column('char', sa.String()),
+    sa.column('attempts', sa.Integer()),
+    sa.column('errors', sa.Integer()),
+    sa.column('total_time', sa.Integer()),
+)
+
+
+def _pack(logs) -> bytes:
+    values = b"".join(struct.pack("<III", attempts, errors, total_time) for _, attempts, errors, total_time in logs)
+    chars = b"".join(bytes([len(char.encode("utf-8"))]) + char.encode("utf-8") for char, _, _, _ in logs)
+    return _HEADER.pack(1, len(logs)) + values + chars
+
+
+def _unpack(data: bytes):
+    _, count = _HEADER.unpack_from(data)
+    position = _HEADER.size + count * 12
+    logs = []
+    for i in range(count):
+        attempts, errors, total_time = struct.unpack_from("<III", data, _HEADER.size + i * 12)
+        length = data[position]
+        logs.append((data[position + 1:position + 1 + length].decode("utf-8"), attempts, errors, total_time))
+        position += 1 + length
+    return logs
+
+
+def upgrade() -> None:
+    op.add_column('user_tests', sa.Column('char_logs_packed', sa.LargeBinary(), nullable=True))
+
+    # Backfill: stream the logs ordered by test and write one packed value per test
+    connection = op.get_bind()
+    rows = connection.execution_options(stream_results=True, yield_per=_BATCH).execute(
+        sa.select(char_logs.c.test_id, char_logs.c.char, char_logs.c.attempts, char_logs.c.errors, char_logs.c.total_time)
+        .order_by(char_logs.c.test_id, char_logs.c.char)
+    )
+    update = user_tests.update().where(user_tests.c.id == sa.bindparam('test_id')).values(
+        char_logs_packed=sa.bindparam('packed')
+    )
+    batch = []
+    skipped = 0
+    for test_id, logs in groupby(rows, key=lambda row: row.test_id):
+        logs = [tuple(row)[1:] for row in logs]
+        kept = [log for log in logs if len(log[0].encode("utf-8")) <= _MAX_CHAR_BYTES]
+        if len(kept) < len(logs):
+            skipped += len(logs) - len(kept)
+            logger.warning(
+                f"Test {test_id}: skipped {len(logs) - len(kept)} character logs longer than {_MAX_CHAR_BYTES} bytes"
+            )
+        batch.append({'test_id': test_id, 'packed': _pack(kept)})
+        if len(batch) >= _BATCH:
+            connection.execute(update, batch)
+            batch = []
+    if batch:
+        connection.execute(update, batch)
+    if skipped:
+        logger.warning(f"Skipped {skipped} character logs in total; they are dropped with user_test_char_logs")
+
+    op.drop_index('ix_user_test_char_logs_test_char', table_name='user_test_char_logs')
+    op.drop_index(op.f('ix_user_test_char_logs_test_id'), table_name='user_test_char_logs')
+    op.drop_index(op.f('ix_user_test_char_logs_id'), table_name='user_test_char_logs')
+    op.drop_table('user_test_char_logs')
+
+
+def downgrade() -> None:
+    op.create_table('user_test_char_logs',
+    sa.Column('id', sa.String(), nullable=False),
+    sa.Column('test_id', sa.String(), nullable=False),
+    sa.Column('char', sa.String(), nullable=False),
+    sa.Column('attempts', sa.Integer(), nullable=False),
+    sa.Column('errors', sa.Integer(), nullable=False),
+    sa.Column('total_time', sa.Integer(), nullable=False),
+    sa.CheckConstraint('attempts >= 0', name='check_attempts_positive'),
+    sa.CheckConstraint('errors >= 0', name='check_errors_positive'),
+    sa.CheckConstraint('total_time >= 0', name='check_total_time_positive'),
+    sa.CheckConstraint('attempts >= errors', name='check_attempts_gte_errors'),
+    sa.ForeignKeyConstraint(['test_id'], ['user_tests.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_user_test_char_logs_id'), 'user_test_char_logs', ['id'], unique=False)
+    op.create_index(op.f('ix_user_test_char_logs_test_id'), 'user_test_char_logs', ['test_id'], unique=False)
+    op.create_index('ix_user_test_char_logs_test_char', 'user_test_char_logs', ['test_id', 'char'], unique=False)
+
+    connection = op.get_bind()
+    tests = connection.execute(
+        sa.select(user_tests.c.id, user_tests.c.char_logs_packed).where(user_tests.c.char_logs_packed.isnot(None))
+    ).fetchall()
+    batch = []
+    for test_id, packed in tests:
+        for char, attempts, errors, total_time in _unpack(packed):
+            batch.append({
+                'id': str(uuid.uuid4()), 'test_id': test_id, 'char': char,
+                'attempts': attempts, 'errors': errors, 'total_time': total_time
+            })
+        if len(batch) >= _BATCH:
+            connection.execute(char_logs.insert(), batch)
+            batch = []
+    if batch:
+        connection.execute(char_logs.insert(), batch)
+
+    op.drop_column('user_tests', 'char_logs_packed')
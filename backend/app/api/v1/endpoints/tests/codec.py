@@ -0,0 +1,271 @@
+"""
+Compact binary encodings of per-test data stored on user_tests.
+
+Character logs (user_tests.char_logs_packed), little-endian::
+
+    u8  format version (CHAR_LOG_FORMAT)
+    u8  reserved
+    u16 count
+    count x 3 u32   attempts, errors, total_time, one row per character
+    count x (u8 length, utf-8 bytes)   the characters, in the same order
+
+The integers come first and are fixed width, so aggregations read them as one NumPy
+array without touching the characters. A test with 100 logged characters takes about
+1.3 KB, against one ~250 byte row (with its three index entries) per character in the
+former user_test_char_logs table.
+
+Keystroke streams (user_tests.keystrokes) are zlib-compressed (RFC 1950, what the
+browser's CompressionStream("deflate") produces); decompressed::
+
+    u8      format version (KEYSTROKE_FORMAT)
+    varint  event count n
+    varint  key count k (at most 256)
+    k x (u8 length, utf-8 bytes)   the distinct keys
+    n x u8  index of each event's key in the table above
+    ceil(n / 8) bytes   correct flags, one bit per event, most significant bit first
+    n x u8  bits 0-7 of each event's delta_ms
+    n x u8  bits 8-15 of each event's delta_ms
+    varint  delta_ms of each event whose 16 bit delta reads 0xFFFF, in order
+
+delta_ms is the time since the previous keystroke, the key the character that was
+expected and `correct` whether it was typed. Varints are unsigned LEB128. Each column
+is stored whole, and the deltas split into byte planes, so zlib models the text, the
+mostly-set error bits and the slowly varying high bytes separately. The size budget
+is under 2 bytes per keystroke for typical streams (see benchmarks/keystrokes.py):
+about one byte for the timing, which barely compresses, and the rest for the text.
+Submissions are refused above TEST_KEYSTROKES_BYTES_PER_EVENT bytes per keystroke
+(plus TEST_KEYSTROKES_BASE_BYTES). The blob is stored as submitted.
+"""
+import struct
+import zlib
+from typing import List, NamedTuple, Sequence, Tuple
+
+import numpy as np
+
+CHAR_LOG_FORMAT = 1
+MAX_CHAR_LOGS = 0xFFFF
+MAX_CHAR_BYTES = 0xFF  # UTF-8 length of one logged character
+MAX_CHAR_LOG_VALUE = 0xFFFFFFFF
+
+KEYSTROKE_FORMAT = 1
+MAX_KEYSTROKE_KEYS = 256
+
+_HEADER = struct.Struct("<BxH")
+_VALUES = np.dtype("<u4")
+_MAX_VARINT_BYTES = 5
+_DELTA_ESCAPE = 0xFFFF
+
+# (char, attempts, errors, total_time)
+CharLog = Tuple[str, int, int, int]
+
+
+class Keystrokes(NamedTuple):
+    """A decoded keystroke stream, one array element per event."""
+    keys: List[str]  # Distinct keys; key_index points into this list
+    key_index: np.ndarray  # uint8
+    delta_ms: np.ndarray  # uint32, time since the previous keystroke
+    correct: np.ndarray  # bool
+
+
+class CodecError(ValueError):
+    """Raised when packed data is corrupt or of an unsupported format version."""
+
+
+def pack_char_logs(logs: Sequence[CharLog]) -> bytes:
+    """
+    Encode a test's character logs.
+
+    :raises ValueError: If there are more than MAX_CHAR_LOGS logs, a value does not fit
+        in 32 bits or a character is longer than 255 bytes
+    """
+    if len(logs) > MAX_CHAR_LOGS:
+        raise ValueError(f"At most {MAX_CHAR_LOGS} character logs can be packed, got {len(logs)}")
+    values = np.array([log[1:] for log in logs], dtype=np.int64).reshape(len(logs), 3)
+    if values.size and (values.min() < 0 or values.max() > MAX_CHAR_LOG_VALUE):
+        raise ValueError("Character log values must fit in 32 unsigned bits")
+    chars = bytearray()
+    for log in logs:
+        encoded = log[0].encode("utf-8")
+        if len(encoded) > MAX_CHAR_BYTES:
+            raise ValueError(f"Character {log[0][:16]!r}... is too long to pack")
+        chars.append(len(encoded))
+        chars += encoded
+    return _HEADER.pack(CHAR_LOG_FORMAT, len(logs)) + values.astype(_VALUES).tobytes() + bytes(chars)
+
+
+def _read_header(data: bytes) -> int:
+    if len(data) < _HEADER.size:
+        raise CodecError("Packed character logs are truncated")
+    version, count = _HEADER.unpack_from(data)
+    if version != CHAR_LOG_FORMAT:
+        raise CodecError(f"Unsupported character log format {version}")
+    if len(data) < _HEADER.size + count * 3 * _VALUES.itemsize:
+        raise CodecError("Packed character logs are truncated")
+    return count
+
+
+def char_log_values(data: bytes) -> np.ndarray:
+    """
+    The (count, 3) uint32 array of attempts, errors and total time, without decoding
+    the characters. The array is a read-only view of `data`.
+    """
+    count = _read_header(data)
+    return np.frombuffer(data, dtype=_VALUES, count=count * 3, offset=_HEADER.size).reshape(count, 3)
+
+
+def char_log_chars(data: bytes) -> List[str]:
+    """The logged characters, in the order of char_log_values."""
+    count = _read_header(data)
+    view = memoryview(data)
+    position = _HEADER.size + count * 3 * _VALUES.itemsize
+    chars = []
+    try:
+        for _ in range(count):
+            length = view[position]
+            if position + 1 + length > len(view):
+                raise CodecError("Packed character logs are truncated")
+            chars.append(bytes(view[position + 1:position + 1 + length]).decode("utf-8"))
+            position += 1 + length
+    except (IndexError, UnicodeDecodeError):
+        raise CodecError("Packed character logs are corrupt")
+    return chars
+
+
+def unpack_char_logs(data: bytes) -> List[CharLog]:
+    """Decode a test's character logs as (char, attempts, errors, total_time) tuples."""
+    values = char_log_values(data).tolist()
+    return [(char, *row) for char, row in zip(char_log_chars(data), values)]
+
+
+def char_log_id(test_id: str, index: int) -> str:
+    """Packed logs have no ids of their own; this one is stable for the test's lifetime."""
+    return f"{test_id}-{index}"
+
+
+def _encode_varint(value: int) -> bytes:
+    out = bytearray()
+    while value >= 0x80:
+        out.append(value & 0x7F | 0x80)
+        value >>= 7
+    out.append(value)
+    return bytes(out)
+
+
+def _read_varint(view: memoryview, position: int) -> Tuple[int, int]:
+    value = 0
+    for i in range(_MAX_VARINT_BYTES):
+        byte = view[position + i]
+        value |= (byte & 0x7F) << (7 * i)
+        if byte < 0x80:
+            return value, position + i + 1
+    raise CodecError("Keystroke stream is corrupt")
+
+
+def encode_keystrokes(keys: Sequence[str], delta_ms: Sequence[int], correct: Sequence[bool]) -> bytes:
+    """
+    Encode and compress a keystroke stream, as a client would.
+
+    :param keys: Expected character of each keystroke
+    :param delta_ms: Milliseconds since the previous keystroke (0 for the first)
+    :param correct: Whether each keystroke typed the expected character
+    :raises ValueError: If the sequences differ in length, there are more than
+        MAX_KEYSTROKE_KEYS distinct keys or a delta is negative or does not fit in 32 bits
+    """
+    if not len(keys) == len(delta_ms) == len(correct):
+        raise ValueError("keys, delta_ms and correct must have the same length")
+    table: dict = {}
+    key_index = [table.setdefault(key, len(table)) for key in keys]
+    if len(table) > MAX_KEYSTROKE_KEYS:
+        raise ValueError(f"At most {MAX_KEYSTROKE_KEYS} distinct keys can be encoded, got {len(table)}")
+    deltas = np.asarray(delta_ms, dtype=np.int64)
+    if deltas.size and (deltas.min() < 0 or deltas.max() > 0xFFFFFFFF):
+        raise ValueError("Keystroke deltas must fit in 32 unsigned bits")
+    out = bytearray([KEYSTROKE_FORMAT])
+    out += _encode_varint(len(keys)) + _encode_varint(len(table))
+    for key in table:
+        encoded = key.encode("utf-8")
+        if len(encoded) > 0xFF:
+            raise ValueError(f"Key {key[:16]!r}... is too long to encode")
+        out.append(len(encoded))
+        out += encoded
+    planes = np.minimum(deltas, _DELTA_ESCAPE)
+    out += np.array(key_index, dtype=np.uint8).tobytes()
+    out += np.packbits(np.asarray(correct, dtype=bool)).tobytes()
+    out += (planes & 0xFF).astype(np.uint8).tobytes() + (planes >> 8).astype(np.uint8).tobytes()
+    for delta in deltas[planes == _DELTA_ESCAPE].tolist():
+        out += _encode_varint(delta)
+    return zlib.compress(bytes(out), 9)
+
+
+def decode_keystrokes(data: bytes, max_events: int) -> Keystrokes:
+    """
+    Decompress and decode a keystroke stream. Decompression stops at the largest size
+    `max_events` events can take, so a small blob cannot inflate without bound. The
+    columns are read as NumPy views of the decompressed buffer, without copying it.
+
+    :raises CodecError: If the stream is corrupt, of an unsupported format version or
+        has more than `max_events` events
+    """
+    inflater = zlib.decompressobj()
+    limit = 1 + 2 * _MAX_VARINT_BYTES + MAX_KEYSTROKE_KEYS * 256 + max_events * (4 + _MAX_VARINT_BYTES)
+    try:
+        raw = inflater.decompress(data, limit)
+    except zlib.error:
+        raise CodecError("Keystroke stream is not valid zlib data")
+    if inflater.unconsumed_tail:
+        raise CodecError("Keystroke stream is too large")
+    if not inflater.eof:
+        raise CodecError("Keystroke stream is truncated")
+    if inflater.unused_data:
+        raise CodecError("Keystroke stream is corrupt")
+    view = memoryview(raw)
+    try:
+        if view[0] != KEYSTROKE_FORMAT:
+            raise CodecError(f"Unsupported keystroke format {view[0]}")
+        count, position = _read_varint(view, 1)
+        key_count, position = _read_varint(view, position)
+        if count > max_events:
+            raise CodecError(f"Keystroke stream has {count} events, at most {max_events} are allowed")
+        if key_count > MAX_KEYSTROKE_KEYS:
+            raise CodecError(f"Keystroke stream has {key_count} distinct keys, at most {MAX_KEYSTROKE_KEYS} are allowed")
+        keys = []
+        for _ in range(key_count):
+            length = view[position]
+            keys.append(bytes(view[position + 1:position + 1 + length]).decode("utf-8"))
+            position += 1 + length
+    except (IndexError, UnicodeDecodeError):
+        raise CodecError("Keystroke stream is corrupt")
+    flag_bytes = (count + 7) // 8
+    if len(view) < position + 3 * count + flag_bytes:
+        raise CodecError("Keystroke stream is truncated")
+    key_index = np.frombuffer(view, dtype=np.uint8, count=count, offset=position)
+    position += count
+    correct = np.unpackbits(np.frombuffer(view, dtype=np.uint8, count=flag_bytes, offset=position), count=count)
+    position += flag_bytes
+    delta_ms = np.frombuffer(view, dtype=np.uint8, count=count, offset=position).astype(np.uint32)
+    delta_ms |= np.frombuffer(view, dtype=np.uint8, count=count, offset=position + count).astype(np.uint32) << 8
+    position += 2 * count
+    try:
+        for i in np.flatnonzero(delta_ms == _DELTA_ESCAPE).tolist():
+            delta_ms[i], position = _read_varint(view, position)
+    except (IndexError, OverflowError):
+        raise CodecError("Keystroke stream is corrupt")
+    if position != len(view) or (count and key_index.max() >= key_count):
+        raise CodecError("Keystroke stream is corrupt")
+    return Keystrokes(keys=keys, key_index=key_index, delta_ms=delta_ms, correct=correct.astype(bool))
+
+
+def keystroke_char_logs(keystrokes: Keystrokes) -> List[CharLog]:
+    """
+    Aggregate a keystroke stream into per-character logs the way the client does:
+    every keystroke is an attempt at its key, incorrect ones are errors and the deltas
+    add up to the key's total time.
+    """
+    key_count = len(keystrokes.keys)
+    attempts = np.bincount(keystrokes.key_index, minlength=key_count)
+    errors = np.bincount(keystrokes.key_index[~keystrokes.correct], minlength=key_count)
+    total_time = np.bincount(keystrokes.key_index, weights=keystrokes.delta_ms, minlength=key_count)
+    return [
+        (key, int(attempts[i]), int(errors[i]), int(total_time[i]))
+        for i, key in enumerate(keystrokes.keys) if attempts[i]
+    ]
@@ -0,0 +1,78 @@
+"""
+Time-ordered test ids and the idempotency cache of test submissions.
+
+Test ids are UUIDv7 (RFC 9562): a millisecond timestamp followed by random bits, so
+new rows land at the right-hand edge of the primary key index instead of at random
+pages of it. Clients may generate the id themselves and send it with the result;
+retrying a submission with the same id then saves it only once.
+"""
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+from app.core.config import settings
+from app.api.v1.endpoints.tests import schemas
+
+_lock = threading.Lock()
+_last_ms = 0
+_sequence = 0
+
+
+def uuid7() -> str:
+    """
+    A new UUIDv7. Within a millisecond, the 12 bits after the timestamp are a counter
+    started at a random value, so the ids of one process sort in creation order.
+    """
+    global _last_ms, _sequence
+    with _lock:
+        ms = time.time_ns() // 1_000_000
+        if ms > _last_ms:
+            _last_ms = ms
+            _sequence = int.from_bytes(os.urandom(2), "big") & 0x7FF
+        else:
+            _sequence += 1
+            if _sequence > 0xFFF:  # Counter exhausted: borrow the next millisecond
+                _last_ms += 1
+                _sequence = 0
+        ms, sequence = _last_ms, _sequence
+    value = (ms & 0xFFFFFFFFFFFF) << 80 | 0x7 << 76 | sequence << 64
+    value |= 0b10 << 62 | int.from_bytes(os.urandom(8), "big") & 0x3FFFFFFFFFFFFFFF
+    return str(uuid.UUID(int=value))
+
+
+class IdempotencyCache:
+    """
+    Most recently saved tests by (user id, test id), so that a retried submission is
+    answered without touching the database. A miss is not an error: the insert
+    ignores ids that already exist and the stored test is returned instead.
+    """
+
+    def __init__(self, capacity: int) -> None:
+        """:param capacity: Most tests kept, least recently used ones are evicted first"""
+        self.capacity = capacity
+        self._tests: "OrderedDict[Tuple[str, str], schemas.UserTestRead]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, user_id: str, test_id: str) -> Optional[schemas.UserTestRead]:
+        with self._lock:
+            test = self._tests.get((user_id, test_id))
+            if test is not None:
+                self._tests.move_to_end((user_id, test_id))
+            return test
+
+    def discard(self, user_id: str, test_id: str) -> None:
+        with self._lock:
+            self._tests.pop((user_id, test_id), None)
+
+    def put(self, test: schemas.UserTestRead) -> None:
+        with self._lock:
+            self._tests[(test.user_id, test.id)] = test
+            self._tests.move_to_end((test.user_id, test.id))
+            while len(self._tests) > self.capacity:
+                self._tests.popitem(last=False)
+
+
+idempotency_cache = IdempotencyCache(settings.TEST_IDEMPOTENCY_CACHE_SIZE)
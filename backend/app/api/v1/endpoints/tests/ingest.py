@@ -0,0 +1,348 @@
+"""
+Write-behind ingestion of typing results.
+
+With TEST_INGEST_WRITE_BEHIND enabled, POST /tests/me/typing does not write to the
+database. The validated result gets its id and timestamp and is appended to a local
+journal file (fsynced). It then goes into a bounded in-memory queue, and the request
+returns 202. A background writer thread drains the queue in batches of up to
+TEST_INGEST_BATCH_SIZE results, or every TEST_INGEST_FLUSH_INTERVAL seconds. Each
+batch is one transaction (see UserTestRepository.insert_tests). Submission latency is
+therefore the cost of a local append, however slow the database is.
+
+Durability: after every committed batch the journal is rewritten to hold only the
+results still waiting, so it stays as small as the queue. A journal is always created
+under a temporary name, locked, synced and only then renamed into place, so no other
+process can mistake it for the journal of a dead one. On startup the writer replays journals left behind by processes that died, skipping
+tests that were committed before the crash. Each process writes its own journal and
+holds an advisory lock on it while alive.
+"""
+import glob
+import json
+import logging
+import os
+import threading
+import time
+from collections import deque
+from datetime import datetime, UTC
+from typing import Any, BinaryIO, Callable, Deque, Dict, List, Optional, Sequence, Tuple
+from uuid import uuid4
+
+import numpy as np
+from pydantic import ValidationError
+from sqlalchemy.exc import DataError, IntegrityError
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.api.v1.endpoints.tests import schemas
+from app.api.v1.endpoints.tests.repository import UserTestRepository
+from app.api.v1.endpoints.tests.ids import uuid7
+
+try:
+    import fcntl
+except ImportError:  # Windows: journals of live processes cannot be told apart, run one process
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+JOURNAL_PATTERN = "tests-*.jsonl"
+
+# (test id, user id, test)
+Entry = Tuple[str, str, schemas.UserTestCreate]
+
+
+class IngestQueueFull(Exception):
+    """Raised when the ingestion queue is at capacity and cannot accept another result."""
+
+
+class IngestQueue:
+    """
+    Bounded queue of validated test results, journaled to disk and written to the
+    database in batches by a background thread.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session],
+        spill_dir: str,
+        capacity: int = 10000,
+        batch_size: int = 200,
+        flush_interval: float = 0.5,
+        retry_interval: float = 1.0,
+    ) -> None:
+        """
+        :param session_factory: Callable returning a new database session
+        :param spill_dir: Directory of the journal files
+        :param capacity: Most results waiting to be written; beyond it submissions are refused
+        :param batch_size: Most results written per transaction
+        :param flush_interval: Longest time a result waits for its batch to fill up, in seconds
+        :param retry_interval: Pause after a failed write before retrying, in seconds
+        """
+        self.session_factory = session_factory
+        self.spill_dir = spill_dir
+        self.capacity = capacity
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.retry_interval = retry_interval
+        self.accepted = 0
+        self.rejected = 0
+        self.flushed = 0
+        self.dropped = 0
+        self.duplicates = 0
+        self.batches = 0
+        self.failures = 0
+        self.last_error: Optional[str] = None
+        self._pending: Deque[Entry] = deque()
+        self._pending_lines: Deque[bytes] = deque()  # Journal line of each pending entry
+        self._flush_ms: Deque[float] = deque(maxlen=256)
+        self._lock = threading.Lock()
+        self._wakeup = threading.Condition(self._lock)
+        self._stop = threading.Event()
+        self._journal: Optional[BinaryIO] = None
+        self._journal_path: Optional[str] = None
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def running(self) -> bool:
+        """True while submissions are accepted."""
+        return self._thread is not None and not self._stop.is_set()
+
+    def start(self) -> None:
+        """Open this process's journal and start the writer thread."""
+        os.makedirs(self.spill_dir, exist_ok=True)
+        self._journal_path = os.path.join(self.spill_dir, f"tests-{os.getpid()}-{uuid4().hex[:8]}.jsonl")
+        self._journal = self._create_journal([])
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="test-ingest-writer", daemon=True)
+        self._thread.start()
+        logger.info(f"Write-behind test ingestion journaling to {self._journal_path}")
+
+    def stop(self, timeout: Optional[float] = 30.0) -> None:
+        """
+        Stop accepting results and write what is queued. Whatever cannot be written
+        (e.g. the database is down) stays in the journal for the next start, as does
+        the journal of a writer that is still busy after `timeout`.
+        """
+        if self._thread is None:
+            return
+        with self._lock:
+            self._stop.set()
+            self._wakeup.notify()
+        self._thread.join(timeout)
+        if self._thread.is_alive():
+            # Still writing: leave the journal open for it. It is replayed on the next
+            # start if the process exits first.
+            logger.warning(f"Test ingestion writer did not stop within {timeout}s; keeping {self._journal_path}")
+            return
+        self._thread = None
+        with self._lock:
+            journal, self._journal = self._journal, None
+            empty = os.fstat(journal.fileno()).st_size == 0
+            journal.close()
+        if empty:
+            os.remove(self._journal_path)
+
+    def _create_journal(self, lines: Sequence[bytes]) -> BinaryIO:
+        """
+        Write `lines` to a new journal and move it to this process's journal path. The
+        file is locked and synced under a temporary name that other processes do not
+        replay, so it can never be taken for the journal of a dead process.
+        """
+        temporary_path = f"{self._journal_path}.tmp"
+        journal = open(temporary_path, "wb")
+        try:
+            if fcntl is not None:
+                fcntl.flock(journal, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            journal.writelines(lines)
+            journal.flush()
+            os.fsync(journal.fileno())
+            os.replace(temporary_path, self._journal_path)
+        except BaseException:
+            journal.close()
+            os.remove(temporary_path)
+            raise
+        return journal
+
+    def _compact_journal(self) -> None:
+        """Drop committed results from the journal. Called with the lock held."""
+        if not self._pending_lines:
+            self._journal.truncate(0)
+            return
+        journal, self._journal = self._journal, self._create_journal(self._pending_lines)
+        journal.close()
+
+    def submit(self, user_id: str, test: schemas.UserTestCreate) -> str:
+        """
+        Journal a result and queue it for writing.
+
+        :return: The id the test will be stored under
+        :raises IngestQueueFull: If `capacity` results are already waiting
+        """
+        test_id = test.id or uuid7()
+        if test.timestamp is None:
+            test = test.model_copy(update={"timestamp": datetime.now(UTC)})
+        line = (json.dumps({"id": test_id, "user_id": user_id, "test": test.model_dump(mode="json")}) + "\n").encode("utf-8")
+        with self._lock:
+            if not self.running:
+                raise RuntimeError("The ingestion queue is not running")
+            if len(self._pending) >= self.capacity:
+                self.rejected += 1
+                raise IngestQueueFull(f"{len(self._pending)} results are waiting to be saved; retry shortly.")
+            journal = self._journal
+            journal.write(line)
+            journal.flush()
+            self._pending.append((test_id, user_id, test))
+            self._pending_lines.append(line)
+            self.accepted += 1
+            if len(self._pending) >= self.batch_size:
+                self._wakeup.notify()
+        # Outside the lock, so concurrent submissions share the disk flush
+        try:
+            os.fsync(journal.fileno())
+        except (OSError, ValueError):
+            pass  # Compacted meanwhile; the new journal was synced with this line in it
+        return test_id
+
+    def stats(self) -> Dict[str, Any]:
+        """Queue depth, counters and recent flush latencies."""
+        with self._lock:
+            flush_ms = list(self._flush_ms)
+            stats = {
+                "running": self.running,
+                "depth": len(self._pending),
+                "capacity": self.capacity,
+                "accepted": self.accepted,
+                "rejected": self.rejected,
+                "flushed": self.flushed,
+                "dropped": self.dropped,
+                "duplicates": self.duplicates,
+                "batches": self.batches,
+                "failures": self.failures,
+                "last_error": self.last_error,
+            }
+        if flush_ms:
+            p50, p95 = np.percentile(flush_ms, [50, 95])
+            stats["flush_ms"] = {"last": flush_ms[-1], "p50": float(p50), "p95": float(p95), "max": max(flush_ms)}
+        else:
+            stats["flush_ms"] = None
+        return stats
+
+    def _run(self) -> None:
+        try:
+            self._replay_journals()
+            while True:
+                with self._lock:
+                    deadline = time.monotonic() + self.flush_interval
+                    while not self._stop.is_set() and len(self._pending) < self.batch_size:
+                        remaining = deadline - time.monotonic()
+                        if remaining <= 0:
+                            break
+                        self._wakeup.wait(remaining)
+                    size = min(self.batch_size, len(self._pending))
+                    batch = [self._pending.popleft() for _ in range(size)]
+                    for _ in range(size):
+                        self._pending_lines.popleft()
+                if not batch:
+                    if self._stop.is_set():
+                        return
+                    continue
+                if not self._flush(batch):
+                    return  # Stopped; the batch is still in the journal
+        except Exception:
+            # Submissions fall back to synchronous writes; the journal is replayed on restart
+            self._stop.set()
+            logger.exception("Test ingestion writer stopped")
+
+    def _flush(self, batch: List[Entry]) -> bool:
+        """Write a batch, then compact the journal down to the results still waiting."""
+        started = time.perf_counter()
+        if not self._write(batch):
+            return False
+        with self._lock:
+            self.flushed += len(batch)
+            self.batches += 1
+            self._flush_ms.append((time.perf_counter() - started) * 1000)
+            self._compact_journal()
+        return True
+
+    def _write(self, entries: Sequence[Entry]) -> bool:
+        """
+        Insert `entries` in one transaction, retrying until it succeeds. Results whose
+        id is already stored (retried submissions) are skipped. Results the database
+        rejects as invalid (e.g. their user was deleted meanwhile) are isolated by
+        splitting the batch and dropped. Any other failure, from the database being
+        down to a bug, is retried: the results stay queued and journaled.
+
+        :return: False if the queue was stopped before the entries could be written
+        """
+        while True:
+            try:
+                with self.session_factory() as db:
+                    created = UserTestRepository(db).insert_tests(entries)
+                with self._lock:
+                    self.duplicates += created.count(None)
+                return True
+            except (IntegrityError, DataError) as e:
+                return self._isolate(entries, e.orig)
+            except Exception as e:
+                with self._lock:
+                    self.failures += 1
+                    self.last_error = str(e)
+                logger.warning(f"Writing {len(entries)} queued tests failed, retrying: {e!r}")
+                if self._stop.wait(self.retry_interval):
+                    return False
+
+    def _isolate(self, entries: Sequence[Entry], error: Exception) -> bool:
+        """Drop a single result the database rejected, or split the batch to find it."""
+        if len(entries) == 1:
+            with self._lock:
+                self.dropped += 1
+            logger.error(f"Dropped test {entries[0][0]} of user {entries[0][1]}: {error!r}")
+            return True
+        middle = len(entries) // 2
+        return self._write(entries[:middle]) and self._write(entries[middle:])
+
+    def _replay_journals(self) -> None:
+        """Write the results of journals no live process holds, then delete them."""
+        for path in sorted(glob.glob(os.path.join(self.spill_dir, JOURNAL_PATTERN))):
+            if path == self._journal_path:
+                continue
+            with open(path, "rb") as journal:
+                if fcntl is not None:
+                    try:
+                        fcntl.flock(journal, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                    except OSError:
+                        continue  # Owned by a live process
+                entries = self._read_journal(journal, path)
+                for start in range(0, len(entries), self.batch_size):
+                    batch = entries[start:start + self.batch_size]
+                    with self.session_factory() as db:
+                        existing = UserTestRepository(db).get_existing_test_ids([test_id for test_id, _, _ in batch])
+                    batch = [entry for entry in batch if entry[0] not in existing]
+                    if batch and not self._write(batch):
+                        return
+                    with self._lock:
+                        self.flushed += len(batch)
+            os.remove(path)
+            logger.info(f"Replayed {len(entries)} journaled tests from {path}")
+
+    @staticmethod
+    def _read_journal(journal: BinaryIO, path: str) -> List[Entry]:
+        entries = []
+        for number, line in enumerate(journal, 1):
+            try:
+                record = json.loads(line)
+                entries.append((record["id"], record["user_id"], schemas.UserTestCreate.model_validate(record["test"], context={"journaled": True})))
+            except (ValueError, KeyError, ValidationError):
+                # A torn last line from a crash mid-write; it was never acknowledged
+                logger.warning(f"Skipping unreadable line {number} of {path}")
+        return entries
+
+
+ingest_queue = IngestQueue(
+    SessionLocal,
+    spill_dir=settings.TEST_INGEST_SPILL_DIR,
+    capacity=settings.TEST_INGEST_QUEUE_SIZE,
+    batch_size=settings.TEST_INGEST_BATCH_SIZE,
+    flush_interval=settings.TEST_INGEST_FLUSH_INTERVAL
+)
@@ -0,0 +1,103 @@
+"""
+Server-side typing metrics, computed from keystroke streams (see codec.decode_keystrokes).
+
+For a stream whose keystrokes are `elapsed` milliseconds apart from the start of the
+test to the last keystroke (the sum of its deltas):
+
+- raw wpm: keystrokes / 5 per minute of `elapsed`
+- wpm: correct keystrokes / 5 per minute, i.e. raw wpm scaled by accuracy, as the client computes it
+- accuracy: percentage of keystrokes that were correct
+- per-second series: raw wpm and wpm within each second of the test. A trailing partial
+  second is scaled to a full second when it lasts at least half a second, and left out
+  of the series (not of the totals) otherwise.
+- consistency: 100 * (1 - coefficient of variation of the raw wpm series), clipped to
+  0-100; tests shorter than two seconds are fully consistent
+
+compute_metrics_batch works on any number of streams at once: they are concatenated
+and every quantity is a single vectorized pass (cumsum, bincount) over all keystrokes,
+so recomputing historical tests costs one NumPy call per batch rather than a Python
+loop per keystroke.
+"""
+from typing import List, NamedTuple, Sequence
+
+import numpy as np
+
+from app.api.v1.endpoints.tests.codec import Keystrokes
+
+CHARS_PER_WORD = 5
+MIN_PARTIAL_SECOND_MS = 500  # Shortest trailing partial second kept in the per-second series
+
+
+class TestMetrics(NamedTuple):
+    wpm: float
+    raw_wpm: float
+    accuracy: float
+    consistency: float
+    wpm_series: np.ndarray  # float64, one value per second
+    raw_wpm_series: np.ndarray
+
+
+def compute_metrics(keystrokes: Keystrokes) -> TestMetrics:
+    """Metrics of one keystroke stream."""
+    return compute_metrics_batch([keystrokes])[0]
+
+
+def compute_metrics_batch(streams: Sequence[Keystrokes]) -> List[TestMetrics]:
+    """Metrics of several keystroke streams, computed together; in input order."""
+    n = len(streams)
+    if not n:
+        return []
+    lengths = np.array([len(stream.delta_ms) for stream in streams], dtype=np.int64)
+    test = np.repeat(np.arange(n), lengths)
+    correct = np.concatenate([stream.correct for stream in streams]).astype(bool)
+    ends = np.cumsum(lengths)
+    starts = ends - lengths
+
+    # Time of each keystroke from the start of its own test
+    times = np.cumsum(np.concatenate([stream.delta_ms for stream in streams]).astype(np.int64))
+    times -= np.concatenate([[0], times])[starts][test]
+    elapsed = np.zeros(n, dtype=np.int64)
+    has_keystrokes = lengths > 0
+    elapsed[has_keystrokes] = times[ends[has_keystrokes] - 1]
+
+    correct_counts = np.bincount(test[correct], minlength=n)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        words_per_ms = np.where(elapsed > 0, 60000 / (CHARS_PER_WORD * elapsed), 0.0)
+        accuracy = np.where(has_keystrokes, correct_counts * 100 / lengths, 0.0)
+    raw_wpm = lengths * words_per_ms
+    wpm = correct_counts * words_per_ms
+
+    # Per-second series: one bucket per whole second, plus a long enough partial one
+    full_seconds, partial_ms = np.divmod(elapsed, 1000)
+    keep_partial = partial_ms >= MIN_PARTIAL_SECOND_MS
+    seconds = full_seconds + keep_partial
+    offsets = np.cumsum(seconds) - seconds
+    second = times // 1000
+    in_series = second < seconds[test]
+    bucket = offsets[test[in_series]] + second[in_series]
+    total_seconds = int(seconds.sum())
+    scale = np.full(total_seconds, 60 / CHARS_PER_WORD)
+    scale[(offsets + full_seconds)[keep_partial]] *= 1000 / partial_ms[keep_partial]
+    raw_series = np.bincount(bucket, minlength=total_seconds) * scale
+    wpm_series = np.bincount(bucket[correct[in_series]], minlength=total_seconds) * scale
+
+    # Coefficient of variation of each test's raw series
+    owner = np.repeat(np.arange(n), seconds)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        mean = np.bincount(owner, raw_series, minlength=n) / seconds
+        variance = np.bincount(owner, raw_series ** 2, minlength=n) / seconds - mean ** 2
+        cv = np.where((seconds >= 2) & (mean > 0), np.sqrt(np.maximum(variance, 0)) / mean, 0.0)
+    consistency = np.clip(100 * (1 - cv), 0, 100)
+
+    raw_series_split = np.split(raw_series, offsets[1:])
+    wpm_series_split = np.split(wpm_series, offsets[1:])
+    return [
+        TestMetrics(
+            wpm=float(wpm[i]),
+            raw_wpm=float(raw_wpm[i]),
+            accuracy=float(accuracy[i]),
+            consistency=float(consistency[i]),
+            wpm_series=wpm_series_split[i],
+            raw_wpm_series=raw_series_split[i]
+        ) for i in range(n)
+    ]
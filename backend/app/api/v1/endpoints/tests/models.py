@@ -1,22 +1,24 @@
-from sqlalchemy import Column, String, Float, Integer, DateTime, ForeignKey, JSON, CheckConstraint, Index
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, String, Float, Integer, BigInteger, Date, DateTime, ForeignKey, JSON, CheckConstraint, LargeBinary, Index
+from sqlalchemy.orm import deferred
 from datetime import datetime, UTC
 from app.db.base import Base
 
 class UserTest(Base):
     __tablename__ = "user_tests"
     id = Column(String, primary_key=True, index=True)
-    user_id = Column(String, ForeignKey("users.id"), nullable=False, index=True)
+    user_id = Column(String, ForeignKey("users.id"), nullable=False)  # Indexed by ix_user_tests_user_timestamp
     wpm = Column(Float, nullable=False)
     raw_wpm = Column(Float, nullable=False) 
     accuracy = Column(Float, nullable=False)
     consistency = Column(Float, nullable=False) 
     test_type = Column(String, nullable=False)
+    language = Column(String, nullable=False, default="english", server_default="english", index=True)
     duration = Column(Integer, nullable=False)
-    timestamp = Column(DateTime, default=lambda: datetime.now(UTC), index=True)
+    timestamp = Column(DateTime, nullable=False, default=lambda: datetime.now(UTC), index=True)
     chars = Column(JSON, nullable=False)  
     restarts = Column(Integer, nullable=False, default=0)  
-    char_logs = relationship("UserTestCharLog", back_populates="test", cascade="all, delete-orphan")
+    char_logs_packed = Column(LargeBinary, nullable=True)  # Per-character logs, see codec.pack_char_logs
+    keystrokes = deferred(Column(LargeBinary, nullable=True))  # Compressed keystroke stream, see codec.decode_keystrokes
 
     # Add constraints
     __table_args__ = (
@@ -26,23 +28,86 @@ class UserTest(Base):
         CheckConstraint('consistency >= 0 AND consistency <= 100', name='check_consistency_range'),
         CheckConstraint('duration > 0', name='check_duration_positive'),
         CheckConstraint('restarts >= 0', name='check_restarts_positive'),
+        # History pages, newest first: on PostgreSQL the summary columns are included so
+        # a page is read from the index alone
+        Index(
+            'ix_user_tests_user_timestamp', 'user_id', timestamp.desc(), id.desc(),
+            postgresql_include=[
+                'wpm', 'raw_wpm', 'accuracy', 'consistency', 'test_type', 'language', 'duration', 'chars', 'restarts'
+            ]
+        ),
     )
 
-class UserTestCharLog(Base):
-    __tablename__ = "user_test_char_logs"
-    id = Column(String, primary_key=True, index=True)
-    test_id = Column(String, ForeignKey("user_tests.id"), nullable=False, index=True)
-    char = Column(String, nullable=False)
-    attempts = Column(Integer, nullable=False)
-    errors = Column(Integer, nullable=False)
-    total_time = Column(Integer, nullable=False)  # ms
-    test = relationship("UserTest", back_populates="char_logs") 
-
-    # Add constraints and indexes
+
+class UserStats(Base):
+    """
+    Running totals of a user's tests per test type and duration, updated in the same
+    transaction as every insert and delete of user_tests, so per-user statistics are
+    a single row lookup however long the history.
+    """
+    __tablename__ = "user_stats"
+    user_id = Column(String, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    test_type = Column(String, primary_key=True)
+    duration = Column(Integer, primary_key=True)
+    test_count = Column(Integer, nullable=False, default=0)
+    wpm_sum = Column(Float, nullable=False, default=0)
+    wpm_sq_sum = Column(Float, nullable=False, default=0)  # For the standard deviation
+    raw_wpm_sum = Column(Float, nullable=False, default=0)
+    accuracy_sum = Column(Float, nullable=False, default=0)
+    consistency_sum = Column(Float, nullable=False, default=0)
+    best_wpm = Column(Float, nullable=False, default=0)
+    last_test_at = Column(DateTime, nullable=True)
+
+    __table_args__ = (
+        CheckConstraint('test_count > 0', name='check_test_count_positive'),
+    )
+
+
+class UserTestRollup(Base):
+    """
+    Totals of a user's tests per day or week (UTC, weeks starting on Monday), test type
+    and duration, maintained like UserStats. Progress charts read these buckets instead
+    of the tests, a few hundred rows for years of history.
+    """
+    __tablename__ = "user_test_rollups"
+    user_id = Column(String, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    granularity = Column(String, primary_key=True)  # "day" or "week"
+    bucket_start = Column(Date, primary_key=True)  # The day, or the Monday of the week
+    test_type = Column(String, primary_key=True)
+    duration = Column(Integer, primary_key=True)
+    test_count = Column(Integer, nullable=False, default=0)
+    wpm_sum = Column(Float, nullable=False, default=0)
+    best_wpm = Column(Float, nullable=False, default=0)
+    accuracy_sum = Column(Float, nullable=False, default=0)
+    consistency_sum = Column(Float, nullable=False, default=0)
+
     __table_args__ = (
-        CheckConstraint('attempts >= 0', name='check_attempts_positive'),
-        CheckConstraint('errors >= 0', name='check_errors_positive'),
-        CheckConstraint('total_time >= 0', name='check_total_time_positive'),
-        CheckConstraint('attempts >= errors', name='check_attempts_gte_errors'),
-        Index('ix_user_test_char_logs_test_char', 'test_id', 'char'),  # Composite index for faster lookups
-    ) 
\ No newline at end of file
+        CheckConstraint('test_count > 0', name='check_rollup_test_count_positive'),
+        CheckConstraint("granularity IN ('day', 'week')", name='check_rollup_granularity'),
+    )
+
+
+class UserCharStats(Base):
+    """
+    Totals of a user's character logs per character, maintained like UserStats, for the
+    keyboard heatmap and adaptive content.
+
+    The recent_* columns weigh each test by how recent it is, halving every
+    TEST_CHAR_STATS_HALF_LIFE_DAYS. They are stored forward-decayed (see
+    repository.char_stats_weight): every test is added with a weight that grows with its
+    timestamp, so a new test is a plain addition and all rows are scaled back to the
+    present only when read.
+    """
+    __tablename__ = "user_char_stats"
+    user_id = Column(String, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    char = Column(String, primary_key=True)
+    attempts = Column(Integer, nullable=False, default=0)
+    errors = Column(Integer, nullable=False, default=0)
+    total_time = Column(BigInteger, nullable=False, default=0)  # Milliseconds
+    recent_attempts = Column(Float, nullable=False, default=0)
+    recent_errors = Column(Float, nullable=False, default=0)
+    recent_total_time = Column(Float, nullable=False, default=0)
+
+    __table_args__ = (
+        CheckConstraint('attempts > 0', name='check_char_stats_attempts_positive'),
+    )
@@ -1,42 +1,538 @@
+from sqlalchemy import Date, Row, bindparam, cast, delete, func, insert, literal, select, tuple_, update
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy.orm import Session
 from app.api.v1.endpoints.tests import models, schemas
-from uuid import uuid4
-from typing import List
-from datetime import datetime, UTC
+from app.api.v1.endpoints.tests.codec import char_log_chars, char_log_id, char_log_values, pack_char_logs
+from app.api.v1.endpoints.tests.ids import uuid7
+from app.core.config import settings
+from itertools import groupby
+from typing import Dict, Iterator, List, Optional, Sequence, Set, Tuple
+from datetime import date, datetime, time, timedelta, UTC
+
+# Columns of schemas.UserTestSummary
+SUMMARY_COLUMNS = (
+    "id", "user_id", "wpm", "raw_wpm", "accuracy", "consistency", "test_type", "language",
+    "duration", "timestamp", "chars", "restarts"
+)
+
+# Dialects whose INSERT supports ON CONFLICT DO NOTHING/UPDATE ... RETURNING, and their
+# two-argument maximum
+_UPSERT_INSERTS = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}
+_GREATEST = {"postgresql": func.greatest, "sqlite": func.max}
+
+# Running totals of models.UserStats and models.UserTestRollup, by the test column they add up
+_STAT_SUMS = {
+    "wpm_sum": "wpm", "raw_wpm_sum": "raw_wpm", "accuracy_sum": "accuracy", "consistency_sum": "consistency"
+}
+_ROLLUP_SUMS = {"wpm_sum": "wpm", "accuracy_sum": "accuracy", "consistency_sum": "consistency"}
+
+# Columns of models.UserCharStats summed over character logs
+_CHAR_STAT_COLUMNS = ("attempts", "errors", "total_time", "recent_attempts", "recent_errors", "recent_total_time")
+
+# Length of the buckets of models.UserTestRollup
+ROLLUP_GRANULARITIES = {"day": timedelta(days=1), "week": timedelta(days=7)}
+
+
+def rollup_bucket(granularity: str, day: date) -> date:
+    """First day of the day or week (starting on Monday) bucket `day` falls in."""
+    return day if granularity == "day" else day - timedelta(days=day.weekday())
+
+
+# Zero point of the forward-decay weights of models.UserCharStats
+CHAR_STATS_LANDMARK = datetime(2024, 1, 1)
+
+
+def char_stats_weight(timestamp: datetime) -> float:
+    """
+    Forward-decay weight of a test taken at `timestamp` (naive UTC) in the recent_*
+    columns of user_char_stats: doubles every TEST_CHAR_STATS_HALF_LIFE_DAYS after
+    CHAR_STATS_LANDMARK. A stored value divided by the weight of the present is the
+    exponentially decayed value. Future timestamps count as the present.
+    """
+    timestamp = min(timestamp, datetime.now(UTC).replace(tzinfo=None))
+    half_lives = (timestamp - CHAR_STATS_LANDMARK).total_seconds() / (settings.TEST_CHAR_STATS_HALF_LIFE_DAYS * 86400)
+    return 2.0 ** half_lives
+
+
+def _char_stat_values(packed: Optional[bytes], timestamp: datetime) -> Iterator[Tuple[str, Tuple[float, ...]]]:
+    """A test's character logs as (char, values of _CHAR_STAT_COLUMNS); logs without attempts are skipped."""
+    if not packed:
+        return
+    weight = char_stats_weight(timestamp)
+    for char, (attempts, errors, total_time) in zip(char_log_chars(packed), char_log_values(packed).tolist()):
+        if attempts:
+            yield char, (attempts, errors, total_time, attempts * weight, errors * weight, total_time * weight)
+
+
+def _rollup_bucket_sql(dialect: str, granularity: str, timestamp):
+    """rollup_bucket of a timestamp column, in SQL for PostgreSQL or SQLite."""
+    if dialect == "postgresql":
+        return cast(func.date_trunc(granularity, timestamp), Date)
+    if granularity == "day":
+        return func.date(timestamp)
+    return func.date(timestamp, "weekday 0", "-6 days")  # The next Sunday (or that day), back to its Monday
+
 
 class UserTestRepository:
     def __init__(self, db: Session):
         self.db = db
 
-    def create_test(self, user_id: str, test: schemas.UserTestCreate) -> models.UserTest:
-        db_test = models.UserTest(
-            id=str(uuid4()),
-            user_id=user_id,
-            wpm=test.wpm,
-            raw_wpm=test.raw_wpm,
-            accuracy=test.accuracy,
-            consistency=test.consistency,
-            test_type=test.test_type,
-            duration=test.duration,
-            chars=test.chars,
-            restarts=test.restarts,
-            timestamp=test.timestamp or datetime.now(UTC)
-        )
-        self.db.add(db_test)
+    def create_test(self, user_id: str, test: schemas.UserTestCreate) -> Optional[schemas.UserTestRead]:
+        """
+        Insert a test and all of its character logs in a single transaction.
+
+        :return: The new test with its character logs, or None if its id already exists
+        """
+        return self.create_tests(user_id, [test])[0]
+
+    def create_tests(self, user_id: str, tests: List[schemas.UserTestCreate]) -> List[Optional[schemas.UserTestRead]]:
+        """
+        Insert tests and all of their character logs in a single transaction, under
+        their client-generated ids or new UUIDv7s.
+
+        :return: The new tests with their character logs, in input order; None for
+            tests whose id already exists
+        """
+        return self.insert_tests([(test.id or uuid7(), user_id, test) for test in tests])
+
+    def insert_tests(
+        self, entries: Sequence[Tuple[str, str, schemas.UserTestCreate]]
+    ) -> List[Optional[schemas.UserTestRead]]:
+        """
+        Insert tests with preassigned ids, possibly of several users, in a single
+        transaction: one executemany, which SQLAlchemy sends as multi-row INSERTs. Each
+        test's character logs are packed into its row (see codec.pack_char_logs). Rows
+        go through Core, not ORM objects, and timestamps are generated here, so nothing
+        has to be read back: the results are built from the inserted values.
+
+        Ids that already exist are skipped rather than failing the transaction, with
+        ON CONFLICT DO NOTHING ... RETURNING id where the dialect supports it and a
+        lookup of the ids beforehand elsewhere.
+
+        :param entries: (test id, user id, test) triples
+        :return: The new tests with their character logs, in input order; None for
+            entries whose id already existed
+        """
+        test_rows = []
+        results = []
+        for test_id, user_id, test in entries:
+            timestamp = test.timestamp or datetime.now(UTC)
+            # Stored as naive UTC, which is also what the rollup buckets are cut in
+            if timestamp.tzinfo is not None:
+                timestamp = timestamp.astimezone(UTC).replace(tzinfo=None)
+            test_row = dict(
+                id=test_id,
+                user_id=user_id,
+                wpm=test.wpm,
+                raw_wpm=test.raw_wpm,
+                accuracy=test.accuracy,
+                consistency=test.consistency,
+                test_type=test.test_type,
+                language=test.language,
+                duration=test.duration,
+                chars=test.chars,
+                restarts=test.restarts,
+                timestamp=timestamp,
+                char_logs_packed=pack_char_logs([
+                    (log.char, log.attempts, log.errors, log.total_time) for log in test.char_logs
+                ]),
+                keystrokes=test.keystrokes
+            )
+            test_rows.append(test_row)
+            results.append(schemas.UserTestRead(
+                **test.model_dump(exclude={"id", "char_logs", "timestamp", "keystrokes"}),
+                id=test_id,
+                user_id=user_id,
+                timestamp=timestamp,
+                char_logs=[
+                    schemas.UserTestCharLogRead(**log.model_dump(), id=char_log_id(test_id, index), test_id=test_id)
+                    for index, log in enumerate(test.char_logs)
+                ]
+            ))
+        if not test_rows:
+            return results
+        inserted = self._insert_new(test_rows)
+        self._add_to_stats([row for row in test_rows if row["id"] in inserted])
         self.db.commit()
-        self.db.refresh(db_test)
-        for log in test.char_logs:
-            db_log = models.UserTestCharLog(
-                id=str(uuid4()),
-                test_id=db_test.id,
-                char=log.char,
-                attempts=log.attempts,
-                errors=log.errors,
-                total_time=log.total_time
+        created = []
+        for result in results:
+            created.append(result if result.id in inserted else None)
+            inserted.discard(result.id)  # A repeated id was only inserted once
+        return created
+
+    def _insert_new(self, test_rows: List[Dict[str, object]]) -> Set[str]:
+        """Insert the rows whose id is not taken (first one wins) and return their ids."""
+        table = models.UserTest.__table__
+        dialect_insert = _UPSERT_INSERTS.get(self.db.get_bind().dialect.name)
+        if dialect_insert is not None:
+            statement = dialect_insert(table).on_conflict_do_nothing(index_elements=[table.c.id])
+            return set(self.db.scalars(statement.returning(table.c.id), test_rows))
+        existing = self.get_existing_test_ids([row["id"] for row in test_rows])
+        new_rows = {}
+        for row in test_rows:
+            if row["id"] not in existing:
+                new_rows.setdefault(row["id"], row)
+        if new_rows:
+            self.db.execute(insert(table), list(new_rows.values()))
+        return set(new_rows)
+
+    def _add_to_stats(self, test_rows: List[Dict[str, object]]) -> None:
+        """
+        Add newly inserted tests to their users' user_stats, user_test_rollups and
+        user_char_stats rows, in the caller's transaction: one upsert per row, in key
+        order so concurrent writers lock rows in the same order.
+        """
+        stats: Dict[Tuple[str, str, int], Dict[str, object]] = {}
+        rollups: Dict[Tuple[str, str, date, str, int], Dict[str, object]] = {}
+        chars: Dict[Tuple[str, str], Dict[str, object]] = {}
+        seen = set()
+        for row in test_rows:
+            if row["id"] in seen:
+                continue
+            seen.add(row["id"])
+            timestamp = row["timestamp"]
+            key = (row["user_id"], row["test_type"], row["duration"])
+            totals = stats.setdefault(key, dict(
+                user_id=key[0], test_type=key[1], duration=key[2], test_count=0, wpm_sq_sum=0.0,
+                best_wpm=0.0, last_test_at=timestamp, **{name: 0.0 for name in _STAT_SUMS}
+            ))
+            self._add_to_totals(totals, row, _STAT_SUMS)
+            totals["wpm_sq_sum"] += row["wpm"] ** 2
+            totals["last_test_at"] = max(totals["last_test_at"], timestamp)
+            for granularity in ROLLUP_GRANULARITIES:
+                bucket_start = rollup_bucket(granularity, timestamp.date())
+                totals = rollups.setdefault((key[0], granularity, bucket_start, key[1], key[2]), dict(
+                    user_id=key[0], granularity=granularity, bucket_start=bucket_start, test_type=key[1],
+                    duration=key[2], test_count=0, best_wpm=0.0, **{name: 0.0 for name in _ROLLUP_SUMS}
+                ))
+                self._add_to_totals(totals, row, _ROLLUP_SUMS)
+            for char, values in _char_stat_values(row["char_logs_packed"], timestamp):
+                totals = chars.setdefault((key[0], char), dict(
+                    user_id=key[0], char=char, **{name: 0 for name in _CHAR_STAT_COLUMNS}
+                ))
+                for name, value in zip(_CHAR_STAT_COLUMNS, values):
+                    totals[name] += value
+        self._upsert_totals(
+            models.UserStats, [stats[key] for key in sorted(stats)],
+            added=("test_count", "wpm_sq_sum", *_STAT_SUMS), greatest=("best_wpm", "last_test_at")
+        )
+        self._upsert_totals(
+            models.UserTestRollup, [rollups[key] for key in sorted(rollups)],
+            added=("test_count", *_ROLLUP_SUMS), greatest=("best_wpm",)
+        )
+        self._upsert_totals(
+            models.UserCharStats, [chars[key] for key in sorted(chars)], added=_CHAR_STAT_COLUMNS, greatest=()
+        )
+
+    @staticmethod
+    def _add_to_totals(totals: Dict[str, object], test_row: Dict[str, object], sums: Dict[str, str]) -> None:
+        totals["test_count"] += 1
+        for name, column in sums.items():
+            totals[name] += test_row[column]
+        totals["best_wpm"] = max(totals["best_wpm"], test_row["wpm"])
+
+    def _upsert_totals(
+        self, model: type, rows: List[Dict[str, object]], added: Sequence[str], greatest: Sequence[str]
+    ) -> None:
+        """
+        Merge rows into a totals table keyed by its primary key: the `added` columns
+        are summed with the stored ones and the `greatest` ones take the maximum.
+        """
+        if not rows:
+            return
+        table = model.__table__
+        dialect = self.db.get_bind().dialect.name
+        dialect_insert = _UPSERT_INSERTS.get(dialect)
+        if dialect_insert is not None:
+            statement = dialect_insert(table)
+            self.db.execute(statement.on_conflict_do_update(
+                index_elements=list(table.primary_key.columns),
+                set_={
+                    **{name: table.c[name] + statement.excluded[name] for name in added},
+                    **{name: _GREATEST[dialect](table.c[name], statement.excluded[name]) for name in greatest},
+                }
+            ), rows)
+            return
+        keys = [column.name for column in table.primary_key.columns]
+        for row in rows:
+            totals = self.db.get(model, tuple(row[key] for key in keys), with_for_update=True)
+            if totals is None:
+                self.db.add(model(**row))
+                continue
+            for name in added:
+                setattr(totals, name, getattr(totals, name) + row[name])
+            for name in greatest:
+                setattr(totals, name, max(getattr(totals, name), row[name]))
+        self.db.flush()
+
+    def delete_test(self, user_id: str, test_id: str) -> bool:
+        """
+        Delete one of a user's tests and take it out of their user_stats,
+        user_test_rollups and user_char_stats rows, in one transaction. Maxima (best
+        wpm, last test time) are recomputed from the remaining tests of the row only if
+        the deleted test held them.
+
+        :return: False if the user has no such test
+        """
+        columns = [getattr(models.UserTest, name) for name in SUMMARY_COLUMNS]
+        test = self.db.query(*columns, models.UserTest.char_logs_packed).filter(
+            models.UserTest.id == test_id,
+            models.UserTest.user_id == user_id
+        ).first()
+        if test is None:
+            return False
+        self.db.execute(delete(models.UserTest.__table__).where(models.UserTest.id == test_id))
+        same_mode = (
+            models.UserTest.user_id == user_id,
+            models.UserTest.test_type == test.test_type,
+            models.UserTest.duration == test.duration
+        )
+        stats = self.db.get(models.UserStats, (user_id, test.test_type, test.duration), with_for_update=True)
+        if stats is not None and self._remove_from_totals(stats, test, _STAT_SUMS):
+            stats.wpm_sq_sum -= test.wpm ** 2
+            if test.wpm >= stats.best_wpm or test.timestamp >= stats.last_test_at:
+                stats.best_wpm, stats.last_test_at = self.db.execute(
+                    select(func.max(models.UserTest.wpm), func.max(models.UserTest.timestamp)).where(*same_mode)
+                ).one()
+        for granularity, length in ROLLUP_GRANULARITIES.items():
+            bucket_start = rollup_bucket(granularity, test.timestamp.date())
+            rollup = self.db.get(
+                models.UserTestRollup, (user_id, granularity, bucket_start, test.test_type, test.duration),
+                with_for_update=True
             )
-            self.db.add(db_log)
+            if rollup is not None and self._remove_from_totals(rollup, test, _ROLLUP_SUMS) and test.wpm >= rollup.best_wpm:
+                since = datetime.combine(bucket_start, time())
+                rollup.best_wpm = self.db.scalar(select(func.max(models.UserTest.wpm)).where(
+                    *same_mode, models.UserTest.timestamp >= since, models.UserTest.timestamp < since + length
+                ))
+        for char, values in _char_stat_values(test.char_logs_packed, test.timestamp):
+            char_stats = self.db.get(models.UserCharStats, (user_id, char), with_for_update=True)
+            if char_stats is None:
+                continue
+            if char_stats.attempts <= values[0]:
+                self.db.delete(char_stats)
+                continue
+            for name, value in zip(_CHAR_STAT_COLUMNS, values):
+                # The decayed sums are floats: keep rounding residue from going negative
+                setattr(char_stats, name, max(getattr(char_stats, name) - value, 0))
         self.db.commit()
-        return db_test
+        return True
+
+    def _remove_from_totals(self, totals: object, test: Row, sums: Dict[str, str]) -> bool:
+        """Subtract a test from a totals row, deleting the row if it was its last test; False then."""
+        if totals.test_count <= 1:
+            self.db.delete(totals)
+            return False
+        totals.test_count -= 1
+        for name, column in sums.items():
+            setattr(totals, name, getattr(totals, name) - getattr(test, column))
+        return True
+
+    def get_tests_by_ids(self, test_ids: Sequence[str]) -> Dict[str, models.UserTest]:
+        """Return the stored tests among `test_ids`, by id."""
+        return {
+            test.id: test for test in
+            self.db.query(models.UserTest).filter(models.UserTest.id.in_(test_ids)).all()
+        }
+
+    def get_existing_test_ids(self, test_ids: Sequence[str]) -> Set[str]:
+        """Return the subset of `test_ids` that are already stored."""
+        return {
+            test_id for (test_id,) in
+            self.db.query(models.UserTest.id).filter(models.UserTest.id.in_(test_ids)).all()
+        }
+
+    def get_keystrokes(self, user_id: str, test_id: str) -> Optional[Tuple[Optional[bytes]]]:
+        """
+        Fetch only the keystroke stream of one of a user's tests.
+
+        :return: A one-tuple of the stream (None if none was submitted), or None if the test does not exist
+        """
+        return self.db.query(models.UserTest.keystrokes).filter(
+            models.UserTest.id == test_id,
+            models.UserTest.user_id == user_id
+        ).first()
+
+    def get_keystroke_batch(self, after_id: Optional[str], limit: int) -> List[Tuple[str, bytes, float, float, float, float]]:
+        """
+        Page through all tests submitted with a keystroke stream, in id order.
+
+        :param after_id: Last id of the previous page, None for the first
+        :return: (id, keystrokes, wpm, raw_wpm, accuracy, consistency) of up to `limit` tests
+        """
+        query = self.db.query(
+            models.UserTest.id, models.UserTest.keystrokes, models.UserTest.wpm,
+            models.UserTest.raw_wpm, models.UserTest.accuracy, models.UserTest.consistency
+        ).filter(models.UserTest.keystrokes.isnot(None))
+        if after_id is not None:
+            query = query.filter(models.UserTest.id > after_id)
+        return [tuple(row) for row in query.order_by(models.UserTest.id).limit(limit).all()]
+
+    def update_metrics(self, rows: List[Dict[str, object]]) -> None:
+        """
+        Overwrite the stored metrics of tests in one executemany, rebuild the
+        user_stats rows they count towards and commit.
+
+        :param rows: Dicts with test_id, wpm, raw_wpm, accuracy and consistency
+        """
+        if not rows:
+            return
+        table = models.UserTest.__table__
+        self.db.execute(
+            update(table).where(table.c.id == bindparam("test_id")).values(
+                wpm=bindparam("wpm"),
+                raw_wpm=bindparam("raw_wpm"),
+                accuracy=bindparam("accuracy"),
+                consistency=bindparam("consistency")
+            ),
+            rows
+        )
+        self.rebuild_stats([row["test_id"] for row in rows])
+        self.db.commit()
+
+    def rebuild_stats(self, test_ids: Optional[Sequence[str]] = None) -> int:
+        """
+        Recompute user_stats and user_test_rollups rows from user_tests, in the caller's
+        transaction: those of the users, test types and durations of the given tests, or
+        all of them, together with user_char_stats (which only depends on the
+        character logs, so is left alone when test ids are given).
+
+        :return: Number of user_stats rows written
+        """
+        tests = models.UserTest.__table__
+        stats = models.UserStats.__table__
+        rollups = models.UserTestRollup.__table__
+        key = (tests.c.user_id, tests.c.test_type, tests.c.duration)
+        keys = select(*key).where(tests.c.id.in_(test_ids or [])).distinct()
+        for table in (stats, rollups):
+            clear = delete(table)
+            if test_ids is not None:
+                clear = clear.where(tuple_(table.c.user_id, table.c.test_type, table.c.duration).in_(keys))
+            self.db.execute(clear)
+
+        def aggregate(*columns):
+            query = select(*columns).select_from(tests)
+            return query if test_ids is None else query.where(tuple_(*key).in_(keys))
+
+        written = self.db.execute(insert(stats).from_select(
+            [
+                "user_id", "test_type", "duration", "test_count", "wpm_sum", "wpm_sq_sum", "raw_wpm_sum",
+                "accuracy_sum", "consistency_sum", "best_wpm", "last_test_at"
+            ],
+            aggregate(
+                *key,
+                func.count(),
+                func.sum(tests.c.wpm),
+                func.sum(tests.c.wpm * tests.c.wpm),
+                func.sum(tests.c.raw_wpm),
+                func.sum(tests.c.accuracy),
+                func.sum(tests.c.consistency),
+                func.max(tests.c.wpm),
+                func.max(tests.c.timestamp)
+            ).group_by(*key)
+        )).rowcount
+        dialect = self.db.get_bind().dialect.name
+        for granularity in ROLLUP_GRANULARITIES:
+            bucket_start = _rollup_bucket_sql(dialect, granularity, tests.c.timestamp)
+            self.db.execute(insert(rollups).from_select(
+                [
+                    "user_id", "granularity", "bucket_start", "test_type", "duration", "test_count", "wpm_sum",
+                    "best_wpm", "accuracy_sum", "consistency_sum"
+                ],
+                aggregate(
+                    tests.c.user_id,
+                    literal(granularity),
+                    bucket_start,
+                    tests.c.test_type,
+                    tests.c.duration,
+                    func.count(),
+                    func.sum(tests.c.wpm),
+                    func.max(tests.c.wpm),
+                    func.sum(tests.c.accuracy),
+                    func.sum(tests.c.consistency)
+                ).group_by(tests.c.user_id, bucket_start, tests.c.test_type, tests.c.duration)
+            ))
+        if test_ids is None:
+            self._rebuild_char_stats()
+        return written
+
+    def _rebuild_char_stats(self) -> None:
+        """Recompute all of user_char_stats from the packed character logs, one user at a time."""
+        self.db.execute(delete(models.UserCharStats.__table__))
+        logs = self.db.query(
+            models.UserTest.user_id, models.UserTest.timestamp, models.UserTest.char_logs_packed
+        ).filter(models.UserTest.char_logs_packed.isnot(None)).order_by(models.UserTest.user_id).yield_per(1000)
+        for user_id, user_logs in groupby(logs, key=lambda row: row.user_id):
+            totals: Dict[str, List[float]] = {}
+            for row in user_logs:
+                for char, values in _char_stat_values(row.char_logs_packed, row.timestamp):
+                    entry = totals.setdefault(char, [0] * len(_CHAR_STAT_COLUMNS))
+                    for i, value in enumerate(values):
+                        entry[i] += value
+            if totals:
+                self.db.execute(insert(models.UserCharStats.__table__), [
+                    dict(user_id=user_id, char=char, **dict(zip(_CHAR_STAT_COLUMNS, values)))
+                    for char, values in totals.items()
+                ])
+
+    def get_rollups(
+        self,
+        user_id: str,
+        granularity: str,
+        since: Optional[date] = None,
+        until: Optional[date] = None,
+        test_type: Optional[str] = None,
+        duration: Optional[int] = None
+    ) -> List[models.UserTestRollup]:
+        """
+        A user's day or week buckets starting between `since` and `until` (inclusive),
+        oldest first: a range scan of the user_test_rollups primary key.
+        """
+        query = self.db.query(models.UserTestRollup).filter(
+            models.UserTestRollup.user_id == user_id,
+            models.UserTestRollup.granularity == granularity
+        )
+        if since is not None:
+            query = query.filter(models.UserTestRollup.bucket_start >= since)
+        if until is not None:
+            query = query.filter(models.UserTestRollup.bucket_start <= until)
+        if test_type is not None:
+            query = query.filter(models.UserTestRollup.test_type == test_type)
+        if duration is not None:
+            query = query.filter(models.UserTestRollup.duration == duration)
+        return query.order_by(
+            models.UserTestRollup.bucket_start, models.UserTestRollup.test_type, models.UserTestRollup.duration
+        ).all()
+
+    def get_test_page(
+        self,
+        user_id: str,
+        limit: Optional[int] = None,
+        before: Optional[Tuple[datetime, str]] = None,
+        with_char_logs: bool = False
+    ) -> List[Row]:
+        """
+        A page of a user's tests, newest first, by keyset pagination on (timestamp, id):
+        the page starts right after `before` whatever its depth, served by
+        ix_user_tests_user_timestamp. Only the summary columns are selected.
+
+        :param limit: Most tests returned, all if None
+        :param before: (timestamp, id) of the last test of the previous page
+        :param with_char_logs: Also select the packed character logs
+        """
+        columns = [getattr(models.UserTest, name) for name in SUMMARY_COLUMNS]
+        if with_char_logs:
+            columns.append(models.UserTest.char_logs_packed)
+        query = self.db.query(*columns).filter(models.UserTest.user_id == user_id)
+        if before is not None:
+            query = query.filter(tuple_(models.UserTest.timestamp, models.UserTest.id) < tuple_(*before))
+        query = query.order_by(models.UserTest.timestamp.desc(), models.UserTest.id.desc())
+        if limit is not None:
+            query = query.limit(limit)
+        return query.all()
 
-    def get_tests_for_user(self, user_id: str) -> List[models.UserTest]:
-        return self.db.query(models.UserTest).filter(models.UserTest.user_id == user_id).order_by(models.UserTest.timestamp.desc()).all() 
\ No newline at end of file
+    def get_char_stats(self, user_id: str) -> List[models.UserCharStats]:
+        """A user's user_char_stats rows, by character."""
+        return self.db.query(models.UserCharStats).filter(
+            models.UserCharStats.user_id == user_id
+        ).order_by(models.UserCharStats.char).all()
@@ -1,35 +1,260 @@
-from fastapi import APIRouter, Depends, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from fastapi.responses import JSONResponse, StreamingResponse
 from sqlalchemy.orm import Session
 from app.db.session import get_db
-from app.api.v1.endpoints.user.models import User
-from app.core.deps import get_current_user
+from app.core.config import settings
+from app.api.v1.endpoints.user.models import RoleType, User
+from app.core.deps import get_current_user, require_roles
 from app.api.v1.endpoints.tests import schemas, service
-from app.api.v1.endpoints.tests.utils import NLTKTextHandler
-from typing import List, Optional
+from app.api.v1.endpoints.tests.ingest import IngestQueueFull, ingest_queue
+from app.api.v1.endpoints.tests.utils import (
+    MAX_BATCH_CONTENT, NLTKTextHandler, ContentPool, ContentSpec, decode_content_id, language_registry
+)
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional, Union
+from datetime import date
+import asyncio
+import hashlib
+import json
 
 router = APIRouter()
 
-# Initialize the text handler as a singleton
-text_handler = NLTKTextHandler()
+admin_required = require_roles([RoleType.ADMIN])
 
-@router.post("/me/typing", status_code=status.HTTP_201_CREATED, response_model=schemas.UserTestRead)
+def _generate_payloads(spec: ContentSpec, n: int) -> List[bytes]:
+    test_service = service.UserTestService(None, language_registry.get_handler(spec.language))
+    return [content.model_dump_json().encode() for content in test_service.generate_contents(spec, n)]
+
+# Pre-generated content, kept topped up by a background task started in the app lifespan. Refills
+# generate up to `capacity` items at once, and ids of larger batches would not decode.
+content_pool = ContentPool(
+    _generate_payloads,
+    capacity=min(settings.CONTENT_POOL_SIZE, MAX_BATCH_CONTENT),
+    max_keys=settings.CONTENT_POOL_MAX_KEYS
+)
+
+def get_language_handler(language: Optional[str] = None) -> NLTKTextHandler:
+    """Dependency returning the text handler of the requested corpus language."""
+    try:
+        return language_registry.get_handler(language)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+
+async def _zen_stream_events(request: Request, sentences: Iterator[str], wpm: int) -> AsyncIterator[str]:
+    """
+    Yield sentences as server-sent events, paced to stay at most
+    ZEN_STREAM_LOOKAHEAD_CHARS ahead of a typist going at `wpm` (5 characters per
+    word). Only one sentence is produced at a time and nothing is produced while the
+    client is far enough ahead, so a connection holds constant memory however long
+    it stays open. Stops when the client disconnects.
+    """
+    chars_per_second = wpm * 5 / 60
+    loop = asyncio.get_running_loop()
+    started = loop.time()
+    sent = 0
+    while not await request.is_disconnected():
+        allowed = settings.ZEN_STREAM_LOOKAHEAD_CHARS + (loop.time() - started) * chars_per_second
+        if sent >= allowed:
+            await asyncio.sleep(min(1.0, (sent - allowed) / chars_per_second))
+            continue
+        sentence = next(sentences)
+        sent += len(sentence) + 1
+        yield f"data: {json.dumps({'content': sentence})}\n\n"
+
+@router.post(
+    "/me/typing",
+    status_code=status.HTTP_201_CREATED,
+    response_model=schemas.UserTestRead,
+    responses={status.HTTP_202_ACCEPTED: {"model": schemas.UserTestAccepted}}
+)
 def create_user_test(
     test: schemas.UserTestCreate,
+    response: Response,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
+    """
+    Save a test result. With write-behind ingestion enabled, the result is queued and
+    the response is 202 with the id it will be stored under; it shows up in
+    GET /me/typing once the next batch is written.
+
+    A result may carry a client-generated UUIDv7 `id`. Retrying with the same id does
+    not save it again: the stored test is returned, with an `Idempotent-Replayed: true`
+    header. An id used by another user's test is rejected with 409, queued or not.
+    """
     test_service = service.UserTestService(db)
-    db_test = test_service.create_test(current_user.id, test)
-    return test_service.to_schema(db_test)
+    if ingest_queue.running:
+        try:
+            saved = test_service.get_saved_test(current_user.id, test.id) if test.id is not None else None
+        except ValueError as e:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail=str(e)
+            )
+        if saved is not None:
+            response.headers["Idempotent-Replayed"] = "true"
+            return saved
+        try:
+            test_id = ingest_queue.submit(current_user.id, test)
+            return JSONResponse(
+                status_code=status.HTTP_202_ACCEPTED,
+                content=schemas.UserTestAccepted(id=test_id).model_dump()
+            )
+        except IngestQueueFull as e:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail=str(e),
+                headers={"Retry-After": "1"}
+            )
+        except RuntimeError:
+            pass  # The queue stopped since the check (shutdown): save the result directly
+    try:
+        created, replayed = test_service.create_test(current_user.id, test)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=str(e)
+        )
+    if replayed:
+        response.headers["Idempotent-Replayed"] = "true"
+    return created
+
+@router.post("/me/typing/batch", response_model=List[schemas.UserTestBatchItem])
+def create_user_tests_batch(
+    tests: List[Dict[str, Any]],
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Save several test results in one request and one transaction, e.g. to flush
+    results recorded while offline.
 
-@router.get("/me/typing", response_model=List[schemas.UserTestRead])
+    :param tests: Up to MAX_TEST_BATCH_SIZE results, each shaped like the body of POST /me/typing
+    :return: Per result, in order: `created` with the saved test, or `invalid` with the reason
+    """
+    try:
+        return service.UserTestService(db).create_tests_batch(current_user.id, tests)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+
+@router.get("/me/typing", response_model=List[schemas.UserTestSummary], response_model_exclude_none=True)
 def get_user_tests(
+    response: Response,
+    limit: int = Query(settings.TEST_HISTORY_PAGE_SIZE, ge=1, le=settings.MAX_TEST_HISTORY_PAGE_SIZE),
+    before: Optional[str] = None,
+    include: Optional[str] = None,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    test_service = service.UserTestService(db)
-    tests = test_service.get_tests_for_user(current_user.id)
-    return [test_service.to_schema(t) for t in tests]
+    """
+    List the user's tests, newest first, without their character logs unless
+    include=char_logs, one page of `limit` (TEST_HISTORY_PAGE_SIZE by default) at a
+    time. If there are more, the cursor of the next page is in the X-Next-Cursor
+    header: pass it as `before`.
+    """
+    try:
+        tests, next_cursor = service.UserTestService(db).get_test_history(current_user.id, limit, before, include)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    if next_cursor is not None:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return tests
+
+@router.get("/me/progress", response_model=List[schemas.UserTestProgress])
+def get_user_progress(
+    granularity: str = "day",
+    since: Optional[date] = Query(None, alias="from"),
+    until: Optional[date] = Query(None, alias="to"),
+    test_type: Optional[str] = None,
+    duration: Optional[int] = None,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    The user's test count, average and best wpm, average accuracy and consistency per
+    day or week (UTC), test type and duration, oldest first, for progress charts.
+
+    :param granularity: "day" or "week" (weeks start on Monday)
+    :param from: First day, inclusive (ISO date)
+    :param to: Last day, inclusive (ISO date)
+    """
+    try:
+        return service.UserTestService(db).get_progress(
+            current_user.id, granularity, since, until, test_type, duration
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+
+@router.get("/me/heatmap", response_model=schemas.UserCharHeatmap)
+def get_user_char_heatmap(
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    The user's attempts, errors and time per character over all of their tests, and
+    the same weighted towards recent tests, for the keyboard heatmap.
+    """
+    return service.UserTestService(db).get_char_heatmap(current_user.id)
+
+@router.delete("/me/typing/{test_id}", status_code=status.HTTP_204_NO_CONTENT)
+def delete_user_test(
+    test_id: str,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Delete a test result; it is taken out of the user's statistics."""
+    if not service.UserTestService(db).delete_test(current_user.id, test_id):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Test not found"
+        )
+
+@router.get("/me/typing/{test_id}/keystrokes", response_model=schemas.UserTestKeystrokes)
+def get_user_test_keystrokes(
+    test_id: str,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Return the keystroke stream a test was submitted with, decoded into one entry per
+    keystroke.
+    """
+    keystrokes = service.UserTestService(db).get_keystrokes(current_user.id, test_id)
+    if keystrokes is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Test not found or submitted without keystrokes"
+        )
+    return keystrokes
+
+@router.get("/me/typing/{test_id}/metrics", response_model=schemas.UserTestMetrics)
+def get_user_test_metrics(
+    test_id: str,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Compute a test's wpm, raw wpm, accuracy and consistency, and their per-second
+    series, from the keystroke stream it was submitted with.
+    """
+    metrics = service.UserTestService(db).get_metrics(current_user.id, test_id)
+    if metrics is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Test not found or submitted without keystrokes"
+        )
+    return metrics
 
 @router.get("/content", response_model=schemas.TestContent)
 def get_test_content(
@@ -38,23 +263,183 @@ def get_test_content(
     level: Optional[str] = None,
     include_numbers: Optional[bool] = None,
     include_punctuation: Optional[bool] = None,
-    db: Session = Depends(get_db)
+    target_chars: Optional[int] = None,
+    target_seconds: Optional[int] = None,
+    code_language: Optional[str] = None,
+    difficulty: Optional[str] = None,
+    layout: Optional[str] = None,
+    text_handler: NLTKTextHandler = Depends(get_language_handler)
 ):
     """
-    Get test content based on the specified mode.
+    Get test content based on the specified mode. Content is the same for everyone, so
+    this route neither authenticates nor touches the database (see /content/adaptive).
     
     :param mode: One of ["words", "sentences", "code", "zen", "custom"]
-    :param count: Number of words/sentences to return
+    :param count: Number of words/sentences to return (lines for code)
     :param level: For word mode, one of ["easy", "medium", "hard"]
+        (for code, the symbol density of the snippets)
     :param include_numbers: Whether to include numbers in the content
     :param include_punctuation: Whether to include punctuation in the content
+    :param target_chars: For sentences/zen, passage length in characters (replaces count)
+    :param target_seconds: For sentences/zen, test duration the passage should fill (replaces count)
+    :param code_language: For code, programming language of the snippets (e.g. "python")
+    :param difficulty: For words/custom, keyboard difficulty range "min-max" in 0-100 (replaces level)
+    :param layout: Keyboard layout the difficulty refers to ("qwerty", "dvorak", "colemak")
+    :param language: Corpus language (DEFAULT_LANGUAGE if omitted), e.g. "spanish"
     :return: Test content
     """
+    test_service = service.UserTestService(None, text_handler)
+    try:
+        spec = test_service.get_content_spec(
+            mode=mode,
+            count=count,
+            level=level,
+            include_numbers=include_numbers or False,
+            include_punctuation=include_punctuation or False,
+            target_chars=target_chars,
+            target_seconds=target_seconds,
+            code_language=code_language,
+            difficulty=difficulty,
+            layout=layout
+        )
+        if spec.mode == "adaptive":
+            raise ValueError("Adaptive content is personal; request it from GET /tests/content/adaptive.")
+        payload = content_pool.pop(spec)
+        if payload is not None:
+            return Response(content=payload, media_type="application/json")
+        content = test_service.generate_content(spec)
+        content_pool.register(spec)
+        return content
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+
+@router.get("/content/adaptive", response_model=schemas.TestContent)
+def get_adaptive_test_content(
+    count: Optional[int] = None,
+    level: Optional[str] = None,
+    include_numbers: Optional[bool] = None,
+    include_punctuation: Optional[bool] = None,
+    db: Session = Depends(get_db),
+    text_handler: NLTKTextHandler = Depends(get_language_handler),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Get words biased toward the user's weakest keys and bigrams. Adaptive content is
+    personal, so it is never pooled and has no content id.
+
+    :param count: Number of words to return
+    :param level: One of ["easy", "medium", "hard"]; words come from it and every easier level
+    :param include_numbers: Whether to include numbers in the content
+    :param include_punctuation: Whether to include punctuation in the content
+    :param language: Corpus language (DEFAULT_LANGUAGE if omitted)
+    :return: Test content
+    """
+    test_service = service.UserTestService(db, text_handler)
+    try:
+        spec = test_service.get_content_spec(
+            mode="adaptive",
+            count=count,
+            level=level,
+            include_numbers=include_numbers or False,
+            include_punctuation=include_punctuation or False
+        )
+        return test_service.get_adaptive_content(current_user.id, spec)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+
+@router.post("/content/batch", response_model=List[schemas.TestContent])
+def get_test_content_batch(
+    requests: Union[List[schemas.TestContentRequest], schemas.TestContentRequest],
+    db: Session = Depends(get_db)
+):
+    """
+    Get several pieces of test content in one round trip, e.g. to prefetch the next
+    tests so restarts need no request.
+
+    :param requests: A list of content specs, or a single spec; each may set `n` and
+        `language`
+    :return: `n` items per spec, in request order
+    """
+    if isinstance(requests, schemas.TestContentRequest):
+        requests = [requests]
     test_service = service.UserTestService(db)
-    return test_service.get_test_content(
-        mode=mode,
-        count=count,
-        level=level,
-        include_numbers=include_numbers or False,
-        include_punctuation=include_punctuation or False
-    ) 
\ No newline at end of file
+    try:
+        return test_service.generate_content_batch(requests, get_handler=language_registry.get_handler)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+
+@router.get("/ingest", dependencies=[Depends(admin_required)])
+def get_ingest_stats():
+    """
+    Report write-behind ingestion queue depth, counters and flush latency. Admins only,
+    as `last_error` holds raw database errors.
+    """
+    return ingest_queue.stats()
+
+@router.get("/content/pool", dependencies=[Depends(admin_required)])
+def get_content_pool_stats():
+    """
+    Report content pool hit/miss counters and buffer occupancy. Admins only.
+    """
+    return content_pool.stats()
+
+@router.get("/content/zen/stream")
+def stream_zen_content(
+    request: Request,
+    include_numbers: bool = False,
+    wpm: int = Query(settings.ZEN_STREAM_WPM, ge=10, le=400),
+    text_handler: NLTKTextHandler = Depends(get_language_handler)
+):
+    """
+    Stream endless zen mode text as server-sent events, one sentence per event
+    (`data: {"content": "..."}`), for as long as the connection stays open.
+
+    :param include_numbers: Whether to include numbers in the sentences
+    :param wpm: Fastest typing speed the stream keeps up with
+    :param language: Corpus language (DEFAULT_LANGUAGE if omitted)
+    """
+    try:
+        sentences = text_handler.iter_sentences(include_numbers=include_numbers)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=str(e)
+        )
+    return StreamingResponse(
+        _zen_stream_events(request, sentences, wpm),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@router.get("/content/{content_id}", response_model=schemas.TestContent)
+def get_test_content_by_id(
+    content_id: str,
+    request: Request,
+    db: Session = Depends(get_db)
+):
+    """
+    Get previously issued test content by its content id. The text behind an id never
+    changes, so responses carry a strong ETag and are cacheable forever.
+    """
+    try:
+        text_handler = language_registry.get_handler(decode_content_id(content_id).spec.language)
+        payload = service.UserTestService(db, text_handler).get_content_by_id(content_id)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=str(e)
+        )
+    etag = f'"{hashlib.sha256(payload).hexdigest()[:32]}"'
+    headers = {"ETag": etag, "Cache-Control": "public, max-age=31536000, immutable"}
+    if etag in request.headers.get("if-none-match", ""):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(content=payload, media_type="application/json", headers=headers) 
\ No newline at end of file
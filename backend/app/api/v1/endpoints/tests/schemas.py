@@ -1,26 +1,104 @@
-from pydantic import BaseModel
-from typing import List, Optional, Dict
-from datetime import datetime
+from pydantic import AfterValidator, Base64Bytes, BaseModel, Field, ValidationInfo, model_validator
+from typing import Annotated, List, Optional, Dict
+from datetime import date, datetime
+import uuid
+from app.core.config import settings
+from app.api.v1.endpoints.tests.codec import (
+    MAX_CHAR_LOG_VALUE, MAX_CHAR_LOGS, decode_keystrokes, keystroke_char_logs
+)
+from app.api.v1.endpoints.tests.metrics import compute_metrics
+from app.api.v1.endpoints.tests.utils import language_registry
+
+# Bounds mirror the check constraints of user_tests and the limits of the packed
+# character logs (see codec.py), so invalid results are rejected before they reach the
+# database
+
+MAX_CHAR_LOG_KEY_BYTES = 32  # A character, or a key name such as "Backspace"
+
+def check_char(value: str) -> str:
+    if len(value.encode("utf-8")) > MAX_CHAR_LOG_KEY_BYTES:
+        raise ValueError(f"char must be a single character or a key name of at most {MAX_CHAR_LOG_KEY_BYTES} bytes")
+    return value
 
 class UserTestCharLogCreate(BaseModel):
-    char: str
-    attempts: int
-    errors: int
-    total_time: int
+    char: Annotated[str, Field(min_length=1), AfterValidator(check_char)]
+    attempts: int = Field(ge=0, le=MAX_CHAR_LOG_VALUE)
+    errors: int = Field(ge=0, le=MAX_CHAR_LOG_VALUE)
+    total_time: int = Field(ge=0, le=MAX_CHAR_LOG_VALUE)  # ms
+
+    @model_validator(mode="after")
+    def check_errors_within_attempts(self):
+        if self.errors > self.attempts:
+            raise ValueError("errors must not exceed attempts")
+        return self
+
+def check_test_id(value: str) -> str:
+    """Validate a client-generated test id and return it in canonical form."""
+    try:
+        parsed = uuid.UUID(value)
+    except ValueError:
+        raise ValueError("Test id must be a UUID")
+    if parsed.version != 7 or parsed.variant != uuid.RFC_4122:
+        raise ValueError("Test id must be a version 7 (time-ordered) UUID")
+    return str(parsed)
+
+def check_language(value: str, info: ValidationInfo) -> str:
+    language = value.lower()
+    # Journaled results were checked when accepted; a language removed since must not drop them
+    if (info.context or {}).get("journaled") or language == language_registry.default_language:
+        return language
+    available = language_registry.available()
+    if language not in available:
+        raise ValueError(f"Unsupported language '{value}'. Choose from {available}.")
+    return language
 
 class UserTestCreate(BaseModel):
-    wpm: float
-    raw_wpm: float
-    accuracy: float
-    consistency: float
+    # Client-generated UUIDv7; a retried submission with the same id is saved only once
+    id: Optional[Annotated[str, AfterValidator(check_test_id)]] = None
+    wpm: float = Field(ge=0)
+    raw_wpm: float = Field(ge=0)
+    accuracy: float = Field(ge=0, le=100)
+    consistency: float = Field(ge=0, le=100)
     test_type: str
-    duration: int
-    char_logs: List[UserTestCharLogCreate]
+    duration: int = Field(gt=0)
+    # Derived from `keystrokes` when omitted
+    char_logs: List[UserTestCharLogCreate] = Field([], max_length=MAX_CHAR_LOGS)
     timestamp: Optional[datetime] = None
     chars: Dict[str, int]
-    restarts: int = 0
+    restarts: int = Field(0, ge=0)
+    language: Annotated[str, AfterValidator(check_language)] = "english"  # Corpus language the test was taken in
+    keystrokes: Optional[Base64Bytes] = None  # Compressed keystroke stream, see codec.py
+
+    @model_validator(mode="after")
+    def check_keystrokes(self):
+        """
+        Decode the keystroke stream and enforce its size budget. The speed, accuracy and
+        consistency computed from it replace the client's, and missing char logs are
+        derived from it.
+        """
+        if self.keystrokes is None:
+            return self
+        stream = decode_keystrokes(self.keystrokes, settings.TEST_KEYSTROKES_MAX_EVENTS)
+        budget = settings.TEST_KEYSTROKES_BASE_BYTES + settings.TEST_KEYSTROKES_BYTES_PER_EVENT * len(stream.key_index)
+        if len(self.keystrokes) > budget:
+            raise ValueError(
+                f"Keystroke stream of {len(stream.key_index)} events takes {len(self.keystrokes)} bytes, "
+                f"more than its budget of {int(budget)}"
+            )
+        metrics = compute_metrics(stream)
+        self.wpm = round(metrics.wpm, 2)
+        self.raw_wpm = round(metrics.raw_wpm, 2)
+        self.accuracy = round(metrics.accuracy, 2)
+        self.consistency = round(metrics.consistency, 2)
+        if not self.char_logs:
+            self.char_logs = [
+                UserTestCharLogCreate(char=char, attempts=attempts, errors=errors, total_time=total_time)
+                for char, attempts, errors, total_time in keystroke_char_logs(stream)
+            ]
+        return self
 
 class UserTestCharLogRead(UserTestCharLogCreate):
+    char: str  # Logs stored before the key name limit may be longer
     id: str
     test_id: str
 
@@ -29,7 +107,90 @@ class UserTestRead(UserTestCreate):
     user_id: str
     timestamp: datetime
     char_logs: List[UserTestCharLogRead]
+    language: str  # Stored tests may use a language whose snapshot was removed since
+    keystrokes: Optional[Base64Bytes] = Field(None, exclude=True)  # Served by GET /me/typing/{id}/keystrokes
+
+class UserTestMetrics(BaseModel):
+    test_id: str
+    wpm: float
+    raw_wpm: float
+    accuracy: float
+    consistency: float
+    wpm_series: List[float]  # Per second of the test
+    raw_wpm_series: List[float]
+
+class UserTestKeystrokes(BaseModel):
+    test_id: str
+    keys: List[str]  # Expected character of each keystroke
+    delta_ms: List[int]  # Time since the previous keystroke
+    correct: List[bool]
+
+class UserTestSummary(BaseModel):
+    """A test in the history list; char_logs only with include=char_logs."""
+    id: str
+    user_id: str
+    wpm: float
+    raw_wpm: float
+    accuracy: float
+    consistency: float
+    test_type: str
+    language: str
+    duration: int
+    timestamp: datetime
+    chars: Dict[str, int]
+    restarts: int
+    char_logs: Optional[List[UserTestCharLogRead]] = None
+
+class UserTestProgress(BaseModel):
+    """Tests of one day or week (UTC, weeks start on Monday), test type and duration."""
+    bucket_start: date
+    test_type: str
+    duration: int
+    test_count: int
+    avg_wpm: float
+    best_wpm: float
+    avg_accuracy: float
+    avg_consistency: float
+
+class UserCharHeatmap(BaseModel):
+    """
+    A user's per-character totals as parallel lists, one entry per character. The
+    recent_* values weigh each test by its age, halving every half_life_days.
+    """
+    half_life_days: float
+    chars: List[str] = []
+    attempts: List[int] = []
+    errors: List[int] = []
+    total_time: List[int] = []  # ms
+    recent_attempts: List[float] = []
+    recent_errors: List[float] = []
+    recent_total_time: List[float] = []
+
+class UserTestAccepted(BaseModel):
+    id: str  # Id the test will be stored under
+    status: str = "queued"
+
+class UserTestBatchItem(BaseModel):
+    index: int  # Position of the result in the submitted batch
+    status: str  # "created", "duplicate" (already saved under its id) or "invalid"
+    test: Optional[UserTestRead] = None
+    error: Optional[str] = None  # Why an invalid result was rejected
 
 class TestContent(BaseModel):
     content: str
-    type: str  # "words" or "sentences" 
\ No newline at end of file
+    type: str  # "words" or "sentences"
+    content_id: Optional[str] = None  # Stable id; GET /tests/content/{content_id} returns the same text 
+
+class TestContentRequest(BaseModel):
+    mode: str
+    count: Optional[int] = None
+    level: Optional[str] = None
+    include_numbers: bool = False
+    include_punctuation: bool = False
+    target_chars: Optional[int] = None
+    target_seconds: Optional[int] = None
+    code_language: Optional[str] = None
+    difficulty: Optional[str] = None  # Keyboard difficulty range "min-max", 0-100, for word modes
+    layout: Optional[str] = None
+    language: Optional[str] = None  # Corpus language (DEFAULT_LANGUAGE if omitted)
+    n: int = Field(1, ge=1)  # How many pieces of content to generate for this spec
@@ -1,19 +1,707 @@
-from app.api.v1.endpoints.tests.repository import UserTestRepository
+from app.api.v1.endpoints.tests.repository import (
+    ROLLUP_GRANULARITIES, SUMMARY_COLUMNS, UserTestRepository, char_stats_weight, rollup_bucket
+)
 from app.api.v1.endpoints.tests import schemas, models
-from app.api.v1.endpoints.tests.utils import NLTKTextHandler
+from app.api.v1.endpoints.tests.codec import CodecError, char_log_id, decode_keystrokes, unpack_char_logs
+from app.api.v1.endpoints.tests.metrics import compute_metrics, compute_metrics_batch
+from app.api.v1.endpoints.tests.ids import idempotency_cache
+from app.api.v1.endpoints.tests.utils import (
+    MAX_BATCH_CONTENT, NLTKTextHandler, ContentSpec, ContentAddress, encode_content_id, decode_content_id,
+    language_registry
+)
+from app.core.config import settings
 from sqlalchemy.orm import Session
-from typing import List, Optional
+from pydantic import ValidationError
+from functools import lru_cache
+from itertools import permutations
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import numpy as np
+from datetime import date, datetime, UTC
+import base64
+import math
+import secrets
+
+CONTENT_MODES = ["words", "sentences", "code", "zen", "custom", "adaptive"]
+CONTENT_LEVELS = ["easy", "medium", "hard"]
+MAX_TARGET_CHARS = 20000
+MAX_TARGET_WORDS = 4000
+DEFAULT_WORD_COUNT = 25
+MAX_CODE_LINES = 200
+DEFAULT_CODE_LINES = 15
+ADAPTIVE_WEAK_KEYS = 6  # Number of weakest characters adaptive content focuses on
+ADAPTIVE_BIGRAM_WEIGHT = 0.5  # Weight of bigrams of two weak characters relative to the characters
+
+@lru_cache(maxsize=settings.CONTENT_CACHE_SIZE)
+def _render_addressed_content(language: str, fingerprint: str, content_id: str) -> bytes:
+    """
+    Regenerate the content behind a content id and encode it. Cached so the same text is
+    never generated twice by this process. The handler is looked up in the language
+    registry rather than being part of the key, so cached entries do not keep the
+    snapshots of unloaded languages mapped.
+
+    :param language: Corpus language of the handler serving the request
+    :param fingerprint: Fingerprint of that handler's corpus
+    """
+    address = decode_content_id(content_id)
+    if address.fingerprint != fingerprint:
+        raise ValueError(f"Content id '{content_id}' was generated from a different corpus")
+    text_handler = language_registry.get_handler(language)
+    if text_handler.fingerprint != fingerprint:
+        raise ValueError(f"Corpus for language '{language}' changed while rendering '{content_id}'")
+    test_service = UserTestService(None, text_handler)
+    spec = address.spec
+    normalized = test_service.get_content_spec(**spec._asdict())
+    if normalized != spec:
+        raise ValueError(f"Malformed content id '{content_id}'")
+    contents = test_service.generate_contents(spec, address.n, seed=address.seed)
+    return contents[address.row].model_dump_json().encode()
+
+def encode_history_cursor(timestamp: datetime, test_id: str) -> str:
+    """Opaque cursor pointing just past the test with this timestamp and id."""
+    return base64.urlsafe_b64encode(f"{timestamp.isoformat()}|{test_id}".encode()).decode().rstrip("=")
+
+def decode_history_cursor(cursor: str) -> Tuple[datetime, str]:
+    """
+    :raises ValueError: If the cursor is malformed
+    """
+    try:
+        timestamp, test_id = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode().split("|", 1)
+        return datetime.fromisoformat(timestamp), test_id
+    except (ValueError, UnicodeDecodeError):
+        raise ValueError(f"Malformed cursor '{cursor}'")
 
 class UserTestService:
-    def __init__(self, db: Session):
+    def __init__(self, db: Session, text_handler: Optional[NLTKTextHandler] = None):
         self.repository = UserTestRepository(db)
-        self.text_handler = NLTKTextHandler()
+        self.text_handler = text_handler
+
+    def create_test(self, user_id: str, test: schemas.UserTestCreate) -> Tuple[schemas.UserTestRead, bool]:
+        """
+        Save a test result. A result carrying the id of one of the user's tests is a
+        retry: nothing is written and the stored test is returned.
+
+        :return: The saved test, and whether it had already been saved before
+        :raises ValueError: If the id belongs to another user's test, or the test it
+            conflicted with was deleted meanwhile
+        """
+        if test.id is not None:
+            cached = idempotency_cache.get(user_id, test.id)
+            if cached is not None:
+                return cached, True
+        created = self.repository.create_test(user_id, test)
+        replayed = created is None
+        if replayed:
+            created = self._get_saved_tests(user_id, [test.id]).get(test.id)
+            if created is None:
+                raise ValueError(f"Test '{test.id}' was deleted while it was being saved; retry.")
+        if test.id is not None:
+            idempotency_cache.put(created)
+        return created, replayed
+
+    def get_saved_test(self, user_id: str, test_id: str) -> Optional[schemas.UserTestRead]:
+        """
+        The user's stored test with this id, so a queued submission can be checked like
+        a direct one before it is accepted.
+
+        :return: The stored test, or None if the id is unused
+        :raises ValueError: If the id belongs to another user's test
+        """
+        cached = idempotency_cache.get(user_id, test_id)
+        if cached is not None:
+            return cached
+        return self._get_saved_tests(user_id, [test_id]).get(test_id)
+
+    def _get_saved_tests(self, user_id: str, test_ids: List[str]) -> Dict[str, schemas.UserTestRead]:
+        """
+        Stored tests of the user whose ids a submission reused.
+
+        :raises ValueError: If one of them belongs to another user
+        """
+        saved = {}
+        for test_id, db_test in self.repository.get_tests_by_ids(test_ids).items():
+            if db_test.user_id != user_id:
+                raise ValueError(f"Test id '{test_id}' is already taken.")
+            saved[test_id] = self.to_schema(db_test)
+        return saved
+
+    def create_tests_batch(self, user_id: str, items: List[Dict[str, Any]]) -> List[schemas.UserTestBatchItem]:
+        """
+        Save a backlog of results (e.g. recorded offline) in one transaction.
+
+        Every item is validated on its own, so one malformed result does not reject the
+        rest: valid items are inserted together with one bulk statement and invalid ones
+        are reported with the reason. Items whose id was saved before (e.g. by an earlier
+        attempt at the same batch) are reported as duplicates with the stored test.
+
+        :param user_id: Owner of the tests
+        :param items: Raw UserTestCreate payloads
+        :return: One status per item, in input order
+        :raises ValueError: If the batch holds more than MAX_TEST_BATCH_SIZE items
+        """
+        if len(items) > settings.MAX_TEST_BATCH_SIZE:
+            raise ValueError(f"A batch may hold at most {settings.MAX_TEST_BATCH_SIZE} results, got {len(items)}.")
+        results: List[Optional[schemas.UserTestBatchItem]] = [None] * len(items)
+        valid = []
+        for index, item in enumerate(items):
+            try:
+                valid.append((index, schemas.UserTestCreate.model_validate(item)))
+            except ValidationError as e:
+                error = "; ".join(
+                    f"{'.'.join(str(part) for part in err['loc']) or 'test'}: {err['msg']}" for err in e.errors()
+                )
+                results[index] = schemas.UserTestBatchItem(index=index, status="invalid", error=error)
+        created = self.repository.create_tests(user_id, [test for _, test in valid])
+        reused = [test.id for (_, test), saved in zip(valid, created) if saved is None]
+        stored = self.repository.get_tests_by_ids(reused) if reused else {}
+        for (index, test), saved in zip(valid, created):
+            if saved is not None:
+                results[index] = schemas.UserTestBatchItem(index=index, status="created", test=saved)
+            elif stored[test.id].user_id == user_id:
+                results[index] = schemas.UserTestBatchItem(
+                    index=index, status="duplicate", test=self.to_schema(stored[test.id])
+                )
+            else:
+                results[index] = schemas.UserTestBatchItem(
+                    index=index, status="invalid", error=f"id: Test id '{test.id}' is already taken"
+                )
+        return results
+
+    def delete_test(self, user_id: str, test_id: str) -> bool:
+        """
+        Delete one of a user's tests and correct their statistics.
+
+        :return: False if the user has no such test
+        """
+        idempotency_cache.discard(user_id, test_id)
+        return self.repository.delete_test(user_id, test_id)
+
+    def get_test_history(
+        self,
+        user_id: str,
+        limit: Optional[int] = None,
+        before: Optional[str] = None,
+        include: Optional[str] = None
+    ) -> Tuple[List[schemas.UserTestSummary], Optional[str]]:
+        """
+        A page of a user's tests, newest first, without their character logs unless
+        `include` is "char_logs".
+
+        :param limit: Most tests returned, all if None
+        :param before: Cursor returned with the previous page
+        :return: The tests, and the cursor of the next page (None on the last page)
+        :raises ValueError: If the cursor or `include` is invalid
+        """
+        if include not in (None, "", "char_logs"):
+            raise ValueError(f"Unknown include '{include}', expected 'char_logs'.")
+        with_char_logs = include == "char_logs"
+        rows = self.repository.get_test_page(
+            user_id,
+            limit=None if limit is None else limit + 1,
+            before=None if before is None else decode_history_cursor(before),
+            with_char_logs=with_char_logs
+        )
+        next_cursor = None
+        if limit is not None and len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = encode_history_cursor(rows[-1].timestamp, rows[-1].id)
+        tests = []
+        for row in rows:
+            test = schemas.UserTestSummary(**{name: getattr(row, name) for name in SUMMARY_COLUMNS})
+            if with_char_logs:
+                test.char_logs = self._char_log_reads(row.id, row.char_logs_packed)
+            tests.append(test)
+        return tests, next_cursor
+
+    def get_progress(
+        self,
+        user_id: str,
+        granularity: str,
+        since: Optional[date] = None,
+        until: Optional[date] = None,
+        test_type: Optional[str] = None,
+        duration: Optional[int] = None
+    ) -> List[schemas.UserTestProgress]:
+        """
+        A user's progress per day or week from their rollups, oldest first, one entry
+        per bucket, test type and duration with tests.
+
+        :param since: First day of the range; a week bucket is included if the day falls in it
+        :param until: Last day of the range
+        :raises ValueError: If the granularity is unknown or the range is reversed
+        """
+        if granularity not in ROLLUP_GRANULARITIES:
+            raise ValueError(f"Unknown granularity '{granularity}', expected one of {list(ROLLUP_GRANULARITIES)}.")
+        if since is not None and until is not None and since > until:
+            raise ValueError("'from' must not be after 'to'.")
+        rollups = self.repository.get_rollups(
+            user_id,
+            granularity,
+            since=None if since is None else rollup_bucket(granularity, since),
+            until=until,
+            test_type=test_type,
+            duration=duration
+        )
+        return [
+            schemas.UserTestProgress(
+                bucket_start=rollup.bucket_start,
+                test_type=rollup.test_type,
+                duration=rollup.duration,
+                test_count=rollup.test_count,
+                avg_wpm=rollup.wpm_sum / rollup.test_count,
+                best_wpm=rollup.best_wpm,
+                avg_accuracy=rollup.accuracy_sum / rollup.test_count,
+                avg_consistency=rollup.consistency_sum / rollup.test_count
+            ) for rollup in rollups
+        ]
+
+    def get_keystrokes(self, user_id: str, test_id: str) -> Optional[schemas.UserTestKeystrokes]:
+        """
+        Decode the keystroke stream submitted with one of a user's tests.
+
+        :return: None if the user has no such test or it was submitted without keystrokes
+        """
+        row = self.repository.get_keystrokes(user_id, test_id)
+        if row is None or row[0] is None:
+            return None
+        stream = decode_keystrokes(row[0], settings.TEST_KEYSTROKES_MAX_EVENTS)
+        keys = [stream.keys[i] for i in stream.key_index.tolist()]
+        return schemas.UserTestKeystrokes(
+            test_id=test_id,
+            keys=keys,
+            delta_ms=stream.delta_ms.tolist(),
+            correct=stream.correct.tolist()
+        )
+
+    def get_metrics(self, user_id: str, test_id: str) -> Optional[schemas.UserTestMetrics]:
+        """
+        Compute the metrics of one of a user's tests, with per-second series, from its
+        keystroke stream.
+
+        :return: None if the user has no such test or it was submitted without keystrokes
+        """
+        row = self.repository.get_keystrokes(user_id, test_id)
+        if row is None or row[0] is None:
+            return None
+        metrics = compute_metrics(decode_keystrokes(row[0], settings.TEST_KEYSTROKES_MAX_EVENTS))
+        return schemas.UserTestMetrics(
+            test_id=test_id,
+            wpm=metrics.wpm,
+            raw_wpm=metrics.raw_wpm,
+            accuracy=metrics.accuracy,
+            consistency=metrics.consistency,
+            wpm_series=metrics.wpm_series.tolist(),
+            raw_wpm_series=metrics.raw_wpm_series.tolist()
+        )
+
+    def recompute_metrics(self, batch_size: int = 1000, dry_run: bool = False) -> Dict[str, int]:
+        """
+        Recompute the stored wpm, raw wpm, accuracy and consistency of every test that
+        has a keystroke stream, e.g. after a change to the metrics definitions. Tests
+        are processed in pages of `batch_size`, each computed in one vectorized call and
+        written in one statement.
+
+        :param dry_run: Only count the tests whose stored metrics differ
+        :return: Number of tests read, changed (by more than 0.01 in any metric) and
+            skipped because their stream could not be decoded
+        """
+        counts = {"tests": 0, "changed": 0, "failed": 0}
+        after_id = None
+        while True:
+            rows = self.repository.get_keystroke_batch(after_id, batch_size)
+            if not rows:
+                return counts
+            after_id = rows[-1][0]
+            counts["tests"] += len(rows)
+            decoded = []
+            for row in rows:
+                try:
+                    decoded.append((row, decode_keystrokes(row[1], settings.TEST_KEYSTROKES_MAX_EVENTS)))
+                except CodecError:
+                    counts["failed"] += 1
+            metrics = compute_metrics_batch([stream for _, stream in decoded])
+            changed = []
+            for (row, _), result in zip(decoded, metrics):
+                values = [round(value, 2) for value in result[:4]]
+                if any(abs(value - stored) > 0.01 for value, stored in zip(values, row[2:])):
+                    changed.append(dict(zip(("test_id", "wpm", "raw_wpm", "accuracy", "consistency"), [row[0], *values])))
+            counts["changed"] += len(changed)
+            if not dry_run:
+                self.repository.update_metrics(changed)
+
+    def get_content_spec(
+        self,
+        mode: str,
+        count: Optional[int] = None,
+        level: Optional[str] = None,
+        include_numbers: Optional[bool] = False,
+        include_punctuation: Optional[bool] = False,
+        target_chars: Optional[int] = None,
+        target_seconds: Optional[int] = None,
+        target_words: Optional[int] = None,
+        code_language: Optional[str] = None,
+        difficulty: Optional[str] = None,
+        layout: Optional[str] = None,
+        difficulty_min: Optional[int] = None,
+        difficulty_max: Optional[int] = None,
+        language: Optional[str] = None
+    ) -> ContentSpec:
+        """
+        Normalize content parameters into a ContentSpec, applying each mode's defaults,
+        so equivalent requests map to the same spec.
+
+        For sentences and zen modes, `target_chars` or `target_seconds` replaces `count`:
+        the passage is assembled to fill that many characters, or the number of words a
+        CONTENT_TARGET_WPM typist types in that many seconds.
+
+        For code mode, `count` is the number of lines, `level` the symbol density tier
+        and `code_language` restricts snippets to one language (any if omitted).
+
+        For words and custom modes, `difficulty` ("min-max", 0-100) replaces `level`:
+        words are chosen by keyboard effort on `layout` (KEYBOARD_LAYOUT by default).
+
+        `language` is the corpus language and must match the text handler's; specs of
+        the default language leave it unset, so their content ids are unchanged.
+
+        :raises ValueError: If mode, level, length target, code language, difficulty or
+            language is invalid
+        """
+        if self.text_handler is not None:
+            if language is not None and language.lower() != self.text_handler.language:
+                raise ValueError(
+                    f"Language '{language}' does not match the '{self.text_handler.language}' corpus."
+                )
+            language = self.text_handler.language
+        language = (language or settings.DEFAULT_LANGUAGE).lower()
+        spec = self._get_mode_spec(
+            mode, count, level, include_numbers, include_punctuation, target_chars, target_seconds,
+            target_words, code_language, difficulty, layout, difficulty_min, difficulty_max
+        )
+        return spec._replace(language=None if language == settings.DEFAULT_LANGUAGE else language)
+
+    def _get_mode_spec(
+        self,
+        mode: str,
+        count: Optional[int],
+        level: Optional[str],
+        include_numbers: Optional[bool],
+        include_punctuation: Optional[bool],
+        target_chars: Optional[int],
+        target_seconds: Optional[int],
+        target_words: Optional[int],
+        code_language: Optional[str],
+        difficulty: Optional[str],
+        layout: Optional[str],
+        difficulty_min: Optional[int],
+        difficulty_max: Optional[int]
+    ) -> ContentSpec:
+        """Apply the defaults and validation of `mode` (see get_content_spec)."""
+        if level is not None and level not in CONTENT_LEVELS:
+            raise ValueError(f"Invalid level '{level}'. Choose from {CONTENT_LEVELS}.")
+        if difficulty is not None:
+            difficulty_min, difficulty_max = self._parse_difficulty(difficulty)
+        if difficulty_min is not None or difficulty_max is not None:
+            if mode not in ("words", "custom"):
+                raise ValueError("difficulty is only supported for words and custom modes.")
+            difficulty_min = 0 if difficulty_min is None else difficulty_min
+            difficulty_max = 100 if difficulty_max is None else difficulty_max
+            if not 0 <= difficulty_min <= difficulty_max <= 100:
+                raise ValueError("difficulty must be a range 'min-max' with 0 <= min <= max <= 100.")
+            layout = (layout or settings.KEYBOARD_LAYOUT).lower()
+            layouts = self.text_handler.layouts if self.text_handler is not None else [layout]
+            if layout not in layouts:
+                raise ValueError(f"Invalid keyboard layout '{layout}'. Choose from {layouts}.")
+            return ContentSpec(
+                mode, None, self._word_count(count), bool(include_numbers), bool(include_punctuation),
+                difficulty_min=difficulty_min, difficulty_max=difficulty_max, layout=layout
+            )
+        if mode in ("words", "custom", "adaptive"):
+            return ContentSpec(
+                mode, level or "easy", self._word_count(count), bool(include_numbers), bool(include_punctuation)
+            )
+        elif mode in ("sentences", "zen"):
+            if target_seconds is not None:
+                if target_seconds <= 0:
+                    raise ValueError("target_seconds must be positive.")
+                target_words = math.ceil(target_seconds * settings.CONTENT_TARGET_WPM / 60)
+            if target_chars is not None and target_words is not None:
+                raise ValueError("Specify only one of target_chars and target_seconds.")
+            if target_chars is not None and not 1 <= target_chars <= MAX_TARGET_CHARS:
+                raise ValueError(f"target_chars must be between 1 and {MAX_TARGET_CHARS}.")
+            if target_words is not None and not 1 <= target_words <= MAX_TARGET_WORDS:
+                raise ValueError(f"target_seconds is too long; at most {MAX_TARGET_WORDS} words can be generated.")
+            if mode == "zen":
+                # Zen content has no numbers; without a length target it is a single sentence
+                if target_chars is None and target_words is None:
+                    return ContentSpec(mode, None, 1, False, False)
+                return ContentSpec(mode, None, None, False, False, target_chars, target_words)
+            if target_chars is None and target_words is None:
+                if count is not None and count < 1:
+                    raise ValueError("count must be at least 1 sentence.")
+                return ContentSpec(
+                    mode, None, 1 if count is None else count, bool(include_numbers), bool(include_punctuation)
+                )
+            return ContentSpec(
+                mode, None, None, bool(include_numbers), bool(include_punctuation), target_chars, target_words
+            )
+        elif mode == "code":
+            if count is not None and not 1 <= count <= MAX_CODE_LINES:
+                raise ValueError(f"count must be between 1 and {MAX_CODE_LINES} lines for code mode.")
+            if code_language is not None:
+                code_language = code_language.lower()
+                if self.text_handler is not None and code_language not in self.text_handler.code_languages:
+                    raise ValueError(
+                        f"Invalid code language '{code_language}'. Choose from {self.text_handler.code_languages}."
+                    )
+            return ContentSpec(mode, level, count or DEFAULT_CODE_LINES, False, False, None, None, code_language)
+        else:
+            raise ValueError(f"Invalid mode: {mode}. Must be one of {CONTENT_MODES}")
+
+    @staticmethod
+    def _word_count(count: Optional[int]) -> int:
+        """
+        Default and bound the word count of words, custom and adaptive content. Counts
+        beyond the level's (or difficulty range's) word pool are rejected by the text
+        handler.
+        """
+        if count is None:
+            return DEFAULT_WORD_COUNT
+        if not 1 <= count <= MAX_TARGET_WORDS:
+            raise ValueError(f"count must be between 1 and {MAX_TARGET_WORDS} words.")
+        return count
+
+    @staticmethod
+    def _parse_difficulty(difficulty: str) -> Tuple[int, int]:
+        """Parse a "min-max" difficulty range into two ints."""
+        low, separator, high = difficulty.partition("-")
+        try:
+            if not separator:
+                raise ValueError
+            return int(low), int(high)
+        except ValueError:
+            raise ValueError(f"Invalid difficulty '{difficulty}'. Expected a range 'min-max', e.g. '40-60'.")
+
+    def generate_content(self, spec: ContentSpec) -> schemas.TestContent:
+        """
+        Generate fresh test content for a normalized spec.
+
+        :param spec: Spec returned by get_content_spec
+        :return: TestContent object with generated content
+        """
+        return self.generate_contents(spec, 1)[0]
+
+    def generate_contents(
+        self,
+        spec: ContentSpec,
+        n: int,
+        seed: Optional[int] = None
+    ) -> List[schemas.TestContent]:
+        """
+        Generate `n` independent pieces of test content for one spec. Word modes are
+        sampled for all `n` tests in a single vectorized pass.
+
+        Generation is deterministic in (corpus, spec, seed, n): every item carries a
+        content id from which get_content_by_id regenerates exactly the same text.
+
+        :param spec: Spec returned by get_content_spec
+        :param n: Number of pieces of content to generate
+        :param seed: Seed for the batch (random if omitted)
+        :return: List of TestContent objects
+        """
+        if self.text_handler is None:
+            raise RuntimeError("UserTestService was created without a text handler")
+        if spec.mode == "adaptive":
+            raise ValueError("Adaptive content is generated per user; use get_adaptive_content")
+        if seed is None:
+            seed = secrets.randbits(64)
+        rng = np.random.default_rng(seed)
+        if spec.mode in ("words", "custom"):
+            tests = self.text_handler.sample_words_batch(
+                level=spec.level,
+                count=spec.count,
+                n_tests=n,
+                include_numbers=spec.include_numbers,
+                include_punctuation=spec.include_punctuation,
+                rng=rng,
+                difficulty=(
+                    (spec.difficulty_min, spec.difficulty_max) if spec.difficulty_min is not None else None
+                ),
+                layout=spec.layout or settings.KEYBOARD_LAYOUT
+            )
+            texts = [" ".join(words) for words in tests]
+        elif spec.mode == "code":
+            texts = [
+                "\n\n".join(self.text_handler.get_code_snippets(
+                    target_lines=spec.count,
+                    language=spec.code_language,
+                    level=spec.level,
+                    rng=rng
+                ))
+                for _ in range(n)
+            ]
+        elif spec.target_chars is not None or spec.target_words is not None:
+            texts = [
+                " ".join(self.text_handler.get_sentences_for_length(
+                    target_chars=spec.target_chars,
+                    target_words=spec.target_words,
+                    include_numbers=spec.include_numbers,
+                    rng=rng
+                ))
+                for _ in range(n)
+            ]
+        else:
+            texts = [
+                " ".join(self.text_handler.get_random_sentences(
+                    count=spec.count,
+                    include_numbers=spec.include_numbers,
+                    include_punctuation=spec.include_punctuation,
+                    rng=rng
+                ))
+                for _ in range(n)
+            ]
+        return [
+            schemas.TestContent(
+                content=text,
+                type=spec.mode,
+                content_id=encode_content_id(
+                    ContentAddress(self.text_handler.fingerprint, spec, seed, n, row)
+                )
+            )
+            for row, text in enumerate(texts)
+        ]
+
+    def generate_content_batch(
+        self,
+        requests: List[schemas.TestContentRequest],
+        get_handler: Optional[Callable[[Optional[str]], NLTKTextHandler]] = None
+    ) -> List[schemas.TestContent]:
+        """
+        Generate content for several requests at once, e.g. to prefetch upcoming tests.
 
-    def create_test(self, user_id: str, test: schemas.UserTestCreate) -> models.UserTest:
-        return self.repository.create_test(user_id, test)
+        Requests are normalized and grouped by spec, and each distinct spec is generated
+        in one `generate_contents` call for the combined count, so asking for 20 tests of
+        the same kind costs one vectorized pass instead of 20.
 
-    def get_tests_for_user(self, user_id: str) -> List[models.UserTest]:
-        return self.repository.get_tests_for_user(user_id)
+        :param requests: Content parameters, each with the number `n` of items wanted
+        :param get_handler: Returns the text handler of a request's language; without
+            it every request is served from this service's handler
+        :return: `n` items per request, in request order
+        :raises ValueError: If any request is invalid, adaptive, or the batch is too large
+        """
+        total = sum(request.n for request in requests)
+        if total > MAX_BATCH_CONTENT:
+            raise ValueError(f"A batch may request at most {MAX_BATCH_CONTENT} items, got {total}.")
+
+        specs = []
+        services: Dict[ContentSpec, UserTestService] = {}
+        for request in requests:
+            test_service = self if get_handler is None else UserTestService(None, get_handler(request.language))
+            spec = test_service.get_content_spec(
+                mode=request.mode,
+                count=request.count,
+                level=request.level,
+                include_numbers=request.include_numbers,
+                include_punctuation=request.include_punctuation,
+                target_chars=request.target_chars,
+                target_seconds=request.target_seconds,
+                code_language=request.code_language,
+                difficulty=request.difficulty,
+                layout=request.layout,
+                language=request.language
+            )
+            if spec.mode == "adaptive":
+                raise ValueError("Adaptive content cannot be batched; request it from GET /tests/content.")
+            specs.append(spec)
+            services[spec] = test_service
+
+        counts: Dict[ContentSpec, int] = {}
+        for spec, request in zip(specs, requests):
+            counts[spec] = counts.get(spec, 0) + request.n
+        generated = {spec: iter(services[spec].generate_contents(spec, n)) for spec, n in counts.items()}
+        return [next(generated[spec]) for spec, request in zip(specs, requests) for _ in range(request.n)]
+
+    def get_char_heatmap(self, user_id: str) -> schemas.UserCharHeatmap:
+        """
+        A user's per-character totals from user_char_stats, with the recent values
+        decayed to the present.
+        """
+        decay = 1 / char_stats_weight(datetime.now(UTC).replace(tzinfo=None))
+        heatmap = schemas.UserCharHeatmap(half_life_days=settings.TEST_CHAR_STATS_HALF_LIFE_DAYS)
+        for row in self.repository.get_char_stats(user_id):
+            heatmap.chars.append(row.char)
+            heatmap.attempts.append(row.attempts)
+            heatmap.errors.append(row.errors)
+            heatmap.total_time.append(row.total_time)
+            heatmap.recent_attempts.append(round(row.recent_attempts * decay, 2))
+            heatmap.recent_errors.append(round(row.recent_errors * decay, 2))
+            heatmap.recent_total_time.append(round(row.recent_total_time * decay, 2))
+        return heatmap
+
+    def get_weak_keys(self, user_id: str, limit: int = ADAPTIVE_WEAK_KEYS) -> Dict[str, float]:
+        """
+        Score the user's letters by how error-prone and slow they have been recently,
+        from the decayed values of their per-character statistics.
+
+        Each letter scores its smoothed error rate, (errors + 1) / (attempts + 2), times
+        its time per attempt relative to the user's average. The `limit` weakest letters
+        are returned with their scores, plus every bigram of two of them.
+
+        :return: Characters and bigrams -> weight; empty if the user has no logs
+        """
+        decay = 1 / char_stats_weight(datetime.now(UTC).replace(tzinfo=None))
+        totals: Dict[str, List[float]] = {}
+        for row in self.repository.get_char_stats(user_id):
+            char = row.char.lower()
+            if len(char) != 1 or not char.isalpha():
+                continue
+            entry = totals.setdefault(char, [0.0, 0.0, 0.0])
+            entry[0] += row.recent_attempts * decay
+            entry[1] += row.recent_errors * decay
+            entry[2] += row.recent_total_time * decay
+
+        all_attempts = sum(attempts for attempts, _, _ in totals.values())
+        if not all_attempts:
+            return {}
+        mean_time = sum(total_time for _, _, total_time in totals.values()) / all_attempts or 1
+
+        scores = {}
+        for char, (attempts, errors, total_time) in totals.items():
+            slowness = (total_time / attempts) / mean_time if attempts else 1.0
+            scores[char] = (errors + 1) / (attempts + 2) * slowness
+        weakest = sorted(scores, key=scores.get, reverse=True)[:limit]
+
+        weights = {char: scores[char] for char in weakest}
+        for a, b in permutations(weakest, 2):
+            weights[a + b] = ADAPTIVE_BIGRAM_WEIGHT * math.sqrt(scores[a] * scores[b])
+        return weights
+
+    def get_adaptive_content(self, user_id: str, spec: ContentSpec) -> schemas.TestContent:
+        """
+        Generate words weighted toward the user's weakest characters and bigrams.
+        Adaptive content depends on the user's history, so it has no content id.
+
+        :param user_id: User whose character logs drive the weighting
+        :param spec: Spec with mode "adaptive"
+        """
+        if self.text_handler is None:
+            raise RuntimeError("UserTestService was created without a text handler")
+        words = self.text_handler.get_adaptive_words(
+            key_weights=self.get_weak_keys(user_id),
+            level=spec.level,
+            count=spec.count,
+            include_numbers=spec.include_numbers,
+            include_punctuation=spec.include_punctuation
+        )
+        return schemas.TestContent(content=" ".join(words), type=spec.mode)
+
+    def get_content_by_id(self, content_id: str) -> bytes:
+        """
+        Return the JSON-encoded TestContent identified by `content_id`.
+
+        :raises ValueError: If the id is malformed or belongs to another corpus
+        """
+        if self.text_handler is None:
+            raise RuntimeError("UserTestService was created without a text handler")
+        return _render_addressed_content(self.text_handler.language, self.text_handler.fingerprint, content_id)
 
     def get_test_content(
         self,
@@ -21,66 +709,39 @@ class UserTestService:
         count: Optional[int] = None,
         level: Optional[str] = None,
         include_numbers: Optional[bool] = False,
-        include_punctuation: Optional[bool] = False
+        include_punctuation: Optional[bool] = False,
+        target_chars: Optional[int] = None,
+        target_seconds: Optional[int] = None,
+        code_language: Optional[str] = None,
+        difficulty: Optional[str] = None,
+        layout: Optional[str] = None,
+        language: Optional[str] = None
     ) -> schemas.TestContent:
         """
         Generate test content based on the specified mode and parameters.
         
         :param mode: One of ["words", "sentences", "code", "zen", "custom"]
-        :param count: Number of words/sentences to return
+        :param count: Number of words/sentences (lines for code) to return
         :param level: For word mode, one of ["easy", "medium", "hard"]
         :param include_numbers: Whether to include numbers in the content
         :param include_punctuation: Whether to include punctuation in the content
+        :param target_chars: For sentences/zen, passage length in characters
+        :param target_seconds: For sentences/zen, test duration to fill
+        :param code_language: For code mode, programming language of the snippets
+        :param difficulty: For word modes, keyboard difficulty range "min-max" (replaces level)
+        :param layout: Keyboard layout the difficulty refers to
+        :param language: Corpus language; must match the text handler's
         :return: TestContent object with generated content
         :raises ValueError: If mode is invalid or parameters are invalid
         """
-        if mode == "words":
-            if not level:
-                level = "easy"
-            if not count:
-                count = 25
-            words = self.text_handler.get_random_words(
-                level=level,
-                count=count,
-                include_numbers=include_numbers,
-                include_punctuation=include_punctuation
-            )
-            return schemas.TestContent(content=" ".join(words), type="words")
-        elif mode == "sentences":
-            if not count:
-                count = 1
-            sentences = self.text_handler.get_random_sentences(
-                count=count,
-                include_numbers=include_numbers,
-                include_punctuation=include_punctuation
-            )
-            return schemas.TestContent(content=" ".join(sentences), type="sentences")
-        elif mode == "code":
-            # For now, use words mode with code-like content
-            words = self.text_handler.get_random_words(
-                level="hard",
-                count=25,
-                include_numbers=False,
-                include_punctuation=True
-            )
-            return schemas.TestContent(content=" ".join(words), type="code")
-        elif mode == "zen":
-            # For now, use sentences mode for zen
-            sentences = self.text_handler.get_random_sentences(count=1)
-            return schemas.TestContent(content=" ".join(sentences), type="zen")
-        elif mode == "custom":
-            # For now, use words mode for custom
-            words = self.text_handler.get_random_words(
-                level=level or "easy",
-                count=count or 25,
-                include_numbers=include_numbers,
-                include_punctuation=include_punctuation
-            )
-            return schemas.TestContent(content=" ".join(words), type="custom")
-        else:
-            raise ValueError(f"Invalid mode: {mode}. Must be one of ['words', 'sentences', 'code', 'zen', 'custom']")
+        spec = self.get_content_spec(
+            mode, count, level, include_numbers, include_punctuation, target_chars, target_seconds,
+            code_language=code_language, difficulty=difficulty, layout=layout, language=language
+        )
+        return self.generate_content(spec)
 
     def to_schema(self, db_test: models.UserTest) -> schemas.UserTestRead:
+        """Convert a stored test, decoding its packed character logs."""
         return schemas.UserTestRead(
             id=db_test.id,
             user_id=db_test.user_id,
@@ -89,18 +750,24 @@ class UserTestService:
             accuracy=db_test.accuracy,
             consistency=db_test.consistency,
             test_type=db_test.test_type,
+            language=db_test.language,
             duration=db_test.duration,
             chars=db_test.chars,
             restarts=db_test.restarts,
             timestamp=db_test.timestamp,
-            char_logs=[
-                schemas.UserTestCharLogRead(
-                    id=log.id,
-                    test_id=log.test_id,
-                    char=log.char,
-                    attempts=log.attempts,
-                    errors=log.errors,
-                    total_time=log.total_time
-                ) for log in db_test.char_logs
-            ]
-        ) 
\ No newline at end of file
+            char_logs=self._char_log_reads(db_test.id, db_test.char_logs_packed)
+        )
+
+    @staticmethod
+    def _char_log_reads(test_id: str, packed: Optional[bytes]) -> List[schemas.UserTestCharLogRead]:
+        """Decode a test's packed character logs."""
+        return [
+            schemas.UserTestCharLogRead(
+                id=char_log_id(test_id, index),
+                test_id=test_id,
+                char=char,
+                attempts=attempts,
+                errors=errors,
+                total_time=total_time
+            ) for index, (char, attempts, errors, total_time) in enumerate(unpack_char_logs(packed) if packed else [])
+        ]
\ No newline at end of file
@@ -1,3 +1,20 @@
 from .text_handler import NLTKTextHandler
+from .content_engine import ContentEngine, content_engine, get_text_handler
+from .language_registry import LanguageRegistry, language_registry
+from .content_pool import ContentPool
+from .content_spec import MAX_BATCH_CONTENT, ContentSpec, ContentAddress, encode_content_id, decode_content_id
 
-__all__ = ['NLTKTextHandler'] 
\ No newline at end of file
+__all__ = [
+    'NLTKTextHandler',
+    'ContentEngine',
+    'content_engine',
+    'get_text_handler',
+    'LanguageRegistry',
+    'language_registry',
+    'ContentPool',
+    'MAX_BATCH_CONTENT',
+    'ContentSpec',
+    'ContentAddress',
+    'encode_content_id',
+    'decode_content_id',
+]
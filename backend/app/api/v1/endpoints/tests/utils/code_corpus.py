@@ -0,0 +1,156 @@
+"""
+Bundled source code corpus for code mode.
+
+Each directory under corpora/code is a language; every file in it is split into
+snippets (top-level definitions and statement groups) once, when the corpus snapshot
+is built. Snippets are then indexed by language, symbol density and line count so
+that serving code is a range lookup, not parsing.
+"""
+import os
+import re
+from typing import List, Sequence, Tuple
+
+import numpy as np
+
+CODE_CORPUS_DIR = os.path.join(os.path.dirname(__file__), "corpora", "code")
+MIN_SNIPPET_LINES = 2
+MAX_SNIPPET_LINES = 24
+TIERS = 3  # Symbol density tiers per language, served as the easy/medium/hard levels
+
+# Brackets outside string literals and comments. Single-quoted literals are capped at
+# two characters so Rust lifetimes ('a) are not mistaken for the start of a string.
+_BRACKETS = re.compile(
+    r'"(?:\\.|[^"\\])*"|`(?:\\.|[^`\\])*`|\'(?:\\.|[^\'\\]){0,2}\'|//.*|#.*|/\*.*?\*/|([(\[{])|([)\]}])'
+)
+_TOKENS = re.compile(r"[A-Za-z_]\w*|\d+(?:\.\d+)?|[^\w\s]")
+
+
+def _bracket_delta(line: str) -> int:
+    delta = 0
+    for match in _BRACKETS.finditer(line):
+        if match.group(1):
+            delta += 1
+        elif match.group(2):
+            delta -= 1
+    return delta
+
+
+def _indent(line: str) -> int:
+    return len(line) - len(line.lstrip(" "))
+
+
+def _dedent(lines: List[str]) -> List[str]:
+    margin = min((_indent(line) for line in lines if line), default=0)
+    return [line[margin:] for line in lines]
+
+
+def split_snippets(source: str) -> List[str]:
+    """
+    Split a source file into snippets at blank lines that close a top-level block.
+
+    A blank line ends the current snippet when every bracket opened since the
+    snippet's first line is closed again and the next line is not indented deeper than
+    that first line, so blank lines inside function bodies (braced or indented) do not
+    split them. Blocks longer than MAX_SNIPPET_LINES that are wrapped in brackets (e.g.
+    a Java class) are split again from their body; other long blocks are dropped.
+
+    :param source: File contents
+    :return: Snippets with tabs expanded and trailing whitespace removed
+    """
+    lines = [line.rstrip() for line in source.expandtabs(4).splitlines()]
+    return _split_lines(lines)
+
+
+def _split_lines(lines: List[str]) -> List[str]:
+    blocks: List[List[str]] = []
+    current: List[str] = []
+    depth = 0
+    for i, line in enumerate(lines):
+        if not line:
+            following = next((l for l in lines[i + 1:] if l), None)
+            if current and depth <= 0 and (following is None or _indent(following) <= _indent(current[0])):
+                blocks.append(current)
+                current, depth = [], 0
+            elif current:
+                current.append(line)
+            continue
+        current.append(line)
+        depth += _bracket_delta(line)
+    if current:
+        blocks.append(current)
+
+    snippets = []
+    for block in blocks:
+        while block and not block[-1]:
+            block.pop()
+        if len(block) > MAX_SNIPPET_LINES:
+            if _bracket_delta(block[0]) > 0 and _bracket_delta(block[-1]) < 0:
+                snippets.extend(_split_lines(_dedent(block[1:-1])))
+        elif len(block) >= MIN_SNIPPET_LINES:
+            snippets.append("\n".join(_dedent(block)))
+    return snippets
+
+
+def symbol_density(snippet: str) -> float:
+    """Share of the snippet's tokens that are operators, brackets or punctuation."""
+    tokens = _TOKENS.findall(snippet)
+    if not tokens:
+        return 0.0
+    symbols = sum(1 for token in tokens if not (token[0].isalnum() or token[0] == "_"))
+    return symbols / len(tokens)
+
+
+def load_code_corpus(root: str = CODE_CORPUS_DIR) -> List[Tuple[str, str]]:
+    """
+    Read and split every file of the bundled code corpus.
+
+    :param root: Directory with one subdirectory per language
+    :return: (language, snippet) pairs, in a reproducible order
+    """
+    corpus = []
+    if not os.path.isdir(root):
+        return corpus
+    for language in sorted(os.listdir(root)):
+        directory = os.path.join(root, language)
+        if not os.path.isdir(directory):
+            continue
+        for filename in sorted(os.listdir(directory)):
+            path = os.path.join(directory, filename)
+            # Skip editor files and bytecode caches (e.g. __pycache__ next to Python samples)
+            if filename.startswith((".", "__")) or not os.path.isfile(path):
+                continue
+            with open(path, encoding="utf-8") as f:
+                corpus.extend((language, snippet) for snippet in split_snippets(f.read()))
+    return corpus
+
+
+def build_code_index(
+    snippets: Sequence[Tuple[str, str]]
+) -> Tuple[List[str], List[str], np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Order snippets by (language, density tier, line count).
+
+    Within each language, snippets are split into TIERS equal-sized tiers by symbol
+    density. The snippets of language l and tier t are
+    ordered[groups[l * TIERS + t]:groups[l * TIERS + t + 1]], sorted by line count.
+
+    :param snippets: (language, snippet) pairs
+    :return: (languages, ordered snippets, line counts, density in per mille, group offsets)
+    """
+    languages = sorted({language for language, _ in snippets})
+    keyed = []
+    for l, language in enumerate(languages):
+        texts = [snippet for lang, snippet in snippets if lang == language]
+        densities = [round(symbol_density(text) * 1000) for text in texts]
+        ranked = sorted(range(len(texts)), key=lambda i: (densities[i], texts[i]))
+        for rank, i in enumerate(ranked):
+            tier = rank * TIERS // len(texts)
+            keyed.append((l * TIERS + tier, texts[i].count("\n") + 1, texts[i], densities[i]))
+    keyed.sort()
+
+    group_ids = np.array([group for group, _, _, _ in keyed], dtype=np.int64)
+    groups = np.searchsorted(group_ids, np.arange(len(languages) * TIERS + 1), side="left").astype(np.uint32)
+    ordered = [text for _, _, text, _ in keyed]
+    lines = np.array([n_lines for _, n_lines, _, _ in keyed], dtype=np.uint16)
+    density = np.array([d for _, _, _, d in keyed], dtype=np.uint16)
+    return languages, ordered, lines, density, groups
@@ -0,0 +1,130 @@
+import logging
+import os
+import threading
+from contextlib import contextmanager
+from typing import Iterator, Optional
+
+from app.core.config import settings
+from .snapshot import SnapshotError, load_snapshot
+from .text_handler import NLTKTextHandler
+
+try:
+    import fcntl
+except ImportError:  # Windows: snapshot builds are not serialized across processes
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+
+@contextmanager
+def _file_lock(path: str) -> Iterator[None]:
+    """Hold an exclusive advisory lock on `path` (created if missing)."""
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "a") as f:
+        if fcntl is not None:
+            fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+
+class ContentEngine:
+    """
+    Process-wide owner of the text handler used to generate test content.
+
+    Building an NLTKTextHandler is expensive (corpus loading, frequency counting,
+    sentence tokenization), so it is built at most once per process and shared by
+    every request. Construction is lazy and guarded by a lock, so the first caller
+    (usually the startup warmup) pays the cost and concurrent callers wait for it
+    instead of building their own copy.
+
+    With a snapshot path, the handler always serves from the memory-mapped snapshot so
+    that every worker process shares one copy of the corpus through the page cache. A
+    missing or outdated snapshot is built first by exactly one process (see
+    `prepare_snapshot`); under gunicorn the master does this before forking workers.
+    """
+
+    def __init__(self, snapshot_path: Optional[str] = None) -> None:
+        self.snapshot_path = snapshot_path
+        self._handler: Optional[NLTKTextHandler] = None
+        self._lock = threading.Lock()
+        self._error: Optional[BaseException] = None
+
+    @property
+    def is_ready(self) -> bool:
+        """True once the text handler has been built and can serve content."""
+        return self._handler is not None
+
+    @property
+    def error(self) -> Optional[BaseException]:
+        """The exception raised by the last failed build, if any."""
+        return self._error
+
+    def get_handler(self) -> NLTKTextHandler:
+        """
+        Return the shared text handler, building it on first use.
+
+        :return: The process-wide NLTKTextHandler
+        """
+        handler = self._handler
+        if handler is not None:
+            return handler
+
+        with self._lock:
+            if self._handler is None:
+                try:
+                    if self.snapshot_path:
+                        self.prepare_snapshot()
+                    self._handler = NLTKTextHandler(snapshot_path=self.snapshot_path)
+                    self._error = None
+                except Exception as e:
+                    self._error = e
+                    logger.error(f"Failed to build text handler: {str(e)}", exc_info=True)
+                    raise
+            return self._handler
+
+    def prepare_snapshot(self) -> None:
+        """
+        Make sure a loadable snapshot exists at `snapshot_path`, building it from NLTK if
+        it is missing or has an unsupported format version.
+
+        Safe to call from several processes at once: builders serialize on a lock file
+        next to the snapshot and re-check it after acquiring the lock, so only the first
+        one builds and the rest map its result. If the snapshot cannot be written, the
+        error is logged and handlers fall back to building the corpus in memory.
+        """
+        if not self.snapshot_path or self._snapshot_is_valid():
+            return
+        try:
+            with _file_lock(f"{self.snapshot_path}.lock"):
+                if self._snapshot_is_valid():
+                    return
+                logger.info(f"Building corpus snapshot at {self.snapshot_path}...")
+                NLTKTextHandler().save_snapshot(self.snapshot_path)
+        except OSError as e:
+            logger.warning(f"Cannot write corpus snapshot to {self.snapshot_path}: {str(e)}")
+
+    def _snapshot_is_valid(self) -> bool:
+        try:
+            load_snapshot(self.snapshot_path)
+            return True
+        except SnapshotError:
+            return False
+
+    def warmup(self) -> None:
+        """Build the text handler ahead of the first request. Errors are logged, not raised."""
+        try:
+            self.get_handler()
+            logger.info("Content engine ready")
+        except Exception:
+            pass
+
+
+content_engine = ContentEngine(snapshot_path=settings.CORPUS_SNAPSHOT_PATH)
+
+
+def get_text_handler() -> NLTKTextHandler:
+    """FastAPI dependency returning the shared text handler."""
+    return content_engine.get_handler()
@@ -0,0 +1,112 @@
+import asyncio
+import logging
+import threading
+from collections import OrderedDict, deque
+from typing import Callable, Deque, Dict, List, Optional
+
+from .content_spec import ContentSpec
+
+logger = logging.getLogger(__name__)
+
+
+class ContentPool:
+    """
+    Ring buffers of ready-to-serve, JSON-encoded test content.
+
+    Each distinct ContentSpec gets a bounded deque of payloads. Requests pop from the
+    deque; a background task refills every buffer that fell below its low watermark,
+    so serving content is a dict lookup and a popleft. A spec gets a buffer once the
+    caller registers it after a miss, and the least recently requested specs are
+    dropped once `max_keys` is exceeded.
+    """
+
+    def __init__(
+        self,
+        generate: Callable[[ContentSpec, int], List[bytes]],
+        capacity: int = 16,
+        max_keys: int = 256,
+        refill_interval: float = 0.05,
+    ) -> None:
+        """
+        :param generate: Callable producing `n` encoded payloads for a spec
+        :param capacity: Maximum number of payloads buffered per spec
+        :param max_keys: Maximum number of specs with a buffer
+        :param refill_interval: Seconds between refill passes of the background task
+        """
+        self.generate = generate
+        self.capacity = capacity
+        self.max_keys = max_keys
+        self.refill_interval = refill_interval
+        self.low_watermark = max(1, capacity // 2)
+        self.hits = 0
+        self.misses = 0
+        self._buffers: "OrderedDict[ContentSpec, Deque[bytes]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def pop(self, spec: ContentSpec) -> Optional[bytes]:
+        """
+        Take a payload for `spec` from its buffer.
+
+        :return: An encoded payload, or None on a miss (the caller generates one itself
+            and then registers the spec)
+        """
+        with self._lock:
+            buffer = self._buffers.get(spec)
+            if buffer is not None:
+                self._buffers.move_to_end(spec)
+        if buffer is None:
+            self.misses += 1
+            return None
+        try:
+            payload = buffer.popleft()
+        except IndexError:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return payload
+
+    def register(self, spec: ContentSpec) -> None:
+        """
+        Give `spec` a buffer, filled by the next refill pass. Only call this once
+        content for the spec was generated successfully, so that invalid specs never
+        take a key or refill work away from valid ones.
+        """
+        with self._lock:
+            if spec in self._buffers:
+                return
+            self._buffers[spec] = deque(maxlen=self.capacity)
+            while len(self._buffers) > self.max_keys:
+                self._buffers.popitem(last=False)
+
+    def refill(self) -> None:
+        """Top up every buffer below its low watermark. Runs in a worker thread."""
+        with self._lock:
+            pending = [(spec, buffer) for spec, buffer in self._buffers.items() if len(buffer) < self.low_watermark]
+        for spec, buffer in pending:
+            try:
+                buffer.extend(self.generate(spec, self.capacity - len(buffer)))
+            except Exception as e:
+                logger.warning(f"Dropping content pool key {spec}: {str(e)}")
+                with self._lock:
+                    self._buffers.pop(spec, None)
+
+    async def run(self, is_ready: Callable[[], bool] = lambda: True) -> None:
+        """Background refill loop. Cancel the task to stop it."""
+        while True:
+            await asyncio.sleep(self.refill_interval)
+            if is_ready():
+                await asyncio.to_thread(self.refill)
+
+    def stats(self) -> Dict[str, float]:
+        total = self.hits + self.misses
+        with self._lock:
+            buffered = sum(len(buffer) for buffer in self._buffers.values())
+            keys = len(self._buffers)
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "keys": keys,
+            "buffered": buffered,
+            "capacity": self.capacity,
+        }
@@ -0,0 +1,136 @@
+from typing import NamedTuple, Optional
+
+CONTENT_ID_VERSION = "v1"
+MAX_BATCH_CONTENT = 100  # Most pieces of content generated in one batch, and so the largest `n` of an id
+_MAX_INT_DIGITS = 6  # Longest decimal field accepted in an id; each field's own range is checked by the service
+_MAX_SEED_DIGITS = 16  # Seeds are 64-bit
+
+
+class ContentSpec(NamedTuple):
+    """
+    Normalized parameters identifying one kind of test content.
+
+    New fields must be appended with a default of None or False so that content ids
+    issued before the field existed keep decoding to the same spec.
+    """
+    mode: str
+    level: Optional[str] = None
+    count: Optional[int] = None
+    include_numbers: bool = False
+    include_punctuation: bool = False
+    target_chars: Optional[int] = None
+    target_words: Optional[int] = None
+    code_language: Optional[str] = None
+    difficulty_min: Optional[int] = None
+    difficulty_max: Optional[int] = None
+    layout: Optional[str] = None
+    language: Optional[str] = None  # None for the default language
+
+
+_FIELD_TYPES = {
+    "mode": str,
+    "level": str,
+    "count": int,
+    "include_numbers": bool,
+    "include_punctuation": bool,
+    "target_chars": int,
+    "target_words": int,
+    "code_language": str,
+    "difficulty_min": int,
+    "difficulty_max": int,
+    "layout": str,
+    "language": str,
+}
+
+
+class ContentAddress(NamedTuple):
+    """
+    Everything needed to regenerate one piece of content deterministically: the corpus
+    fingerprint, the spec, and the seed of the batch it was generated in together with
+    the batch size and its row within the batch.
+    """
+    fingerprint: str
+    spec: ContentSpec
+    seed: int
+    n: int = 1
+    row: int = 0
+
+
+def _encode_field(value) -> str:
+    if value is None:
+        return "-"
+    if isinstance(value, bool):
+        return "1" if value else "0"
+    return str(value)
+
+
+def _decode_field(name: str, value: str):
+    if value == "-":
+        return None
+    field_type = _FIELD_TYPES[name]
+    if field_type is bool:
+        if value not in ("0", "1"):
+            raise ValueError(value)
+        return value == "1"
+    if field_type is int:
+        return _decode_int(value)
+    return field_type(value)
+
+
+def _decode_int(value: str, max_digits: int = _MAX_INT_DIGITS, base: int = 10) -> int:
+    """Parse a non-negative int of at most `max_digits` digits, without signs, spaces or underscores."""
+    digits = "0123456789abcdef"[:base]
+    if not 0 < len(value) <= max_digits or value.strip(digits):
+        raise ValueError(value)
+    return int(value, base)
+
+
+def encode_content_id(address: ContentAddress) -> str:
+    """
+    Encode a content address as a URL-safe id:
+    ``v1.<fingerprint>.<seed>.<n>.<row>.<spec fields...>``, e.g.
+    ``v1.3f1c9a0b2d4e5f60.9c0ffee.16.3.words.easy.25.0.0``. Trailing spec fields
+    that hold their default value are omitted.
+    """
+    fields = [_encode_field(value) for value in address.spec]
+    defaults = [_encode_field(ContentSpec._field_defaults.get(name)) for name in ContentSpec._fields]
+    while len(fields) > 1 and fields[-1] == defaults[len(fields) - 1]:
+        fields.pop()
+    return ".".join([
+        CONTENT_ID_VERSION,
+        address.fingerprint,
+        format(address.seed, "x"),
+        str(address.n),
+        str(address.row),
+        *fields,
+    ])
+
+
+def decode_content_id(content_id: str) -> ContentAddress:
+    """
+    Parse an id produced by encode_content_id. Ids come from clients, so the batch
+    size is bounded by MAX_BATCH_CONTENT and numbers by their length before anything
+    is regenerated from them.
+
+    :raises ValueError: If the id is malformed or out of range
+    """
+    parts = content_id.split(".")
+    field_values = parts[5:]
+    if len(parts) < 6 or parts[0] != CONTENT_ID_VERSION or len(field_values) > len(ContentSpec._fields):
+        raise ValueError(f"Malformed content id '{content_id}'")
+    try:
+        spec = ContentSpec(*(
+            _decode_field(name, value) for name, value in zip(ContentSpec._fields, field_values)
+        ))
+        address = ContentAddress(
+            fingerprint=parts[1],
+            spec=spec,
+            seed=_decode_int(parts[2], _MAX_SEED_DIGITS, 16),
+            n=_decode_int(parts[3]),
+            row=_decode_int(parts[4]),
+        )
+    except (ValueError, TypeError):
+        raise ValueError(f"Malformed content id '{content_id}'")
+    if not 0 <= address.row < address.n <= MAX_BATCH_CONTENT:
+        raise ValueError(f"Malformed content id '{content_id}'")
+    return address
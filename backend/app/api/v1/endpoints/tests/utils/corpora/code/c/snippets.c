@@ -0,0 +1,136 @@
+#include <stdio.h>
+#include <stdlib.h>
+#include <string.h>
+#include <ctype.h>
+
+struct node {
+    int value;
+    struct node *next;
+};
+
+struct node *push(struct node *head, int value)
+{
+    struct node *n = malloc(sizeof(*n));
+    if (n == NULL) {
+        perror("malloc");
+        exit(EXIT_FAILURE);
+    }
+    n->value = value;
+    n->next = head;
+    return n;
+}
+
+void free_list(struct node *head)
+{
+    while (head != NULL) {
+        struct node *next = head->next;
+        free(head);
+        head = next;
+    }
+}
+
+size_t my_strlen(const char *s)
+{
+    const char *p = s;
+    while (*p)
+        p++;
+    return (size_t)(p - s);
+}
+
+void reverse(char *s)
+{
+    for (size_t i = 0, j = strlen(s); i + 1 < j; i++, j--) {
+        char tmp = s[i];
+        s[i] = s[j - 1];
+        s[j - 1] = tmp;
+    }
+}
+
+int binary_search(const int *a, int n, int key)
+{
+    int lo = 0, hi = n - 1;
+    while (lo <= hi) {
+        int mid = lo + (hi - lo) / 2;
+        if (a[mid] == key)
+            return mid;
+        else if (a[mid] < key)
+            lo = mid + 1;
+        else
+            hi = mid - 1;
+    }
+    return -1;
+}
+
+static int compare_ints(const void *a, const void *b)
+{
+    int x = *(const int *)a, y = *(const int *)b;
+    return (x > y) - (x < y);
+}
+
+int count_words(FILE *fp)
+{
+    int c, words = 0, in_word = 0;
+    while ((c = fgetc(fp)) != EOF) {
+        if (isspace(c)) {
+            in_word = 0;
+        } else if (!in_word) {
+            in_word = 1;
+            words++;
+        }
+    }
+    return words;
+}
+
+#define MAX(a, b) ((a) > (b) ? (a) : (b))
+#define ARRAY_SIZE(arr) (sizeof(arr) / sizeof((arr)[0]))
+
+typedef struct {
+    double x, y;
+} point_t;
+
+typedef struct {
+    char *data;
+    size_t len, cap;
+} buffer_t;
+
+int buffer_append(buffer_t *buf, const char *s, size_t n)
+{
+    if (buf->len + n > buf->cap) {
+        size_t cap = buf->cap ? buf->cap * 2 : 64;
+        while (cap < buf->len + n)
+            cap *= 2;
+        char *data = realloc(buf->data, cap);
+        if (!data)
+            return -1;
+        buf->data = data;
+        buf->cap = cap;
+    }
+    memcpy(buf->data + buf->len, s, n);
+    buf->len += n;
+    return 0;
+}
+
+unsigned long hash(const unsigned char *str)
+{
+    unsigned long h = 5381;
+    int c;
+    while ((c = *str++))
+        h = ((h << 5) + h) + c;
+    return h;
+}
+
+int main(int argc, char *argv[])
+{
+    if (argc < 2) {
+        fprintf(stderr, "usage: %s <file>\n", argv[0]);
+        return 1;
+    }
+    FILE *fp = fopen(argv[1], "r");
+    if (!fp) {
+        perror(argv[1]);
+        return 1;
+    }
+    printf("%d words\n", count_words(fp));
+    fclose(fp);
+    return 0;
+}
@@ -0,0 +1,137 @@
+package main
+
+import (
+	"encoding/json"
+	"errors"
+	"fmt"
+	"net/http"
+	"sort"
+	"strings"
+	"sync"
+	"time"
+)
+
+type User struct {
+	ID        int       `json:"id"`
+	Name      string    `json:"name"`
+	Email     string    `json:"email"`
+	CreatedAt time.Time `json:"created_at"`
+}
+
+var ErrNotFound = errors.New("not found")
+
+func reverse(s string) string {
+	runes := []rune(s)
+	for i, j := 0, len(runes)-1; i < j; i, j = i+1, j-1 {
+		runes[i], runes[j] = runes[j], runes[i]
+	}
+	return string(runes)
+}
+
+type Counter struct {
+	mu    sync.Mutex
+	count map[string]int
+}
+
+func (c *Counter) Inc(key string) {
+	c.mu.Lock()
+	defer c.mu.Unlock()
+	c.count[key]++
+}
+
+func handleUser(w http.ResponseWriter, r *http.Request) {
+	id := strings.TrimPrefix(r.URL.Path, "/users/")
+	user, err := store.Find(id)
+	if errors.Is(err, ErrNotFound) {
+		http.Error(w, "user not found", http.StatusNotFound)
+		return
+	}
+	w.Header().Set("Content-Type", "application/json")
+	json.NewEncoder(w).Encode(user)
+}
+
+func worker(id int, jobs <-chan int, results chan<- int) {
+	for j := range jobs {
+		fmt.Printf("worker %d processing job %d\n", id, j)
+		time.Sleep(time.Millisecond * 100)
+		results <- j * 2
+	}
+}
+
+func topWords(counts map[string]int, n int) []string {
+	words := make([]string, 0, len(counts))
+	for w := range counts {
+		words = append(words, w)
+	}
+	sort.Slice(words, func(i, j int) bool {
+		return counts[words[i]] > counts[words[j]]
+	})
+	if len(words) > n {
+		words = words[:n]
+	}
+	return words
+}
+
+type Shape interface {
+	Area() float64
+	Perimeter() float64
+}
+
+type Rect struct {
+	Width, Height float64
+}
+
+func (r Rect) Area() float64      { return r.Width * r.Height }
+func (r Rect) Perimeter() float64 { return 2 * (r.Width + r.Height) }
+
+func fetchAll(urls []string) map[string]int {
+	var wg sync.WaitGroup
+	var mu sync.Mutex
+	status := make(map[string]int)
+	for _, url := range urls {
+		wg.Add(1)
+		go func(u string) {
+			defer wg.Done()
+			resp, err := http.Get(u)
+			if err != nil {
+				return
+			}
+			defer resp.Body.Close()
+			mu.Lock()
+			status[u] = resp.StatusCode
+			mu.Unlock()
+		}(url)
+	}
+	wg.Wait()
+	return status
+}
+
+func withTimeout(d time.Duration, task func() error) error {
+	done := make(chan error, 1)
+	go func() { done <- task() }()
+	select {
+	case err := <-done:
+		return err
+	case <-time.After(d):
+		return fmt.Errorf("timed out after %v", d)
+	}
+}
+
+func Filter[T any](items []T, keep func(T) bool) []T {
+	var out []T
+	for _, item := range items {
+		if keep(item) {
+			out = append(out, item)
+		}
+	}
+	return out
+}
+
+func main() {
+	mux := http.NewServeMux()
+	mux.HandleFunc("/users/", handleUser)
+	server := &http.Server{Addr: ":8080", Handler: mux, ReadTimeout: 5 * time.Second}
+	if err := server.ListenAndServe(); err != nil {
+		fmt.Println("server error:", err)
+	}
+}
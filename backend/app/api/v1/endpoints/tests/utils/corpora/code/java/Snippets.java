@@ -0,0 +1,130 @@
+public class Snippets {
+
+    public static int binarySearch(int[] items, int target) {
+        int lo = 0, hi = items.length - 1;
+        while (lo <= hi) {
+            int mid = (lo + hi) >>> 1;
+            if (items[mid] == target) return mid;
+            if (items[mid] < target) lo = mid + 1;
+            else hi = mid - 1;
+        }
+        return -1;
+    }
+
+    public record Point(double x, double y) {
+        public double distanceTo(Point other) {
+            return Math.hypot(x - other.x(), y - other.y());
+        }
+    }
+
+    public static Map<String, Long> wordCounts(List<String> lines) {
+        return lines.stream()
+                .flatMap(line -> Arrays.stream(line.toLowerCase().split("\\s+")))
+                .filter(word -> !word.isBlank())
+                .collect(Collectors.groupingBy(Function.identity(), Collectors.counting()));
+    }
+
+    public interface Repository<T, ID> {
+        Optional<T> findById(ID id);
+        List<T> findAll();
+        T save(T entity);
+        void deleteById(ID id);
+    }
+
+    public static String readFile(Path path) throws IOException {
+        try (BufferedReader reader = Files.newBufferedReader(path, StandardCharsets.UTF_8)) {
+            StringBuilder sb = new StringBuilder();
+            String line;
+            while ((line = reader.readLine()) != null) {
+                sb.append(line).append('\n');
+            }
+            return sb.toString();
+        }
+    }
+
+    public static class LruCache<K, V> extends LinkedHashMap<K, V> {
+        private final int capacity;
+
+        public LruCache(int capacity) {
+            super(16, 0.75f, true);
+            this.capacity = capacity;
+        }
+
+        @Override
+        protected boolean removeEldestEntry(Map.Entry<K, V> eldest) {
+            return size() > capacity;
+        }
+    }
+
+    public enum Status {
+        ACTIVE("active"), SUSPENDED("suspended"), DELETED("deleted");
+
+        private final String label;
+
+        Status(String label) {
+            this.label = label;
+        }
+
+        public String label() {
+            return label;
+        }
+    }
+
+    @RestController
+    @RequestMapping("/api/users")
+    public static class UserController {
+        private final UserService service;
+
+        public UserController(UserService service) {
+            this.service = service;
+        }
+
+        @GetMapping("/{id}")
+        public ResponseEntity<User> get(@PathVariable Long id) {
+            return service.find(id)
+                    .map(ResponseEntity::ok)
+                    .orElse(ResponseEntity.notFound().build());
+        }
+    }
+
+    public static boolean isPalindrome(String s) {
+        int i = 0, j = s.length() - 1;
+        while (i < j) {
+            if (Character.toLowerCase(s.charAt(i++)) != Character.toLowerCase(s.charAt(j--))) {
+                return false;
+            }
+        }
+        return true;
+    }
+
+    public static List<List<Integer>> chunk(List<Integer> items, int size) {
+        List<List<Integer>> chunks = new ArrayList<>();
+        for (int i = 0; i < items.size(); i += size) {
+            chunks.add(items.subList(i, Math.min(i + size, items.size())));
+        }
+        return chunks;
+    }
+
+    public static CompletableFuture<String> fetchAsync(HttpClient client, URI uri) {
+        HttpRequest request = HttpRequest.newBuilder(uri)
+                .header("Accept", "application/json")
+                .timeout(Duration.ofSeconds(10))
+                .build();
+        return client.sendAsync(request, HttpResponse.BodyHandlers.ofString())
+                .thenApply(HttpResponse::body);
+    }
+
+    public static long factorial(int n) {
+        if (n < 0) {
+            throw new IllegalArgumentException("n must be non-negative: " + n);
+        }
+        return n <= 1 ? 1 : n * factorial(n - 1);
+    }
+
+    public static void main(String[] args) {
+        List<String> names = List.of("Ada", "Grace", "Linus", "Barbara");
+        names.stream()
+                .sorted(Comparator.comparing(String::length).thenComparing(Comparator.naturalOrder()))
+                .forEach(name -> System.out.printf("%-10s %d%n", name, name.length()));
+    }
+}
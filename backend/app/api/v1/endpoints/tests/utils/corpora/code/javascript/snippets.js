@@ -0,0 +1,145 @@
+function debounce(fn, wait) {
+  let timer = null;
+  return function (...args) {
+    clearTimeout(timer);
+    timer = setTimeout(() => fn.apply(this, args), wait);
+  };
+}
+
+const sum = (numbers) => numbers.reduce((total, n) => total + n, 0);
+const average = (numbers) => (numbers.length ? sum(numbers) / numbers.length : 0);
+
+async function fetchJson(url, options = {}) {
+  const response = await fetch(url, {
+    headers: { "Content-Type": "application/json" },
+    ...options,
+  });
+  if (!response.ok) {
+    throw new Error(`Request failed with status ${response.status}`);
+  }
+  return response.json();
+}
+
+class EventEmitter {
+  constructor() {
+    this.listeners = new Map();
+  }
+
+  on(event, callback) {
+    if (!this.listeners.has(event)) {
+      this.listeners.set(event, []);
+    }
+    this.listeners.get(event).push(callback);
+    return () => this.off(event, callback);
+  }
+
+  off(event, callback) {
+    const callbacks = this.listeners.get(event) || [];
+    this.listeners.set(event, callbacks.filter((cb) => cb !== callback));
+  }
+
+  emit(event, ...args) {
+    for (const callback of this.listeners.get(event) || []) {
+      callback(...args);
+    }
+  }
+}
+
+const users = [
+  { id: 1, name: "Ada", role: "admin" },
+  { id: 2, name: "Linus", role: "user" },
+  { id: 3, name: "Grace", role: "admin" },
+];
+const admins = users.filter((u) => u.role === "admin").map((u) => u.name);
+
+function deepClone(value) {
+  if (value === null || typeof value !== "object") {
+    return value;
+  }
+  if (Array.isArray(value)) {
+    return value.map(deepClone);
+  }
+  return Object.fromEntries(
+    Object.entries(value).map(([key, inner]) => [key, deepClone(inner)])
+  );
+}
+
+document.querySelector("#search").addEventListener("input", (event) => {
+  const query = event.target.value.trim().toLowerCase();
+  for (const item of document.querySelectorAll(".result")) {
+    item.hidden = !item.textContent.toLowerCase().includes(query);
+  }
+});
+
+function chunk(array, size) {
+  const result = [];
+  for (let i = 0; i < array.length; i += size) {
+    result.push(array.slice(i, i + size));
+  }
+  return result;
+}
+
+const formatter = new Intl.NumberFormat("en-US", {
+  style: "currency",
+  currency: "USD",
+  minimumFractionDigits: 2,
+});
+console.log(formatter.format(1234.5));
+
+export function groupBy(items, keyFn) {
+  return items.reduce((groups, item) => {
+    const key = keyFn(item);
+    (groups[key] ||= []).push(item);
+    return groups;
+  }, {});
+}
+
+function memoize(fn) {
+  const cache = new Map();
+  return (arg) => {
+    if (!cache.has(arg)) {
+      cache.set(arg, fn(arg));
+    }
+    return cache.get(arg);
+  };
+}
+
+const sleep = (ms) => new Promise((resolve) => setTimeout(resolve, ms));
+
+async function retry(task, attempts = 3) {
+  for (let i = 0; i < attempts; i++) {
+    try {
+      return await task();
+    } catch (err) {
+      if (i === attempts - 1) throw err;
+      await sleep(2 ** i * 100);
+    }
+  }
+}
+
+const { name, age = 30, ...rest } = person;
+const merged = { ...defaults, ...overrides, updatedAt: Date.now() };
+const [first, second, ...others] = scores.sort((a, b) => b - a);
+
+function useCounter(initial = 0) {
+  const [count, setCount] = useState(initial);
+  const increment = useCallback(() => setCount((c) => c + 1), []);
+  const reset = useCallback(() => setCount(initial), [initial]);
+  return { count, increment, reset };
+}
+
+app.get("/api/users/:id", async (req, res, next) => {
+  try {
+    const user = await db.users.findById(req.params.id);
+    if (!user) return res.status(404).json({ error: "Not found" });
+    res.json(user);
+  } catch (err) {
+    next(err);
+  }
+});
+
+function capitalize(str) {
+  return str.charAt(0).toUpperCase() + str.slice(1);
+}
+
+const uniqueTags = [...new Set(posts.flatMap((post) => post.tags))].sort();
@@ -0,0 +1,182 @@
+def binary_search(items, target):
+    lo, hi = 0, len(items) - 1
+    while lo <= hi:
+        mid = (lo + hi) // 2
+        if items[mid] == target:
+            return mid
+        if items[mid] < target:
+            lo = mid + 1
+        else:
+            hi = mid - 1
+    return -1
+
+
+def word_counts(text):
+    counts = {}
+    for word in text.lower().split():
+        word = word.strip(".,;:!?\"'")
+        if word:
+            counts[word] = counts.get(word, 0) + 1
+    return sorted(counts.items(), key=lambda kv: (-kv[1], kv[0]))
+
+
+class Stack:
+    def __init__(self):
+        self._items = []
+
+    def push(self, item):
+        self._items.append(item)
+
+    def pop(self):
+        if not self._items:
+            raise IndexError("pop from empty stack")
+        return self._items.pop()
+
+    def __len__(self):
+        return len(self._items)
+
+
+def fibonacci(n):
+    a, b = 0, 1
+    for _ in range(n):
+        yield a
+        a, b = b, a + b
+
+
+def flatten(nested):
+    result = []
+    for item in nested:
+        if isinstance(item, (list, tuple)):
+            result.extend(flatten(item))
+        else:
+            result.append(item)
+    return result
+
+
+@dataclass(frozen=True)
+class Point:
+    x: float
+    y: float
+
+    def distance_to(self, other: "Point") -> float:
+        return math.hypot(self.x - other.x, self.y - other.y)
+
+
+def read_config(path: str) -> dict:
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    data.setdefault("debug", False)
+    data["port"] = int(data.get("port", 8000))
+    return data
+
+
+def chunked(iterable, size):
+    chunk = []
+    for item in iterable:
+        chunk.append(item)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+squares = {n: n ** 2 for n in range(10) if n % 2 == 0}
+names = [user["name"].title() for user in users if user.get("active")]
+total = sum(price * qty for price, qty in zip(prices, quantities))
+
+
+def retry(times=3, delay=0.5):
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            for attempt in range(times):
+                try:
+                    return func(*args, **kwargs)
+                except ConnectionError:
+                    if attempt == times - 1:
+                        raise
+                    time.sleep(delay * 2 ** attempt)
+        return wrapper
+    return decorator
+
+
+async def fetch_all(session, urls):
+    async def fetch(url):
+        async with session.get(url, timeout=10) as response:
+            response.raise_for_status()
+            return await response.json()
+    return await asyncio.gather(*(fetch(url) for url in urls))
+
+
+def merge_sorted(left, right):
+    merged, i, j = [], 0, 0
+    while i < len(left) and j < len(right):
+        if left[i] <= right[j]:
+            merged.append(left[i])
+            i += 1
+        else:
+            merged.append(right[j])
+            j += 1
+    return merged + left[i:] + right[j:]
+
+
+class LRUCache:
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.data = OrderedDict()
+
+    def get(self, key):
+        if key not in self.data:
+            return None
+        self.data.move_to_end(key)
+        return self.data[key]
+
+    def put(self, key, value):
+        self.data[key] = value
+        self.data.move_to_end(key)
+        if len(self.data) > self.capacity:
+            self.data.popitem(last=False)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Resize images in bulk.")
+    parser.add_argument("paths", nargs="+", help="image files to resize")
+    parser.add_argument("--width", type=int, default=800)
+    parser.add_argument("--quality", type=int, choices=range(1, 101), default=85)
+    parser.add_argument("-v", "--verbose", action="store_true")
+    return parser.parse_args(argv)
+
+
+def is_palindrome(s: str) -> bool:
+    cleaned = [c.lower() for c in s if c.isalnum()]
+    return cleaned == cleaned[::-1]
+
+
+def group_by(records, key):
+    groups = defaultdict(list)
+    for record in records:
+        groups[record[key]].append(record)
+    return dict(groups)
+
+
+with open("report.csv", "w", newline="") as f:
+    writer = csv.DictWriter(f, fieldnames=["id", "name", "score"])
+    writer.writeheader()
+    for row in rows:
+        writer.writerow({"id": row.id, "name": row.name, "score": f"{row.score:.2f}"})
+
+
+def matrix_multiply(a, b):
+    rows, cols, inner = len(a), len(b[0]), len(b)
+    result = [[0] * cols for _ in range(rows)]
+    for i in range(rows):
+        for j in range(cols):
+            result[i][j] = sum(a[i][k] * b[k][j] for k in range(inner))
+    return result
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    logging.basicConfig(level=logging.DEBUG if args.verbose else logging.INFO)
+    main(args)
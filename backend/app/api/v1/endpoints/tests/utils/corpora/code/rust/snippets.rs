@@ -0,0 +1,143 @@
+use std::collections::HashMap;
+use std::fmt;
+use std::fs;
+use std::io::{self, BufRead};
+
+#[derive(Debug, Clone, PartialEq)]
+pub struct Point {
+    pub x: f64,
+    pub y: f64,
+}
+
+impl Point {
+    pub fn new(x: f64, y: f64) -> Self {
+        Self { x, y }
+    }
+
+    pub fn distance(&self, other: &Point) -> f64 {
+        ((self.x - other.x).powi(2) + (self.y - other.y).powi(2)).sqrt()
+    }
+}
+
+fn word_count(text: &str) -> HashMap<String, usize> {
+    let mut counts = HashMap::new();
+    for word in text.split_whitespace() {
+        *counts.entry(word.to_lowercase()).or_insert(0) += 1;
+    }
+    counts
+}
+
+#[derive(Debug)]
+enum Shape {
+    Circle { radius: f64 },
+    Rectangle { width: f64, height: f64 },
+    Triangle(f64, f64, f64),
+}
+
+impl Shape {
+    fn area(&self) -> f64 {
+        match self {
+            Shape::Circle { radius } => std::f64::consts::PI * radius * radius,
+            Shape::Rectangle { width, height } => width * height,
+            Shape::Triangle(a, b, c) => {
+                let s = (a + b + c) / 2.0;
+                (s * (s - a) * (s - b) * (s - c)).sqrt()
+            }
+        }
+    }
+}
+
+fn read_lines(path: &str) -> io::Result<Vec<String>> {
+    let file = fs::File::open(path)?;
+    io::BufReader::new(file).lines().collect()
+}
+
+pub fn binary_search<T: Ord>(items: &[T], target: &T) -> Option<usize> {
+    let (mut lo, mut hi) = (0, items.len());
+    while lo < hi {
+        let mid = lo + (hi - lo) / 2;
+        match items[mid].cmp(target) {
+            std::cmp::Ordering::Equal => return Some(mid),
+            std::cmp::Ordering::Less => lo = mid + 1,
+            std::cmp::Ordering::Greater => hi = mid,
+        }
+    }
+    None
+}
+
+impl fmt::Display for Point {
+    fn fmt(&self, f: &mut fmt::Formatter<'_>) -> fmt::Result {
+        write!(f, "({:.2}, {:.2})", self.x, self.y)
+    }
+}
+
+#[derive(Debug)]
+pub enum ConfigError {
+    Missing(String),
+    Invalid { key: String, value: String },
+}
+
+fn parse_port(value: &str) -> Result<u16, ConfigError> {
+    value.parse::<u16>().map_err(|_| ConfigError::Invalid {
+        key: "port".to_string(),
+        value: value.to_string(),
+    })
+}
+
+let evens: Vec<u32> = (1..=20).filter(|n| n % 2 == 0).collect();
+let total: u32 = evens.iter().map(|n| n * n).sum();
+let names: Vec<&str> = users.iter().filter_map(|u| u.name.as_deref()).collect();
+
+pub trait Summary {
+    fn author(&self) -> String;
+
+    fn summarize(&self) -> String {
+        format!("(Read more from {}...)", self.author())
+    }
+}
+
+struct Stack<T> {
+    items: Vec<T>,
+}
+
+impl<T> Stack<T> {
+    fn push(&mut self, item: T) {
+        self.items.push(item);
+    }
+
+    fn pop(&mut self) -> Option<T> {
+        self.items.pop()
+    }
+
+    fn peek(&self) -> Option<&T> {
+        self.items.last()
+    }
+}
+
+fn longest<'a>(x: &'a str, y: &'a str) -> &'a str {
+    if x.len() > y.len() { x } else { y }
+}
+
+#[cfg(test)]
+mod tests {
+    use super::*;
+
+    #[test]
+    fn finds_existing_item() {
+        let items = [1, 3, 5, 7, 9];
+        assert_eq!(binary_search(&items, &7), Some(3));
+        assert_eq!(binary_search(&items, &4), None);
+    }
+}
+
+fn main() -> Result<(), Box<dyn std::error::Error>> {
+    let args: Vec<String> = std::env::args().collect();
+    let path = args.get(1).ok_or("usage: wc <file>")?;
+    let text = fs::read_to_string(path)?;
+    let mut counts: Vec<_> = word_count(&text).into_iter().collect();
+    counts.sort_by(|a, b| b.1.cmp(&a.1));
+    for (word, count) in counts.iter().take(10) {
+        println!("{:>8} {}", count, word);
+    }
+    Ok(())
+}
@@ -0,0 +1,137 @@
+interface User {
+  id: string;
+  email: string;
+  username: string;
+  createdAt: Date;
+  roles?: string[];
+}
+
+type Result<T, E = Error> =
+  | { ok: true; value: T }
+  | { ok: false; error: E };
+
+function parseNumber(input: string): Result<number> {
+  const value = Number(input);
+  if (Number.isNaN(value)) {
+    return { ok: false, error: new Error(`Not a number: ${input}`) };
+  }
+  return { ok: true, value };
+}
+
+export class Queue<T> {
+  private items: T[] = [];
+
+  enqueue(item: T): void {
+    this.items.push(item);
+  }
+
+  dequeue(): T | undefined {
+    return this.items.shift();
+  }
+
+  get size(): number {
+    return this.items.length;
+  }
+}
+
+enum Direction {
+  Up = "UP",
+  Down = "DOWN",
+  Left = "LEFT",
+  Right = "RIGHT",
+}
+
+function pick<T extends object, K extends keyof T>(obj: T, keys: K[]): Pick<T, K> {
+  const result = {} as Pick<T, K>;
+  for (const key of keys) {
+    result[key] = obj[key];
+  }
+  return result;
+}
+
+export async function getUser(id: string): Promise<User | null> {
+  const response = await fetch(`/api/users/${encodeURIComponent(id)}`);
+  if (response.status === 404) {
+    return null;
+  }
+  return (await response.json()) as User;
+}
+
+const statusLabels: Record<"idle" | "running" | "done", string> = {
+  idle: "Waiting",
+  running: "In progress",
+  done: "Finished",
+};
+
+type DeepPartial<T> = {
+  [P in keyof T]?: T[P] extends object ? DeepPartial<T[P]> : T[P];
+};
+
+function assertNever(value: never): never {
+  throw new Error(`Unexpected value: ${JSON.stringify(value)}`);
+}
+
+export function useDebounce<T>(value: T, delay = 300): T {
+  const [debounced, setDebounced] = useState<T>(value);
+  useEffect(() => {
+    const timer = setTimeout(() => setDebounced(value), delay);
+    return () => clearTimeout(timer);
+  }, [value, delay]);
+  return debounced;
+}
+
+abstract class Shape {
+  abstract area(): number;
+
+  describe(): string {
+    return `${this.constructor.name} with area ${this.area().toFixed(2)}`;
+  }
+}
+
+class Circle extends Shape {
+  constructor(private readonly radius: number) {
+    super();
+  }
+
+  area(): number {
+    return Math.PI * this.radius ** 2;
+  }
+}
+
+const totals = orders
+  .filter((order): order is PaidOrder => order.status === "paid")
+  .reduce<Map<string, number>>((acc, order) => {
+    acc.set(order.customerId, (acc.get(order.customerId) ?? 0) + order.amount);
+    return acc;
+  }, new Map());
+
+interface Props {
+  title: string;
+  onClose?: () => void;
+  children: React.ReactNode;
+}
+
+export const Modal: React.FC<Props> = ({ title, onClose, children }) => (
+  <div className="modal" role="dialog" aria-label={title}>
+    <header>
+      <h2>{title}</h2>
+      {onClose && <button onClick={onClose}>&times;</button>}
+    </header>
+    <section>{children}</section>
+  </div>
+);
+
+function isDefined<T>(value: T | null | undefined): value is T {
+  return value !== null && value !== undefined;
+}
+
+const config = {
+  apiUrl: process.env.API_URL ?? "http://localhost:8000",
+  retries: Number(process.env.RETRIES ?? 3),
+  features: new Set(["search", "export"]),
+} as const;
+
+export function zip<A, B>(a: readonly A[], b: readonly B[]): Array<[A, B]> {
+  const length = Math.min(a.length, b.length);
+  return Array.from({ length }, (_, i) => [a[i], b[i]] as [A, B]);
+}
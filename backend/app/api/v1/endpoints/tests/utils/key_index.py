@@ -0,0 +1,96 @@
+import bisect
+from collections import Counter, defaultdict
+from typing import Dict, List, Sequence, Tuple
+
+import numpy as np
+
+
+def word_keys(word: str) -> Counter:
+    """Count the characters and bigrams of a word."""
+    keys = Counter(word)
+    keys.update(word[i:i + 2] for i in range(len(word) - 1))
+    return keys
+
+
+def build_key_index(words: Sequence[str]) -> Tuple[List[str], np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Build an inverted index from characters and bigrams to the ids of the words
+    containing them.
+
+    The index is stored in CSR form: the postings of keys[k] are
+    word_ids[offsets[k]:offsets[k + 1]], sorted by word id. Each posting is weighted by
+    how dense the key is in the word (occurrences / word length), and `cumulative`
+    holds the running sum of those weights over all postings, so weighted sampling
+    within any run of postings is a single searchsorted.
+
+    :param words: Word table; ids are positions in it
+    :return: (sorted keys, offsets, word_ids, cumulative weights)
+    """
+    postings: Dict[str, List[Tuple[int, float]]] = defaultdict(list)
+    for word_id, word in enumerate(words):
+        for key, occurrences in word_keys(word).items():
+            postings[key].append((word_id, occurrences / len(word)))
+
+    keys = sorted(postings)
+    offsets = np.zeros(len(keys) + 1, dtype=np.uint32)
+    offsets[1:] = np.cumsum([len(postings[key]) for key in keys])
+    word_ids = np.array([word_id for key in keys for word_id, _ in postings[key]], dtype=np.uint32)
+    weights = np.array([weight for key in keys for _, weight in postings[key]], dtype=np.float64)
+    return keys, offsets, word_ids, np.cumsum(weights)
+
+
+class KeyIndex:
+    """Read-only character/bigram inverted index over a word table."""
+
+    def __init__(self, keys: Sequence[str], offsets: np.ndarray, word_ids: np.ndarray, cumulative: np.ndarray) -> None:
+        self.keys = keys
+        self.offsets = offsets
+        self.word_ids = word_ids
+        self.cumulative = cumulative
+
+    def _postings(self, key: str, lo_id: int, hi_id: int) -> Tuple[int, int]:
+        """Return the posting range of `key` restricted to word ids in [lo_id, hi_id)."""
+        k = bisect.bisect_left(self.keys, key)
+        if k == len(self.keys) or self.keys[k] != key:
+            return 0, 0
+        start, stop = int(self.offsets[k]), int(self.offsets[k + 1])
+        ids = self.word_ids[start:stop]
+        return start + int(np.searchsorted(ids, lo_id)), start + int(np.searchsorted(ids, hi_id))
+
+    def _weight_before(self, position: int) -> float:
+        return float(self.cumulative[position - 1]) if position > 0 else 0.0
+
+    def sample(
+        self,
+        rng: np.random.Generator,
+        key_weights: Dict[str, float],
+        n: int,
+        lo_id: int = 0,
+        hi_id: int = np.iinfo(np.uint32).max,
+    ) -> np.ndarray:
+        """
+        Draw `n` word ids in [lo_id, hi_id): pick a key in proportion to its weight, then
+        a word containing it in proportion to the key's density in the word.
+
+        :param key_weights: Characters and/or bigrams -> non-negative weight
+        :return: Array of word ids; empty if no key has postings in the range
+        """
+        ranges = []
+        for key, weight in key_weights.items():
+            start, stop = self._postings(key, lo_id, hi_id)
+            if weight > 0 and stop > start:
+                ranges.append((weight, start, stop))
+        if not ranges or n == 0:
+            return np.empty(0, dtype=np.uint32)
+
+        weights = np.array([weight for weight, _, _ in ranges])
+        starts = np.array([start for _, start, _ in ranges])
+        stops = np.array([stop for _, _, stop in ranges])
+        low = np.array([self._weight_before(start) for start in starts])
+        high = np.array([self._weight_before(stop) for stop in stops])
+        chosen = rng.choice(len(ranges), size=n, p=weights / weights.sum())
+        targets = low[chosen] + rng.random(n) * (high[chosen] - low[chosen])
+        positions = np.searchsorted(self.cumulative, targets, side="right")
+        # Guard against float rounding pushing a target onto a neighbouring posting run
+        positions = np.clip(positions, starts[chosen], stops[chosen] - 1)
+        return self.word_ids[positions]
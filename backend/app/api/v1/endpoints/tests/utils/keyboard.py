@@ -0,0 +1,109 @@
+"""
+Keyboard effort model used to rank words by how hard they are to type.
+
+A word's effort adds up, for a given layout:
+
+- one unit per keystroke
+- finger travel: distance of every key from its finger's home key
+- same-finger bigrams: consecutive different keys typed by the same finger, plus the
+  distance that finger moves between them
+- hand alternation: a penalty for every pair of consecutive keys typed by the same hand
+- row changes: a penalty per row jumped between consecutive keys
+
+Words are then given a difficulty from 0 to 100: the percentage of words that take
+less effort, so a difficulty range selects a predictable share of the vocabulary.
+"""
+import math
+from typing import Dict, Sequence, Tuple
+
+import numpy as np
+
+# Rows top to bottom; each row has ten keys, typed with the standard touch typing fingers
+LAYOUTS: Dict[str, Tuple[str, str, str]] = {
+    "qwerty": ("qwertyuiop", "asdfghjkl;", "zxcvbnm,./"),
+    "dvorak": ("',.pyfgcrl", "aoeuidhtns", ";qjkxbmwvz"),
+    "colemak": ("qwfpgjluy;", "arstdhneio", "zxcvbkm,./"),
+}
+
+# Finger per column: 0-3 left pinky to index, 4-7 right index to pinky
+_COLUMN_FINGER = (0, 1, 2, 3, 3, 4, 4, 5, 6, 7)
+_HOME_COLUMN = (0, 1, 2, 3, 6, 7, 8, 9)
+_HOME_ROW = 1
+_ROW_STAGGER = (0.0, 0.25, 0.75)
+
+KEYSTROKE_COST = 1.0
+TRAVEL_WEIGHT = 1.0
+SAME_FINGER_COST = 2.0
+SAME_HAND_COST = 0.5
+ROW_CHANGE_COST = 0.5
+
+
+def _key_positions(layout: str) -> Dict[str, Tuple[float, int, int]]:
+    """Map each key of a layout to (x, row, finger)."""
+    if layout not in LAYOUTS:
+        raise ValueError(f"Invalid keyboard layout '{layout}'. Choose from {list(LAYOUTS)}.")
+    positions = {}
+    for row, keys in enumerate(LAYOUTS[layout]):
+        for column, key in enumerate(keys):
+            positions[key] = (column + _ROW_STAGGER[row], row, _COLUMN_FINGER[column])
+    return positions
+
+
+def _distance(a: Tuple[float, int, int], b: Tuple[float, int, int]) -> float:
+    return math.hypot(a[0] - b[0], a[1] - b[1])
+
+
+def word_effort(word: str, positions: Dict[str, Tuple[float, int, int]]) -> float:
+    """
+    Effort of typing `word` on the layout described by `positions` (see _key_positions).
+    Characters that are not on the layout cost one keystroke and break the sequence.
+    """
+    homes = [(column + _ROW_STAGGER[_HOME_ROW], _HOME_ROW, finger) for finger, column in enumerate(_HOME_COLUMN)]
+    effort = KEYSTROKE_COST * len(word)
+    previous = None
+    for char in word:
+        key = positions.get(char)
+        if key is None:
+            previous = None
+            continue
+        effort += TRAVEL_WEIGHT * _distance(key, homes[key[2]])
+        if previous is not None and previous != key:
+            if previous[2] == key[2]:
+                effort += SAME_FINGER_COST + _distance(previous, key)
+            elif (previous[2] < 4) == (key[2] < 4):
+                effort += SAME_HAND_COST
+            effort += ROW_CHANGE_COST * abs(previous[1] - key[1])
+        previous = key
+    return effort
+
+
+def build_difficulty_index(words: Sequence[str], layout: str) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Rank words by typing effort on `layout`.
+
+    :param words: Word table; ids are positions in it
+    :param layout: One of LAYOUTS
+    :return: (word ids sorted by effort, their difficulties 0-100 in the same order);
+        words with equal effort share a difficulty
+    """
+    positions = _key_positions(layout)
+    efforts = np.array([word_effort(word, positions) for word in words], dtype=np.float64)
+    order = np.argsort(efforts, kind="stable").astype(np.uint32)
+    sorted_efforts = efforts[order]
+    below = np.searchsorted(sorted_efforts, sorted_efforts, side="left")
+    difficulty = (100.0 * below / max(len(words), 1)).astype(np.float32)
+    return order, difficulty
+
+
+class DifficultyIndex:
+    """Word ids sorted by difficulty on one layout, for O(log n) range selection."""
+
+    def __init__(self, word_ids: np.ndarray, difficulty: np.ndarray) -> None:
+        self.word_ids = word_ids
+        self.difficulty = difficulty
+
+    def select(self, lo: float, hi: float) -> np.ndarray:
+        """Ids of the words with lo <= difficulty <= hi (a view, not a copy)."""
+        start = int(np.searchsorted(self.difficulty, lo, side="left"))
+        stop = int(np.searchsorted(self.difficulty, hi, side="right"))
+        return self.word_ids[start:stop]
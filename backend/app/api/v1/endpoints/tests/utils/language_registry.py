@@ -0,0 +1,94 @@
+import logging
+import os
+import re
+import threading
+from collections import OrderedDict
+from typing import List, Optional, Tuple
+
+from app.core.config import settings
+from .content_engine import ContentEngine, content_engine
+from .text_handler import NLTKTextHandler
+
+logger = logging.getLogger(__name__)
+
+_LANGUAGE_NAME = re.compile(r"[a-z][a-z_]*")
+
+
+class LanguageRegistry:
+    """
+    Text handlers per corpus language.
+
+    The default language is served by the content engine, which is warmed up at
+    startup. Every other language lives in its own snapshot file next to the default
+    one (data/corpus.snap -> data/corpus.<language>.snap) and is only mapped the first
+    time it is requested, so adding languages costs nothing at startup. At most
+    `max_loaded` other languages stay mapped; the least recently used one is dropped
+    when another is loaded (requests still holding its handler finish normally).
+    """
+
+    def __init__(self, engine: ContentEngine, default_language: str, max_loaded: int) -> None:
+        self.engine = engine
+        self.default_language = default_language
+        self.max_loaded = max_loaded
+        self._handlers: "OrderedDict[str, NLTKTextHandler]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _path_parts(self) -> Tuple[str, str]:
+        root, ext = os.path.splitext(self.engine.snapshot_path or settings.CORPUS_SNAPSHOT_PATH)
+        return root, ext or ".snap"
+
+    def snapshot_path(self, language: str) -> str:
+        """Snapshot file of a non-default language."""
+        root, ext = self._path_parts()
+        return f"{root}.{language}{ext}"
+
+    def available(self) -> List[str]:
+        """The default language plus every language with a snapshot file."""
+        root, ext = self._path_parts()
+        directory, base = os.path.split(root)
+        prefix = f"{base}."
+        languages = set()
+        if os.path.isdir(directory or "."):
+            for filename in os.listdir(directory or "."):
+                language = filename[len(prefix):-len(ext)]
+                if filename.startswith(prefix) and filename.endswith(ext) and _LANGUAGE_NAME.fullmatch(language):
+                    languages.add(language)
+        return [self.default_language] + sorted(languages - {self.default_language})
+
+    def loaded(self) -> List[str]:
+        """Non-default languages currently mapped, least recently used first."""
+        with self._lock:
+            return list(self._handlers)
+
+    def get_handler(self, language: Optional[str] = None) -> NLTKTextHandler:
+        """
+        Return the text handler of `language` (the default language if None), mapping
+        its snapshot on first use.
+
+        :raises ValueError: If the language has no snapshot
+        """
+        language = (language or self.default_language).lower()
+        if language == self.default_language:
+            return self.engine.get_handler()
+
+        with self._lock:
+            handler = self._handlers.get(language)
+            if handler is not None:
+                self._handlers.move_to_end(language)
+                return handler
+
+            path = self.snapshot_path(language)
+            if not _LANGUAGE_NAME.fullmatch(language) or not os.path.exists(path):
+                raise ValueError(f"Unsupported language '{language}'. Choose from {self.available()}.")
+            handler = self._handlers[language] = NLTKTextHandler(snapshot_path=path)
+            while len(self._handlers) > self.max_loaded:
+                evicted, _ = self._handlers.popitem(last=False)
+                logger.info(f"Unloaded corpus for language '{evicted}'")
+            return handler
+
+
+language_registry = LanguageRegistry(
+    content_engine,
+    default_language=settings.DEFAULT_LANGUAGE,
+    max_loaded=settings.CONTENT_MAX_LANGUAGES
+)
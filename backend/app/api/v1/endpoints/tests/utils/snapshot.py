@@ -0,0 +1,364 @@
+"""
+Precompiled corpus snapshots.
+
+Building the word lists and sentence list from NLTK means counting the whole Brown
+corpus and running Punkt over a Gutenberg text, which takes seconds on every process
+start. A snapshot is the result of that work serialized into a single versioned binary
+file that is memory-mapped at startup: nothing is parsed up front, strings are decoded
+only when they are sampled, and every worker mapping the same file shares its pages
+through the OS page cache.
+
+File layout (little-endian, every section aligned to 8 bytes)::
+
+    header    magic "TYPRSNAP", u32 format version, u32 section count
+    table     per section: 16-byte name, u32 kind, u32 reserved, u64 offset, u64 length
+    sections  KIND_JSON    utf-8 JSON document
+              KIND_STRINGS u32 count, (count + 1) u32 end offsets, utf-8 blob
+              KIND_ARRAY   1-byte struct typecode, 7 bytes padding, packed values
+
+Build a snapshot with::
+
+    python -m app.cli build-snapshot --output data/corpus.snap
+
+and one for another language from plain text files with::
+
+    python -m app.cli build-language-snapshot --language spanish books/*.txt
+"""
+import bisect
+import hashlib
+import json
+import logging
+import mmap
+import os
+import re
+import struct
+from collections import Counter
+from array import array
+
+import numpy as np
+from collections.abc import Mapping, Sequence
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .code_corpus import build_code_index, load_code_corpus
+from .key_index import build_key_index
+from .keyboard import LAYOUTS, build_difficulty_index
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"TYPRSNAP"
+FORMAT_VERSION = 5
+
+KIND_JSON = 0
+KIND_STRINGS = 1
+KIND_ARRAY = 2
+
+_HEADER = struct.Struct("<8sII")
+_SECTION = struct.Struct("<16sIIQQ")
+_ALIGN = 8
+
+DEFAULT_LANGUAGE = "english"
+_WORD = re.compile(r"[^\W\d_]+")
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+
+
+class SnapshotError(Exception):
+    """Raised when a snapshot file is missing, corrupt or of an unsupported version."""
+
+
+class StringTable(Sequence):
+    """
+    Read-only sequence of strings backed by a snapshot section.
+
+    Items are decoded from the underlying buffer on access, so holding a table costs
+    nothing beyond the mapped pages. Slicing returns another view, not a copy.
+    """
+
+    def __init__(self, offsets: memoryview, blob: memoryview, start: int = 0, stop: Optional[int] = None) -> None:
+        self._offsets = offsets
+        self._blob = blob
+        self._start = start
+        self._stop = len(offsets) - 1 if stop is None else stop
+
+    def __len__(self) -> int:
+        return self._stop - self._start
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            start, stop, step = index.indices(len(self))
+            if step != 1:
+                return [self[i] for i in range(start, stop, step)]
+            return StringTable(self._offsets, self._blob, self._start + start, self._start + max(start, stop))
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("string table index out of range")
+        i = self._start + index
+        return str(self._blob[self._offsets[i]:self._offsets[i + 1]], "utf-8")
+
+
+class FrequencyTable(Mapping):
+    """
+    Read-only word -> count mapping backed by two snapshot sections: the words sorted
+    alphabetically and their counts in the same order. Lookups are a binary search.
+    """
+
+    def __init__(self, words: StringTable, counts: memoryview) -> None:
+        self._words = words
+        self._counts = counts
+
+    def __getitem__(self, word: str) -> int:
+        i = bisect.bisect_left(self._words, word)
+        if i < len(self._words) and self._words[i] == word:
+            return self._counts[i]
+        raise KeyError(word)
+
+    def __len__(self) -> int:
+        return len(self._words)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._words)
+
+
+class CorpusSnapshot:
+    """A memory-mapped snapshot file and typed views over its sections."""
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        try:
+            with open(path, "rb") as f:
+                self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError) as e:
+            raise SnapshotError(f"Cannot map snapshot '{path}': {e}") from e
+        self._buffer = memoryview(self._mmap)
+        self._sections = self._read_table()
+        self.meta: Dict[str, Any] = self.json("meta")
+
+    def _read_table(self) -> Dict[str, Tuple[int, int, int]]:
+        if len(self._buffer) < _HEADER.size:
+            raise SnapshotError(f"Snapshot '{self.path}' is truncated")
+        magic, version, count = _HEADER.unpack_from(self._buffer, 0)
+        if magic != MAGIC:
+            raise SnapshotError(f"'{self.path}' is not a corpus snapshot")
+        if version != FORMAT_VERSION:
+            raise SnapshotError(
+                f"Snapshot '{self.path}' has format version {version}, expected {FORMAT_VERSION}. Rebuild it."
+            )
+        sections = {}
+        for i in range(count):
+            name, kind, _, offset, length = _SECTION.unpack_from(self._buffer, _HEADER.size + i * _SECTION.size)
+            if offset + length > len(self._buffer):
+                raise SnapshotError(f"Snapshot '{self.path}' is truncated")
+            sections[name.rstrip(b"\0").decode("ascii")] = (kind, offset, length)
+        return sections
+
+    def _section(self, name: str, kind: int) -> memoryview:
+        if name not in self._sections:
+            raise SnapshotError(f"Snapshot '{self.path}' has no section '{name}'")
+        actual_kind, offset, length = self._sections[name]
+        if actual_kind != kind:
+            raise SnapshotError(f"Section '{name}' has kind {actual_kind}, expected {kind}")
+        return self._buffer[offset:offset + length]
+
+    def has_section(self, name: str) -> bool:
+        return name in self._sections
+
+    def section_names(self) -> List[str]:
+        return list(self._sections)
+
+    def section_info(self, name: str) -> Tuple[int, int, int]:
+        """Return (kind, offset, length) for a section."""
+        return self._sections[name]
+
+    def json(self, name: str) -> Any:
+        return json.loads(bytes(self._section(name, KIND_JSON)))
+
+    def strings(self, name: str) -> StringTable:
+        data = self._section(name, KIND_STRINGS)
+        (count,) = struct.unpack_from("<I", data, 0)
+        offsets_end = 4 + 4 * (count + 1)
+        offsets = data[4:offsets_end].cast("I")
+        return StringTable(offsets, data[offsets_end:])
+
+    def array(self, name: str) -> memoryview:
+        data = self._section(name, KIND_ARRAY)
+        typecode = chr(data[0])
+        return data[_ALIGN:].cast(typecode)
+
+    def frequencies(self) -> FrequencyTable:
+        return FrequencyTable(self.strings("freq_words"), self.array("freq_counts"))
+
+    def ndarray(self, name: str, dtype) -> np.ndarray:
+        """Zero-copy, read-only NumPy view of an array section."""
+        return np.frombuffer(self.array(name), dtype=dtype)
+
+
+def _pad(buf: bytearray) -> None:
+    buf.extend(b"\0" * (-len(buf) % _ALIGN))
+
+
+def _encode_strings(values: Iterable[str]) -> bytes:
+    encoded = [v.encode("utf-8") for v in values]
+    offsets = array("I", [0])
+    for item in encoded:
+        offsets.append(offsets[-1] + len(item))
+    return struct.pack("<I", len(encoded)) + offsets.tobytes() + b"".join(encoded)
+
+
+def _encode_array(typecode: str, values: Iterable) -> bytes:
+    return typecode.encode("ascii") + b"\0" * (_ALIGN - 1) + array(typecode, values).tobytes()
+
+
+def write_snapshot(path: str, sections: List[Tuple[str, int, bytes]]) -> None:
+    """
+    Write encoded sections to `path` atomically. Processes that already mapped the
+    previous file keep reading it until they reopen.
+    """
+    table_size = _HEADER.size + _SECTION.size * len(sections)
+    body = bytearray(b"\0" * table_size)
+    _pad(body)
+    entries = []
+    for name, kind, data in sections:
+        entries.append((name, kind, len(body), len(data)))
+        body.extend(data)
+        _pad(body)
+
+    _HEADER.pack_into(body, 0, MAGIC, FORMAT_VERSION, len(sections))
+    for i, (name, kind, offset, length) in enumerate(entries):
+        _SECTION.pack_into(body, _HEADER.size + i * _SECTION.size, name.encode("ascii"), kind, 0, offset, length)
+
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(body)
+    os.replace(tmp_path, path)
+
+
+def build_snapshot(
+    path: str,
+    word_freq: Mapping,
+    sentences: List[str],
+    number_tokens: List[str],
+    easy_count: int,
+    medium_count: int,
+    hard_count: int,
+    source: str = "",
+    code_snippets: Sequence[Tuple[str, str]] = (),
+    language: str = DEFAULT_LANGUAGE,
+) -> None:
+    """
+    Compile corpus tables into a snapshot file.
+
+    :param path: Destination file
+    :param word_freq: Mapping of lowercase word -> corpus frequency
+    :param sentences: Filtered practice sentences, stored sorted by length
+    :param number_tokens: Pool of numeric tokens used for number substitution
+    :param easy_count: Number of most frequent words in the "easy" level
+    :param medium_count: Number of words in the "medium" level
+    :param hard_count: Number of words in the "hard" level
+    :param source: Free-form description of where the corpus came from
+    :param code_snippets: (language, snippet) pairs for code mode
+    :param language: Natural language of the words and sentences
+    """
+    # Rank by descending frequency, ties broken alphabetically so builds are reproducible
+    ranked = sorted(word_freq.items(), key=lambda item: (-item[1], item[0]))
+    ranked_words = [word for word, _ in ranked[:easy_count + medium_count + hard_count]]
+    by_word = sorted(word_freq.items())
+    sentences = sorted(sentences, key=len)
+
+    sections = [
+        ("ranked_words", KIND_STRINGS, _encode_strings(ranked_words)),
+        ("freq_words", KIND_STRINGS, _encode_strings(word for word, _ in by_word)),
+        ("freq_counts", KIND_ARRAY, _encode_array("I", (count for _, count in by_word))),
+        ("numbers", KIND_STRINGS, _encode_strings(number_tokens)),
+        ("sentences", KIND_STRINGS, _encode_strings(sentences)),
+        ("sentence_lengths", KIND_ARRAY, _encode_array("H", (len(s) for s in sentences))),
+        ("sentence_words", KIND_ARRAY, _encode_array("H", (len(s.split()) for s in sentences))),
+    ]
+    keys, key_offsets, key_word_ids, key_cumulative = build_key_index(ranked_words)
+    sections += [
+        ("keys", KIND_STRINGS, _encode_strings(keys)),
+        ("key_offsets", KIND_ARRAY, _encode_array("I", key_offsets.tolist())),
+        ("key_words", KIND_ARRAY, _encode_array("I", key_word_ids.tolist())),
+        ("key_cumweights", KIND_ARRAY, _encode_array("d", key_cumulative.tolist())),
+    ]
+    code_languages, code_ordered, code_lines, code_density, code_groups = build_code_index(code_snippets)
+    sections += [
+        ("code_snippets", KIND_STRINGS, _encode_strings(code_ordered)),
+        ("code_lines", KIND_ARRAY, _encode_array("H", code_lines.tolist())),
+        ("code_density", KIND_ARRAY, _encode_array("H", code_density.tolist())),
+        ("code_groups", KIND_ARRAY, _encode_array("I", code_groups.tolist())),
+    ]
+    for layout in LAYOUTS:
+        word_ids, difficulty = build_difficulty_index(ranked_words, layout)
+        sections += [
+            (f"eff_ids_{layout}", KIND_ARRAY, _encode_array("I", word_ids.tolist())),
+            (f"eff_scr_{layout}", KIND_ARRAY, _encode_array("f", difficulty.tolist())),
+        ]
+    digest = hashlib.sha256()
+    for name, _, data in sections:
+        digest.update(name.encode("ascii"))
+        digest.update(data)
+    digest.update(json.dumps(code_languages).encode("utf-8"))
+    digest.update(language.encode("utf-8"))
+
+    meta = {
+        "format_version": FORMAT_VERSION,
+        "fingerprint": digest.hexdigest()[:16],
+        "source": source,
+        "language": language,
+        "easy_count": min(easy_count, len(ranked_words)),
+        "medium_count": max(0, min(medium_count, len(ranked_words) - easy_count)),
+        "hard_count": max(0, len(ranked_words) - easy_count - medium_count),
+        "code_languages": code_languages,
+        "layouts": list(LAYOUTS),
+    }
+    sections.insert(0, ("meta", KIND_JSON, json.dumps(meta).encode("utf-8")))
+    write_snapshot(path, sections)
+
+
+def build_text_snapshot(
+    path: str,
+    texts: Iterable[str],
+    language: str,
+    easy_count: int = 1000,
+    medium_count: int = 4000,
+    hard_count: int = 5000,
+    source: str = "",
+) -> None:
+    """
+    Compile a snapshot for `language` from plain text instead of NLTK corpora.
+
+    Words are the lowercased runs of letters (any script), sentences are split at
+    terminal punctuation followed by whitespace and kept when 20-120 characters long,
+    like the NLTK build. Number tokens and the code corpus are shared by all languages.
+
+    :param path: Destination file
+    :param texts: Raw texts in the language
+    :param language: Language name stored in the snapshot
+    """
+    word_freq: Counter = Counter()
+    sentences = []
+    for text in texts:
+        word_freq.update(word.lower() for word in _WORD.findall(text))
+        for sentence in _SENTENCE_END.split(text):
+            sentence = " ".join(sentence.split())
+            if 20 <= len(sentence) <= 120:
+                sentences.append(sentence)
+    build_snapshot(
+        path,
+        word_freq=word_freq,
+        sentences=sentences,
+        number_tokens=[str(n) for n in range(0, 10000, 7)],
+        easy_count=easy_count,
+        medium_count=medium_count,
+        hard_count=hard_count,
+        source=source,
+        code_snippets=load_code_corpus(),
+        language=language,
+    )
+
+
+def load_snapshot(path: str) -> CorpusSnapshot:
+    """Memory-map the snapshot at `path`."""
+    return CorpusSnapshot(path)
@@ -1,15 +1,117 @@
-import random
+import os
+import hashlib
 import logging
-from typing import List, Optional
+from typing import Dict, Iterator, List, Mapping, Optional, Sequence, Tuple
 
+import numpy as np
 import nltk
 from nltk.corpus import brown, gutenberg
 from nltk.tokenize import sent_tokenize
 from collections import Counter
 
+from .code_corpus import TIERS, build_code_index, load_code_corpus
+from .key_index import KeyIndex, build_key_index
+from .keyboard import LAYOUTS, DifficultyIndex, build_difficulty_index
+from .snapshot import DEFAULT_LANGUAGE, build_snapshot, load_snapshot
+
 logger = logging.getLogger(__name__)
 logging.basicConfig(level=logging.INFO)
 
+LEVELS = ("easy", "medium", "hard")
+
+
+class _SizeIndex:
+    """
+    Items bucketed by an integer size (sentence characters or words).
+
+    `order` lists item ids sorted by size and `starts[s]` is the number of items smaller
+    than `s` (a prefix sum over bucket counts), so the items of any size range
+    [lo, hi] are order[starts[lo]:starts[hi + 1]] and can be sampled in O(1).
+    `floor[s]` is the largest size <= s that has at least one item.
+    """
+
+    def __init__(self, sorted_sizes: np.ndarray, order: Optional[np.ndarray] = None) -> None:
+        self.order = order
+        self.sizes = sorted_sizes.tolist()
+        self.min_size = self.sizes[0] if self.sizes else 0
+        self.max_size = self.sizes[-1] if self.sizes else 0
+        self.starts = np.searchsorted(sorted_sizes, np.arange(self.max_size + 2), side="left").tolist()
+        present = np.zeros(self.max_size + 1, dtype=bool)
+        present[sorted_sizes] = True
+        self.floor = np.maximum.accumulate(np.where(present, np.arange(self.max_size + 1), 0)).tolist()
+
+    def pick(self, rng: np.random.Generator, lo: int, hi: int) -> Tuple[int, int]:
+        """Return (item id, size) of a uniformly chosen item with lo <= size <= hi."""
+        start, stop = self.starts[lo], self.starts[hi + 1]
+        position = start + int(rng.integers(stop - start))
+        item = position if self.order is None else int(self.order[position])
+        return item, self.sizes[position]
+
+    def assemble(self, target: int, separator: int, rng: np.random.Generator) -> List[int]:
+        """
+        Choose items whose sizes, plus `separator` between consecutive items, add up to
+        `target` (or fall short by less than the smallest size; a budget below the
+        smallest size still yields one item). Every item is drawn
+        while leaving room for at least one more, and the last one is drawn from the
+        bucket that fills the remaining budget exactly, so there are no retries.
+        """
+        picked: List[int] = []
+        remaining = target
+        while self.sizes:
+            available = remaining - (separator if picked else 0)
+            if available < self.min_size:
+                if not picked:
+                    # Budget below the shortest item: still return one item
+                    picked.append(self.pick(rng, self.min_size, self.min_size)[0])
+                break
+            if available <= self.max_size:
+                size = self.floor[available]
+                item, _ = self._pick_new(rng, size, size, picked)
+                picked.append(item)
+                break
+            upper = min(self.max_size, available - separator - self.min_size)
+            if upper < self.min_size:
+                upper = self.max_size
+            item, size = self._pick_new(rng, self.min_size, upper, picked)
+            picked.append(item)
+            remaining = available - size
+        return picked
+
+    def _pick_new(self, rng: np.random.Generator, lo: int, hi: int, picked: List[int]) -> Tuple[int, int]:
+        # Avoid repeating an item within one passage; give up after a few draws from a tiny bucket
+        for _ in range(3):
+            item, size = self.pick(rng, lo, hi)
+            if item not in picked:
+                break
+        return item, size
+
+
+def _sample_rows(rng: np.random.Generator, population: int, k: int, n: int) -> np.ndarray:
+    """
+    Draw `n` independent samples of `k` distinct indices from range(population) in one
+    vectorized pass.
+
+    When k is small relative to the population, rows are drawn with replacement and only
+    the (few) rows containing a duplicate are redrawn. Otherwise each row keeps the
+    positions of its k smallest random keys.
+
+    :return: int array of shape (n, k), rows in random order
+    """
+    if k == 0:
+        return np.empty((n, 0), dtype=np.intp)
+    if k * k > population:
+        keys = rng.random((n, population))
+        picks = np.argpartition(keys, k - 1, axis=1)[:, :k]
+        return rng.permuted(picks, axis=1)
+
+    picks = rng.integers(population, size=(n, k))
+    redraw = np.arange(n)
+    while len(redraw):
+        ordered = np.sort(picks[redraw], axis=1)
+        redraw = redraw[(ordered[:, 1:] == ordered[:, :-1]).any(axis=1)]
+        picks[redraw] = rng.integers(population, size=(len(redraw), k))
+    return picks
+
 
 class NLTKTextHandler:
     """
@@ -20,6 +122,21 @@ class NLTKTextHandler:
     - Builds frequency-based word lists (easy, medium, hard) from the Brown corpus.
     - Extracts sentence samples from the Gutenberg corpus.
     - Provides methods to fetch random words by difficulty and random sentences.
+    - Can load all of the above from a precompiled, memory-mapped snapshot instead.
+    - Samples words for many tests at once with NumPy (see `sample_words_batch`).
+    - Assembles passages of a target length from length-bucketed sentences
+      (see `get_sentences_for_length`).
+    - Indexes words by the characters and bigrams they contain to build practice text
+      targeting a typist's weak keys (see `get_adaptive_words`).
+    - Serves real code snippets from a bundled multi-language corpus, indexed by
+      language, symbol density and line count (see `get_code_snippets`).
+    - Ranks words by keyboard effort on several layouts, so words can be selected by a
+      difficulty range instead of a frequency level (see `sample_words_batch`).
+    - Serves any natural language from a snapshot built from plain text (see
+      `build_text_snapshot`); `language` names the corpus language (English for NLTK).
+
+    Words are stored once in `_words`, ranked by frequency; each level is an int32
+    array of indices into that table.
     """
 
     def __init__(
@@ -29,16 +146,20 @@ class NLTKTextHandler:
         hard_count: int = 5000,
         include_numbers: bool = False,
         include_punctuation: bool = False,
+        snapshot_path: Optional[str] = None,
     ) -> None:
         """
         Initialize the handler. Downloads required corpora (if not already present),
         computes word frequencies from Brown, and partitions into leveled lists.
+        If `snapshot_path` points to an existing snapshot, the tables are mapped from
+        it instead and NLTK is not touched; the level sizes stored in the snapshot win.
 
         :param easy_count: Number of most frequent words to consider "easy".
         :param medium_count: Next chunk size for "medium" words.
         :param hard_count: Next chunk size for "hard" words.
         :param include_numbers: if True, numeric tokens (e.g. "1234") will be added to the pool
         :param include_punctuation: if True, punctuation marks will be injected after words
+        :param snapshot_path: optional path to a precompiled corpus snapshot
         """
         self.easy_count = easy_count
         self.medium_count = medium_count
@@ -46,22 +167,47 @@ class NLTKTextHandler:
         self.include_numbers = include_numbers
         self.include_punctuation = include_punctuation
 
-        self._ensure_nltk_data()
-        self.word_freq: Counter = Counter()
-        self._easy_words: List[str] = []
-        self._medium_words: List[str] = []
-        self._hard_words: List[str] = []
-        self._sentences: List[str] = []
+        self.word_freq: Mapping[str, int] = Counter()
+        self._words: Sequence[str] = []
+        self._level_word_ids: Dict[str, np.ndarray] = {}
+        self._sentences: Sequence[str] = []
+        self._sentence_lengths: np.ndarray = np.empty(0, dtype=np.uint16)
+        self._sentence_word_counts: np.ndarray = np.empty(0, dtype=np.uint16)
+        self.code_languages: List[str] = []
+        self._code_snippets: Sequence[str] = []
+        self._code_lines: np.ndarray = np.empty(0, dtype=np.uint16)
+        self._code_groups: np.ndarray = np.zeros(1, dtype=np.uint32)
+        self._code_indexes: Dict[Tuple[Optional[str], Optional[str]], _SizeIndex] = {}
+        self._difficulty: Dict[str, DifficultyIndex] = {}
+        self.snapshot = None
+        self.fingerprint = ""
+        self.language = DEFAULT_LANGUAGE
+
+        if snapshot_path and os.path.exists(snapshot_path):
+            self._load_snapshot(snapshot_path)
+        else:
+            self._ensure_nltk_data()
+            self._build_word_lists()
+            self._build_sentence_list()
+
+            # Pre-generate a small pool of "number tokens" (e.g. "42", "2025", "7")
+            self._number_tokens: Sequence[str] = [str(n) for n in range(0, 10000, 7)]  # every 7th number up to 10000
+            self._build_code_list()
 
-        self._build_word_lists()
-        self._build_sentence_list()
+            self.fingerprint = self._compute_fingerprint()
+            self._key_index = KeyIndex(*build_key_index(self._words))
+            self._difficulty = {
+                layout: DifficultyIndex(*build_difficulty_index(self._words, layout)) for layout in LAYOUTS
+            }
 
-        # Pre-generate a small pool of "number tokens" (e.g. "42", "2025", "7")
-        self._number_tokens: List[str] = [str(n) for n in range(0, 10000, 7)]  # every 7th number up to 10000
+        self._index_levels()
+        self._index_sentences()
 
         # Common punctuation marks to append or stand alone
         self._punctuation_marks: List[str] = [",", ".", ";", ":", "!", "?", "-", "—"]
 
+        self._rng = np.random.default_rng()
+
     def _ensure_nltk_data(self) -> None:
         """Download necessary NLTK corpora/tokenizers if not already present."""
         try:
@@ -104,25 +250,42 @@ class NLTKTextHandler:
             self.easy_count + self.medium_count + self.hard_count
         )
         # Extract only the words in order of descending frequency
-        sorted_words = [word for word, _ in most_common]
-
-        # Partition
-        start = 0
-        end = self.easy_count
-        self._easy_words = sorted_words[start:end]
+        self._words = [word for word, _ in most_common]
 
-        start = end
-        end = start + self.medium_count
-        self._medium_words = sorted_words[start:end]
+    def _index_sentences(self) -> None:
+        """
+        Bucket sentences by character length (they are stored sorted by it) and by word
+        count (through a stable argsort), for O(1) sampling within a size range.
+        """
+        self._sentences_by_chars = _SizeIndex(self._sentence_lengths)
+        order = np.argsort(self._sentence_word_counts, kind="stable")
+        self._sentences_by_words = _SizeIndex(self._sentence_word_counts[order], order)
 
-        start = end
-        end = start + self.hard_count
-        self._hard_words = sorted_words[start:end]
+    def _compute_fingerprint(self) -> str:
+        """
+        Hash the word table, number tokens and sentences. Content generated from the
+        same seed is only identical across processes whose fingerprints match.
+        """
+        digest = hashlib.sha256()
+        for table in (self._words, self._number_tokens, self._sentences, self.code_languages, self._code_snippets):
+            digest.update("\n".join(table).encode("utf-8"))
+            digest.update(b"\0")
+        return digest.hexdigest()[:16]
 
+    def _index_levels(self) -> None:
+        """
+        Partition the ranked word table into easy, medium and hard index arrays.
+        """
+        bounds = np.cumsum([0, self.easy_count, self.medium_count, self.hard_count])
+        bounds = np.minimum(bounds, len(self._words))
+        self._level_word_ids = {
+            level: np.arange(bounds[i], bounds[i + 1], dtype=np.int32)
+            for i, level in enumerate(LEVELS)
+        }
         logger.info(
-            f"Easy words: {len(self._easy_words)}, "
-            f"Medium words: {len(self._medium_words)}, "
-            f"Hard words: {len(self._hard_words)}"
+            f"Easy words: {len(self._level_word_ids['easy'])}, "
+            f"Medium words: {len(self._level_word_ids['medium'])}, "
+            f"Hard words: {len(self._level_word_ids['hard'])}"
         )
 
     def _build_sentence_list(self) -> None:
@@ -135,11 +298,93 @@ class NLTKTextHandler:
         all_sentences = sent_tokenize(raw_text)
 
         # Filter sentences by character length (e.g., 20–120 characters)
-        self._sentences = [
+        sentences = [
             s.strip() for s in all_sentences if 20 <= len(s) <= 120
         ]
+        # Keep them sorted by length so each length bucket is a contiguous range
+        self._sentences = sorted(sentences, key=len)
+        self._sentence_lengths = np.array([len(s) for s in self._sentences], dtype=np.uint16)
+        self._sentence_word_counts = np.array([len(s.split()) for s in self._sentences], dtype=np.uint16)
         logger.info(f"Collected {len(self._sentences)} suitable sentences.")
 
+    def _build_code_list(self) -> None:
+        """
+        Split the bundled code corpus into snippets and order them by language, symbol
+        density tier and line count.
+        """
+        logger.info("Building code snippet list from bundled corpus...")
+        self.code_languages, self._code_snippets, self._code_lines, _, self._code_groups = build_code_index(
+            load_code_corpus()
+        )
+        logger.info(f"Collected {len(self._code_snippets)} code snippets in {len(self.code_languages)} languages.")
+
+    def _code_snippet_pairs(self) -> List[Tuple[str, str]]:
+        """Return the code snippets as (language, snippet) pairs."""
+        pairs = []
+        for l, language in enumerate(self.code_languages):
+            start, stop = int(self._code_groups[l * TIERS]), int(self._code_groups[(l + 1) * TIERS])
+            pairs.extend((language, self._code_snippets[i]) for i in range(start, stop))
+        return pairs
+
+    def _load_snapshot(self, path: str) -> None:
+        """
+        Map word lists, frequencies, number tokens and sentences from a snapshot file.
+        """
+        logger.info(f"Loading corpus snapshot from {path}...")
+        self.snapshot = load_snapshot(path)
+        meta = self.snapshot.meta
+        self.easy_count = meta["easy_count"]
+        self.medium_count = meta["medium_count"]
+        self.hard_count = meta["hard_count"]
+
+        self._words = self.snapshot.strings("ranked_words")
+        self.fingerprint = meta["fingerprint"]
+        self.language = meta.get("language", DEFAULT_LANGUAGE)
+        self.word_freq = self.snapshot.frequencies()
+        self._number_tokens = self.snapshot.strings("numbers")
+        self._sentences = self.snapshot.strings("sentences")
+        self._sentence_lengths = self.snapshot.ndarray("sentence_lengths", np.uint16)
+        self._sentence_word_counts = self.snapshot.ndarray("sentence_words", np.uint16)
+        self._key_index = KeyIndex(
+            self.snapshot.strings("keys"),
+            self.snapshot.ndarray("key_offsets", np.uint32),
+            self.snapshot.ndarray("key_words", np.uint32),
+            self.snapshot.ndarray("key_cumweights", np.float64),
+        )
+        self._difficulty = {
+            layout: DifficultyIndex(
+                self.snapshot.ndarray(f"eff_ids_{layout}", np.uint32),
+                self.snapshot.ndarray(f"eff_scr_{layout}", np.float32),
+            )
+            for layout in meta["layouts"]
+        }
+        self.code_languages = meta["code_languages"]
+        self._code_snippets = self.snapshot.strings("code_snippets")
+        self._code_lines = self.snapshot.ndarray("code_lines", np.uint16)
+        self._code_groups = self.snapshot.ndarray("code_groups", np.uint32)
+        logger.info(
+            f"Snapshot {meta['fingerprint']}: {len(self._words)} ranked words, "
+            f"{len(self._sentences)} sentences, {len(self._code_snippets)} code snippets."
+        )
+
+    def save_snapshot(self, path: str) -> None:
+        """
+        Compile this handler's tables into a snapshot file that later handlers can load.
+
+        :param path: Destination path
+        """
+        build_snapshot(
+            path,
+            word_freq=self.word_freq,
+            sentences=list(self._sentences),
+            number_tokens=list(self._number_tokens),
+            easy_count=self.easy_count,
+            medium_count=self.medium_count,
+            hard_count=self.hard_count,
+            source="nltk:brown+gutenberg/austen-emma.txt",
+            code_snippets=self._code_snippet_pairs(),
+        )
+
     def get_random_words(
         self, 
         level: str = "easy", 
@@ -156,34 +401,144 @@ class NLTKTextHandler:
         :param include_punctuation: override instance setting for punctuation
         :return: List of words, optionally with numbers and punctuation
         """
-        level_map = {"easy": self._easy_words, "medium": self._medium_words, "hard": self._hard_words}
-        if level not in level_map:
-            raise ValueError(f"Invalid level '{level}'. Choose from {list(level_map.keys())}.")
-        
-        pool = level_map[level]
-        if count > len(pool):
-            raise ValueError(f"Requested {count} words, but only {len(pool)} available for level '{level}'.")
-        
-        # Get base words
-        words = random.sample(pool, count)
-        
+        return self.sample_words_batch(
+            level=level,
+            count=count,
+            n_tests=1,
+            include_numbers=include_numbers,
+            include_punctuation=include_punctuation
+        )[0]
+
+    def sample_words_batch(
+        self,
+        level: str = "easy",
+        count: int = 25,
+        n_tests: int = 1,
+        include_numbers: Optional[bool] = None,
+        include_punctuation: Optional[bool] = None,
+        rng: Optional[np.random.Generator] = None,
+        difficulty: Optional[Tuple[float, float]] = None,
+        layout: str = "qwerty"
+    ) -> List[List[str]]:
+        """
+        Return `n_tests` independent random word samples at the requested difficulty.
+
+        Word indices, number substitutions and punctuation positions for all tests are
+        drawn in one vectorized pass; only the final string assembly is per word.
+
+        With `difficulty`, words are drawn from every level whose keyboard effort on
+        `layout` falls in that range instead of from `level`; the range is located in
+        the layout's effort-sorted index with two binary searches.
+
+        :param level: "easy" | "medium" | "hard"
+        :param count: how many words per test
+        :param n_tests: how many tests to generate
+        :param include_numbers: override instance setting for numbers
+        :param include_punctuation: override instance setting for punctuation
+        :param rng: NumPy generator to draw from (defaults to the handler's own)
+        :param difficulty: (min, max) keyboard difficulty, 0-100 (replaces level)
+        :param layout: keyboard layout the difficulty refers to
+        :return: One list of words per test
+        """
+        if difficulty is not None:
+            if layout not in self._difficulty:
+                raise ValueError(f"Invalid keyboard layout '{layout}'. Choose from {list(self._difficulty)}.")
+            pool = self._difficulty[layout].select(*difficulty)
+            if count > len(pool):
+                raise ValueError(
+                    f"Requested {count} words, but only {len(pool)} have difficulty "
+                    f"{difficulty[0]}-{difficulty[1]} on {layout}."
+                )
+        else:
+            if level not in self._level_word_ids:
+                raise ValueError(f"Invalid level '{level}'. Choose from {list(self._level_word_ids.keys())}.")
+            pool = self._level_word_ids[level]
+            if count > len(pool):
+                raise ValueError(f"Requested {count} words, but only {len(pool)} available for level '{level}'.")
+
+        rng = rng if rng is not None else self._rng
+        words = self._words
+        word_ids = pool[_sample_rows(rng, len(pool), count, n_tests)]
+        tests = [[words[i] for i in row] for row in word_ids.tolist()]
+        return self._decorate_words(tests, count, include_numbers, include_punctuation, rng)
+
+    @property
+    def layouts(self) -> List[str]:
+        """Keyboard layouts words can be selected by difficulty on."""
+        return list(self._difficulty)
+
+    def get_adaptive_words(
+        self,
+        key_weights: Dict[str, float],
+        level: str = "easy",
+        count: int = 25,
+        include_numbers: Optional[bool] = None,
+        include_punctuation: Optional[bool] = None,
+        focus: float = 0.6,
+        rng: Optional[np.random.Generator] = None
+    ) -> List[str]:
+        """
+        Return words biased toward the given characters and bigrams.
+
+        A `focus` share of the words is drawn from the character/bigram index in
+        proportion to `key_weights`; the rest are ordinary random words so the text
+        still reads naturally. Words come from the requested level and every easier one.
+
+        :param key_weights: Characters and/or bigrams -> weight (e.g. error rates)
+        :param level: "easy" | "medium" | "hard"
+        :param count: how many words
+        :param include_numbers: override instance setting for numbers
+        :param include_punctuation: override instance setting for punctuation
+        :param focus: Share of words (0-1) containing a weighted key
+        :param rng: NumPy generator to draw from (defaults to the handler's own)
+        :return: List of words in random order
+        """
+        if level not in self._level_word_ids:
+            raise ValueError(f"Invalid level '{level}'. Choose from {list(self._level_word_ids.keys())}.")
+        rng = rng if rng is not None else self._rng
+        level_ids = self._level_word_ids[level]
+        hi_id = int(level_ids[-1]) + 1 if len(level_ids) else 0
+        if count > hi_id:
+            raise ValueError(f"Requested {count} words, but only {hi_id} available up to level '{level}'.")
+
+        focused = self._key_index.sample(rng, key_weights, round(count * focus), 0, hi_id)
+        filler = _sample_rows(rng, hi_id, count - len(focused), 1)[0]
+        word_ids = rng.permutation(np.concatenate([focused.astype(np.intp), filler]))
+        tests = [[self._words[i] for i in word_ids.tolist()]]
+        return self._decorate_words(tests, count, include_numbers, include_punctuation, rng)[0]
+
+    def _decorate_words(
+        self,
+        tests: List[List[str]],
+        count: int,
+        include_numbers: Optional[bool],
+        include_punctuation: Optional[bool],
+        rng: np.random.Generator
+    ) -> List[List[str]]:
+        """Substitute numbers and append punctuation in place, for all tests at once."""
+        n_tests = len(tests)
+
         # Apply numbers if requested
         if include_numbers if include_numbers is not None else self.include_numbers:
             # Replace ~15% of words with numbers
             num_replacements = max(1, int(count * 0.15))
-            indices = random.sample(range(count), num_replacements)
-            for idx in indices:
-                words[idx] = random.choice(self._number_tokens)
-        
+            positions = _sample_rows(rng, count, num_replacements, n_tests)
+            values = rng.integers(len(self._number_tokens), size=positions.shape)
+            for test, row_positions, row_values in zip(tests, positions.tolist(), values.tolist()):
+                for idx, value in zip(row_positions, row_values):
+                    test[idx] = self._number_tokens[value]
+
         # Apply punctuation if requested
         if include_punctuation if include_punctuation is not None else self.include_punctuation:
             # Add punctuation to ~20% of words
             punc_count = max(1, int(count * 0.2))
-            indices = random.sample(range(count), punc_count)
-            for idx in indices:
-                words[idx] += random.choice(self._punctuation_marks)
-        
-        return words
+            positions = _sample_rows(rng, count, punc_count, n_tests)
+            marks = rng.integers(len(self._punctuation_marks), size=positions.shape)
+            for test, row_positions, row_marks in zip(tests, positions.tolist(), marks.tolist()):
+                for idx, mark in zip(row_positions, row_marks):
+                    test[idx] += self._punctuation_marks[mark]
+
+        return tests
 
     def get_random_sentence(self) -> Optional[str]:
         """
@@ -192,13 +547,14 @@ class NLTKTextHandler:
         """
         if not self._sentences:
             return None
-        return random.choice(self._sentences)
+        return self._sentences[int(self._rng.integers(len(self._sentences)))]
 
     def get_random_sentences(
         self, 
         count: int = 5,
         include_numbers: Optional[bool] = None,
-        include_punctuation: Optional[bool] = None
+        include_punctuation: Optional[bool] = None,
+        rng: Optional[np.random.Generator] = None
     ) -> List[str]:
         """
         Return a list of random sentences.
@@ -206,6 +562,7 @@ class NLTKTextHandler:
         :param count: Number of sentences to return
         :param include_numbers: override instance setting for numbers
         :param include_punctuation: override instance setting for punctuation
+        :param rng: NumPy generator to draw from (defaults to the handler's own)
         :return: List of random sentences
         :raises ValueError: If count exceeds available sentences
         """
@@ -214,23 +571,149 @@ class NLTKTextHandler:
                 f"Requested {count} sentences, but only {len(self._sentences)} available."
             )
         
-        sentences = random.sample(self._sentences, count)
+        rng = rng if rng is not None else self._rng
+        sentences = [self._sentences[i] for i in _sample_rows(rng, len(self._sentences), count, 1)[0].tolist()]
         
         # Apply numbers if requested
         if include_numbers if include_numbers is not None else self.include_numbers:
-            for i, sentence in enumerate(sentences):
-                # Replace ~10% of words with numbers
-                words = sentence.split()
-                num_replacements = max(1, int(len(words) * 0.1))
-                indices = random.sample(range(len(words)), num_replacements)
-                for idx in indices:
-                    words[idx] = random.choice(self._number_tokens)
-                sentences[i] = " ".join(words)
+            sentences = self._add_numbers_to_sentences(sentences, rng)
         
         # Note: We don't modify punctuation for sentences as they already have natural punctuation
         
         return sentences
 
+    def iter_sentences(
+        self,
+        include_numbers: Optional[bool] = None,
+        rng: Optional[np.random.Generator] = None,
+        block: int = 64
+    ) -> Iterator[str]:
+        """
+        Return an endless iterator of random sentences, never the same one twice in a
+        row. Sentence ids are drawn `block` at a time, so the iterator holds constant
+        memory however long it is consumed.
+
+        :param include_numbers: override instance setting for numbers
+        :param rng: NumPy generator to draw from (defaults to the handler's own)
+        :param block: how many sentence ids to draw at once
+        :raises ValueError: If no sentences are available
+        """
+        if not self._sentences:
+            raise ValueError("No sentences available.")
+        rng = rng if rng is not None else self._rng
+        with_numbers = include_numbers if include_numbers is not None else self.include_numbers
+
+        def sentences() -> Iterator[str]:
+            previous = -1
+            while True:
+                for i in rng.integers(len(self._sentences), size=block).tolist():
+                    if i == previous and len(self._sentences) > 1:
+                        continue
+                    previous = i
+                    if with_numbers:
+                        yield self._add_numbers_to_sentences([self._sentences[i]], rng)[0]
+                    else:
+                        yield self._sentences[i]
+
+        return sentences()
+
+    def get_sentences_for_length(
+        self,
+        target_chars: Optional[int] = None,
+        target_words: Optional[int] = None,
+        include_numbers: Optional[bool] = None,
+        rng: Optional[np.random.Generator] = None
+    ) -> List[str]:
+        """
+        Return random sentences that together fill a character or word budget.
+
+        With `target_chars`, the joined passage (sentences separated by one space) is
+        exactly `target_chars` long whenever the corpus has a sentence of every length
+        needed, and otherwise short by less than the shortest sentence. With
+        `target_words` the same holds for the word count. Runs in O(k) for k sentences.
+
+        :param target_chars: Character budget of the joined passage
+        :param target_words: Word budget of the passage (used if target_chars is None)
+        :param include_numbers: override instance setting for numbers
+        :param rng: NumPy generator to draw from (defaults to the handler's own)
+        :return: List of sentences in random order
+        :raises ValueError: If neither budget is given
+        """
+        rng = rng if rng is not None else self._rng
+        if target_chars is not None:
+            ids = self._sentences_by_chars.assemble(target_chars, 1, rng)
+        elif target_words is not None:
+            ids = self._sentences_by_words.assemble(target_words, 0, rng)
+        else:
+            raise ValueError("Either target_chars or target_words is required.")
+        sentences = [self._sentences[i] for i in rng.permutation(ids).tolist()]
+
+        if include_numbers if include_numbers is not None else self.include_numbers:
+            sentences = self._add_numbers_to_sentences(sentences, rng)
+        return sentences
+
+    def get_code_snippets(
+        self,
+        target_lines: int = 15,
+        language: Optional[str] = None,
+        level: Optional[str] = None,
+        rng: Optional[np.random.Generator] = None
+    ) -> List[str]:
+        """
+        Return random code snippets that, joined by blank lines, span `target_lines` lines
+        (or fall short by less than the shortest snippet).
+
+        Snippets are chosen the same way as passages of a target length (see
+        `get_sentences_for_length`), from one language or all of them. The level picks
+        the snippets' symbol density tier within their language: "easy" snippets are
+        mostly identifiers, "hard" ones are dense in brackets and operators.
+
+        :param target_lines: Line budget of the snippets together
+        :param language: One of `code_languages`, or None for any language
+        :param level: "easy" | "medium" | "hard", or None for any density
+        :param rng: NumPy generator to draw from (defaults to the handler's own)
+        :return: List of snippets in random order
+        :raises ValueError: If the language or level is unknown, or no snippet matches
+        """
+        if language is not None and language not in self.code_languages:
+            raise ValueError(f"Invalid code language '{language}'. Choose from {self.code_languages}.")
+        if level is not None and level not in LEVELS:
+            raise ValueError(f"Invalid level '{level}'. Choose from {list(LEVELS)}.")
+        rng = rng if rng is not None else self._rng
+        index = self._code_index(language, level)
+        if not index.sizes:
+            raise ValueError("No code snippets available.")
+        ids = index.assemble(target_lines, 1, rng)
+        return [self._code_snippets[i] for i in rng.permutation(ids).tolist()]
+
+    def _code_index(self, language: Optional[str], level: Optional[str]) -> _SizeIndex:
+        """Line-count index over the snippets of a language and tier, built on first use."""
+        index = self._code_indexes.get((language, level))
+        if index is None:
+            languages = range(len(self.code_languages)) if language is None else [self.code_languages.index(language)]
+            tiers = range(TIERS) if level is None else [LEVELS.index(level)]
+            groups = self._code_groups
+            ids = np.concatenate([np.empty(0, dtype=np.intp)] + [
+                np.arange(groups[l * TIERS + t], groups[l * TIERS + t + 1], dtype=np.intp)
+                for l in languages for t in tiers
+            ])
+            order = ids[np.argsort(self._code_lines[ids], kind="stable")]
+            index = self._code_indexes[(language, level)] = _SizeIndex(self._code_lines[order], order)
+        return index
+
+    def _add_numbers_to_sentences(self, sentences: List[str], rng: np.random.Generator) -> List[str]:
+        """Replace ~10% of the words of each sentence with number tokens."""
+        result = []
+        for sentence in sentences:
+            words = sentence.split()
+            num_replacements = max(1, int(len(words) * 0.1))
+            indices = _sample_rows(rng, len(words), num_replacements, 1)[0].tolist()
+            values = rng.integers(len(self._number_tokens), size=num_replacements).tolist()
+            for idx, value in zip(indices, values):
+                words[idx] = self._number_tokens[value]
+            result.append(" ".join(words))
+        return result
+
     def get_word_frequency(self, word: str) -> int:
         """
         Return the raw frequency count of a given word in the Brown corpus.
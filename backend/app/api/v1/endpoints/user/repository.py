@@ -6,7 +6,7 @@ import uuid
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy import func
 from datetime import datetime, UTC, timedelta
-from app.api.v1.endpoints.tests.models import UserTest
+from app.api.v1.endpoints.tests.models import UserTest, UserStats
 import logging
 
 logger = logging.getLogger(__name__)
@@ -295,4 +295,13 @@ class UserRepository:
             
         except Exception as e:
             logger.error(f"Error fetching leaderboard data: {str(e)}", exc_info=True)
-            raise 
\ No newline at end of file
+            raise
+
+    def get_stats(self, user_id: str, test_type: Optional[str] = None, duration: Optional[int] = None) -> List[UserStats]:
+        """Get a user's running test totals, one row per test type and duration."""
+        query = self.db.query(UserStats).filter(UserStats.user_id == user_id)
+        if test_type is not None:
+            query = query.filter(UserStats.test_type == test_type)
+        if duration is not None:
+            query = query.filter(UserStats.duration == duration)
+        return query.order_by(UserStats.test_type, UserStats.duration).all()
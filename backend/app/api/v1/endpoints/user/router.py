@@ -1,6 +1,6 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Form
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 from app.db.session import get_db
 from app.api.v1.endpoints.user import schemas, service, models
 from app.core.deps import get_current_user, require_roles
@@ -210,6 +210,21 @@ def get_leaderboard(
             detail=f"Error fetching leaderboard data: {str(e)}"
         ) 
 
+@router.get("/me/stats", response_model=List[schemas.UserStatsRead])
+def get_user_stats(
+    test_type: Optional[str] = None,
+    duration: Optional[int] = None,
+    current_user: models.User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Get the current user's test statistics (count, averages, wpm standard deviation,
+    personal best, last test) per test type and duration. Filter by `test_type` and
+    `duration` to get a single mode.
+    """
+    user_service = service.UserService(db)
+    return user_service.get_stats(current_user.id, test_type, duration)
+
 @router.get("/me/customization", response_model=schemas.UserCustomizationInDB)
 def get_user_customization(
     current_user: models.User = Depends(get_current_user),
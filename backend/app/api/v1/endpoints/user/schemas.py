@@ -117,4 +117,16 @@ class UserCustomizationInDB(UserCustomizationBase):
     updated_at: datetime
 
     class Config:
-        from_attributes = True 
\ No newline at end of file
+        from_attributes = True
+
+class UserStatsRead(BaseModel):
+    test_type: str
+    duration: int
+    test_count: int
+    avg_wpm: float
+    wpm_stddev: float
+    avg_raw_wpm: float
+    avg_accuracy: float
+    avg_consistency: float
+    best_wpm: float
+    last_test_at: Optional[datetime] = None
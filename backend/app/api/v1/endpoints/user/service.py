@@ -7,6 +7,7 @@ from fastapi import HTTPException, status
 from jose import jwt, JWTError
 from app.core.config import settings
 from app.api.v1.endpoints.user.repository import UserRepository
+import math
 import uuid
 
 class UserService:
@@ -189,6 +190,29 @@ class UserService:
         
         return leaderboard_users 
 
+    def get_stats(self, user_id: str, test_type: Optional[str] = None, duration: Optional[int] = None) -> List[schemas.UserStatsRead]:
+        """
+        Get a user's test statistics per test type and duration from their running
+        totals, without reading their tests.
+        """
+        stats = []
+        for row in self.repository.get_stats(user_id, test_type, duration):
+            n = row.test_count
+            avg_wpm = row.wpm_sum / n
+            stats.append(schemas.UserStatsRead(
+                test_type=row.test_type,
+                duration=row.duration,
+                test_count=n,
+                avg_wpm=avg_wpm,
+                wpm_stddev=math.sqrt(max(row.wpm_sq_sum / n - avg_wpm ** 2, 0.0)),
+                avg_raw_wpm=row.raw_wpm_sum / n,
+                avg_accuracy=row.accuracy_sum / n,
+                avg_consistency=row.consistency_sum / n,
+                best_wpm=row.best_wpm,
+                last_test_at=row.last_test_at
+            ))
+        return stats
+
     def get_user_customization(self, user_id: int) -> models.UserCustomization:
         """Get user customization settings."""
         customization = self.db.query(models.UserCustomization).filter(
@@ -0,0 +1,139 @@
+"""
+Maintenance commands.
+
+Usage::
+
+    python -m app.cli build-snapshot [--output PATH]
+    python -m app.cli build-language-snapshot --language NAME TEXT [TEXT ...] [--output PATH]
+    python -m app.cli snapshot-info [PATH]
+    python -m app.cli recompute-metrics [--batch-size N] [--dry-run]
+    python -m app.cli rebuild-stats
+"""
+import argparse
+import json
+import logging
+import os
+from typing import List, Optional
+
+from app.core.config import settings
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def build_snapshot(args: argparse.Namespace) -> None:
+    from app.api.v1.endpoints.tests.utils import NLTKTextHandler
+
+    output = args.output or settings.CORPUS_SNAPSHOT_PATH
+    handler = NLTKTextHandler(
+        easy_count=args.easy_count,
+        medium_count=args.medium_count,
+        hard_count=args.hard_count,
+    )
+    handler.save_snapshot(output)
+    logger.info(f"Wrote corpus snapshot to {output} ({os.path.getsize(output)} bytes)")
+
+
+def build_language_snapshot(args: argparse.Namespace) -> None:
+    from app.api.v1.endpoints.tests.utils import language_registry
+    from app.api.v1.endpoints.tests.utils.snapshot import build_text_snapshot
+
+    language = args.language.lower()
+    output = args.output or language_registry.snapshot_path(language)
+    texts = []
+    for path in args.texts:
+        with open(path, encoding="utf-8") as f:
+            texts.append(f.read())
+    build_text_snapshot(
+        output,
+        texts,
+        language=language,
+        easy_count=args.easy_count,
+        medium_count=args.medium_count,
+        hard_count=args.hard_count,
+        source="text:" + "+".join(os.path.basename(path) for path in args.texts),
+    )
+    logger.info(f"Wrote {language} corpus snapshot to {output} ({os.path.getsize(output)} bytes)")
+
+
+def snapshot_info(args: argparse.Namespace) -> None:
+    from app.api.v1.endpoints.tests.utils.snapshot import load_snapshot
+
+    snapshot = load_snapshot(args.path or settings.CORPUS_SNAPSHOT_PATH)
+    print(json.dumps(snapshot.meta, indent=2))
+    for name in snapshot.section_names():
+        kind, offset, length = snapshot.section_info(name)
+        print(f"{name:<16} kind={kind} offset={offset} length={length}")
+
+
+def recompute_metrics(args: argparse.Namespace) -> None:
+    from app.db.session import SessionLocal
+    from app.api.v1.endpoints.user import models  # noqa: F401  (mapped before the tests' foreign key is used)
+    from app.api.v1.endpoints.tests.service import UserTestService
+
+    with SessionLocal() as db:
+        counts = UserTestService(db).recompute_metrics(batch_size=args.batch_size, dry_run=args.dry_run)
+    action = "would change" if args.dry_run else "changed"
+    logger.info(
+        f"Recomputed metrics of {counts['tests']} tests with keystrokes: {action} {counts['changed']}, "
+        f"{counts['failed']} unreadable"
+    )
+
+
+def rebuild_stats(args: argparse.Namespace) -> None:
+    from app.db.session import SessionLocal
+    from app.api.v1.endpoints.user import models  # noqa: F401  (mapped before the tests' foreign key is used)
+    from app.api.v1.endpoints.tests.repository import UserTestRepository
+
+    with SessionLocal() as db:
+        rows = UserTestRepository(db).rebuild_stats()
+        db.commit()
+    logger.info(f"Rebuilt {rows} user_stats rows, the progress rollups and the character statistics from user_tests")
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(prog="python -m app.cli", description="Typer maintenance commands.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    build = subparsers.add_parser("build-snapshot", help="Compile the NLTK corpora into a corpus snapshot")
+    build.add_argument("--output", default=None, help="Destination path (defaults to CORPUS_SNAPSHOT_PATH)")
+    build.add_argument("--easy-count", type=int, default=1000)
+    build.add_argument("--medium-count", type=int, default=4000)
+    build.add_argument("--hard-count", type=int, default=5000)
+    build.set_defaults(func=build_snapshot)
+
+    language = subparsers.add_parser(
+        "build-language-snapshot", help="Compile plain text files into a corpus snapshot for another language"
+    )
+    language.add_argument("--language", required=True, help="Language name, e.g. spanish")
+    language.add_argument("texts", nargs="+", help="UTF-8 text files in the language")
+    language.add_argument(
+        "--output", default=None, help="Destination path (defaults to the language's path next to CORPUS_SNAPSHOT_PATH)"
+    )
+    language.add_argument("--easy-count", type=int, default=1000)
+    language.add_argument("--medium-count", type=int, default=4000)
+    language.add_argument("--hard-count", type=int, default=5000)
+    language.set_defaults(func=build_language_snapshot)
+
+    info = subparsers.add_parser("snapshot-info", help="Print a corpus snapshot's metadata and sections")
+    info.add_argument("path", nargs="?", default=None)
+    info.set_defaults(func=snapshot_info)
+
+    recompute = subparsers.add_parser(
+        "recompute-metrics", help="Recompute stored test metrics from their keystroke streams"
+    )
+    recompute.add_argument("--batch-size", type=int, default=1000, help="Tests computed and written together")
+    recompute.add_argument("--dry-run", action="store_true", help="Only report how many tests would change")
+    recompute.set_defaults(func=recompute_metrics)
+
+    rebuild = subparsers.add_parser(
+        "rebuild-stats", help="Recompute every user's running statistics, progress rollups and character statistics from their tests"
+    )
+    rebuild.set_defaults(func=rebuild_stats)
+
+    args = parser.parse_args(argv)
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -18,6 +18,38 @@ class Settings(BaseSettings):
     POSTGRES_PASSWORD: str = "postgres"
     POSTGRES_DB: str = "typer"
     SQLALCHEMY_DATABASE_URI: Optional[str] = None
+    MAX_TEST_BATCH_SIZE: int = 100  # most results one POST /tests/me/typing/batch may submit
+    TEST_IDEMPOTENCY_CACHE_SIZE: int = 10000  # recently saved tests answered directly when retried
+    TEST_HISTORY_PAGE_SIZE: int = 50  # default `limit` of GET /tests/me/typing
+    MAX_TEST_HISTORY_PAGE_SIZE: int = 500  # largest `limit` of GET /tests/me/typing
+
+    # Write-behind ingestion of test results (see app/api/v1/endpoints/tests/ingest.py)
+    TEST_INGEST_WRITE_BEHIND: bool = False
+    TEST_INGEST_SPILL_DIR: str = "data/ingest"  # journals of results not yet written
+    TEST_INGEST_QUEUE_SIZE: int = 10000  # results waiting to be written before submissions get 503
+    TEST_INGEST_BATCH_SIZE: int = 200
+    TEST_INGEST_FLUSH_INTERVAL: float = 0.5  # seconds
+
+    # Keystroke streams submitted with test results (see app/api/v1/endpoints/tests/codec.py)
+    TEST_KEYSTROKES_MAX_EVENTS: int = 20000
+    TEST_KEYSTROKES_BYTES_PER_EVENT: float = 3.0  # hard size limit: compressed bytes per keystroke...
+    TEST_KEYSTROKES_BASE_BYTES: int = 256  # ...plus this much for the key table and zlib overhead
+
+    # Per-character statistics (user_char_stats); after changing the half-life, run
+    # `python -m app.cli rebuild-stats`
+    TEST_CHAR_STATS_HALF_LIFE_DAYS: float = 14.0  # a test's weight in the recent values halves this often
+
+    # Test content
+    CORPUS_SNAPSHOT_PATH: str = "data/corpus.snap"
+    DEFAULT_LANGUAGE: str = "english"  # language of CORPUS_SNAPSHOT_PATH; others use corpus.<language>.snap
+    CONTENT_MAX_LANGUAGES: int = 3  # other languages kept mapped at once
+    CONTENT_POOL_SIZE: int = 16
+    CONTENT_POOL_MAX_KEYS: int = 256
+    CONTENT_CACHE_SIZE: int = 4096
+    KEYBOARD_LAYOUT: str = "qwerty"  # layout word difficulty refers to when a request does not name one
+    CONTENT_TARGET_WPM: int = 100  # typing speed assumed when sizing content for target_seconds
+    ZEN_STREAM_WPM: int = 200  # default pace of the zen stream, faster than most typists
+    ZEN_STREAM_LOOKAHEAD_CHARS: int = 2000  # characters the zen stream may run ahead of that pace
 
     @property
     def get_database_url(self) -> str:
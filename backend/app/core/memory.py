@@ -0,0 +1,78 @@
+"""
+Per-process memory accounting from /proc (Linux only).
+
+RSS alone overstates what each worker costs: pages of the memory-mapped corpus
+snapshot are shared by every worker through the page cache. The report splits
+resident memory into private pages (owned by this process alone) and shared pages,
+and gives PSS, which divides each shared page between the processes mapping it.
+"""
+import os
+from typing import Dict, Iterable, Optional
+
+_FIELDS = ("Rss", "Pss", "Shared_Clean", "Shared_Dirty", "Private_Clean", "Private_Dirty", "Swap")
+
+
+def _parse_fields(lines: Iterable[str], totals: Dict[str, int]) -> None:
+    for line in lines:
+        key, _, value = line.partition(":")
+        if key in totals:
+            totals[key] += int(value.split()[0]) * 1024
+
+
+def _summarize(totals: Dict[str, int]) -> Dict[str, int]:
+    return {
+        "rss": totals["Rss"],
+        "pss": totals["Pss"],
+        "shared": totals["Shared_Clean"] + totals["Shared_Dirty"],
+        "private": totals["Private_Clean"] + totals["Private_Dirty"],
+        "swap": totals["Swap"],
+    }
+
+
+def mapping_usage(path: str, pid: str = "self") -> Optional[Dict[str, int]]:
+    """
+    Resident bytes of every mapping of `path` in a process, from /proc/<pid>/smaps.
+
+    :return: rss/pss/shared/private/swap bytes, or None if smaps is unavailable or the
+        file is not mapped
+    """
+    path = os.path.realpath(path)
+    totals = dict.fromkeys(_FIELDS, 0)
+    found = False
+    try:
+        with open(f"/proc/{pid}/smaps") as f:
+            in_mapping = False
+            for line in f:
+                first = line.split(None, 1)[0]
+                if "-" in first and not first.endswith(":"):
+                    # Mapping header: "start-end perms offset dev inode [path]"
+                    parts = line.split(None, 5)
+                    # A snapshot replaced on disk stays mapped as "<path> (deleted)"
+                    mapped = parts[5].strip().removesuffix(" (deleted)") if len(parts) == 6 else None
+                    in_mapping = mapped == path
+                    found = found or in_mapping
+                elif in_mapping:
+                    _parse_fields([line], totals)
+    except OSError:
+        return None
+    return _summarize(totals) if found else None
+
+
+def memory_report(mapped_paths: Iterable[str] = ()) -> Dict:
+    """
+    Summarize this process's memory from /proc/self/smaps_rollup, plus the usage of
+    each file in `mapped_paths` (e.g. the corpus snapshot).
+
+    :return: Dict with "pid", "available", process totals in bytes and "mappings"
+    """
+    report: Dict = {"pid": os.getpid(), "available": False, "mappings": {}}
+    totals = dict.fromkeys(_FIELDS, 0)
+    try:
+        with open("/proc/self/smaps_rollup") as f:
+            _parse_fields(f, totals)
+    except OSError:
+        return report
+    report.update(_summarize(totals), available=True)
+    for path in mapped_paths:
+        report["mappings"][path] = mapping_usage(path)
+    return report
@@ -1,12 +1,34 @@
+import asyncio
+import threading
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, Depends
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 from sqlalchemy.orm import Session
 from app.db.session import get_db
+from app.core.memory import memory_report
+from app.api.v1.endpoints.tests.utils import content_engine, language_registry
+from app.core.config import settings
+from app.api.v1.endpoints.tests.router import admin_required, content_pool
+from app.api.v1.endpoints.tests.ingest import ingest_queue
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Build the shared text handler in the background so startup is not blocked;
+    # requests arriving before it is ready wait for the same build.
+    threading.Thread(target=content_engine.warmup, name="content-engine-warmup", daemon=True).start()
+    pool_task = asyncio.create_task(content_pool.run(is_ready=lambda: content_engine.is_ready))
+    if settings.TEST_INGEST_WRITE_BEHIND:
+        ingest_queue.start()
+    yield
+    pool_task.cancel()
+    await asyncio.to_thread(ingest_queue.stop)
 
 app = FastAPI(
     title="Typer API",
     description="Typer API with FastAPI",
     version="1.0.0",
+    lifespan=lifespan,
 )
 
 # Configure CORS
@@ -22,6 +44,13 @@ app.add_middleware(
 async def root():
     return {"message": "Welcome to Typer API"}
 
+def _content_engine_status() -> str:
+    if content_engine.is_ready:
+        return "ready"
+    if content_engine.error is not None:
+        return "error"
+    return "warming"
+
 @app.get("/health")
 async def health_check(db: Session = Depends(get_db)):
     try:
@@ -29,15 +58,50 @@ async def health_check(db: Session = Depends(get_db)):
         db.execute("SELECT 1")
         return {
             "status": "healthy",
-            "database": "connected"
+            "database": "connected",
+            "content_engine": _content_engine_status()
         }
     except Exception as e:
         return {
             "status": "unhealthy",
             "database": "disconnected",
+            "content_engine": _content_engine_status(),
             "error": str(e)
         }
 
+@app.get("/ready")
+async def readiness_check():
+    """Report whether the content engine has finished warming up."""
+    return JSONResponse(
+        status_code=200 if content_engine.is_ready else 503,
+        content={
+            "ready": content_engine.is_ready,
+            "content_engine": _content_engine_status()
+        }
+    )
+
+@app.get("/memory", dependencies=[Depends(admin_required)])
+async def memory_usage():
+    """
+    Report this worker's resident memory split into private and shared bytes, and how
+    much of each memory-mapped corpus snapshot (default and loaded languages) it has
+    resident. Admins only, as it exposes file paths and process internals.
+    """
+    corpus_source = None
+    mapped_paths = []
+    if content_engine.is_ready:
+        snapshot = content_engine.get_handler().snapshot
+        corpus_source = "snapshot" if snapshot is not None else "memory"
+        if snapshot is not None:
+            mapped_paths.append(snapshot.path)
+    loaded_languages = language_registry.loaded()
+    mapped_paths += [language_registry.snapshot_path(language) for language in loaded_languages]
+    report = memory_report(mapped_paths)
+    report["content_engine"] = _content_engine_status()
+    report["corpus_source"] = corpus_source
+    report["languages"] = {"default": language_registry.default_language, "loaded": loaded_languages}
+    return report
+
 # Import and include routers
 from app.api.v1.api import api_router
 app.include_router(api_router, prefix="/api/v1") 
\ No newline at end of file
@@ -0,0 +1,252 @@
+"""
+Content generation benchmark and regression check.
+
+Measures, for the corpus in CORPUS_SNAPSHOT_PATH (and the local NLTK data, when
+present):
+
+- cold start: time and peak RSS of a fresh process building the text handler, both
+  from the snapshot and from NLTK
+- per call latency percentiles (p50/p95/p99) and throughput of
+  get_random_words / get_random_sentences for every level and flag combination, and of
+  UserTestService.get_test_content for every mode, level and flag combination
+
+Usage (from the backend directory)::
+
+    python -m benchmarks.content                      # print results
+    python -m benchmarks.content --save-baseline      # store them as the baseline
+    python -m benchmarks.content --check              # exit 1 on a regression
+
+Baselines are stored in benchmarks/baselines.json together with the corpus
+fingerprint and host they were measured on. They are only comparable on the same
+machine and corpus, so record them on the host that runs the check (e.g. the CI
+runner) and refresh them after intended performance changes. A metric regresses when
+it is worse than its baseline by more than --threshold (default 25%).
+"""
+import argparse
+import itertools
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from app.core.config import settings
+
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), "baselines.json")
+LEVELS = ("easy", "medium", "hard")
+FLAGS = list(itertools.product((False, True), repeat=2))  # (include_numbers, include_punctuation)
+NLTK_RESOURCES = ("corpora/brown", "corpora/gutenberg", "tokenizers/punkt", "tokenizers/punkt_tab")
+
+# Metrics where a larger value is a regression; every other metric regresses when smaller
+LOWER_IS_BETTER = {"p50_us", "p95_us", "p99_us", "seconds", "peak_rss_mb"}
+
+
+def _cold_start_child(source: str, snapshot: str) -> None:
+    """Build a handler in this (fresh) process and print its build time and peak RSS."""
+    from app.api.v1.endpoints.tests.utils import NLTKTextHandler
+
+    start = time.perf_counter()
+    NLTKTextHandler(snapshot_path=snapshot if source == "snapshot" else None)
+    seconds = time.perf_counter() - start
+    peak_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print(json.dumps({"seconds": seconds, "peak_rss_mb": peak_kb / 1024}))
+
+
+def _nltk_data_available() -> bool:
+    import nltk
+
+    try:
+        for name in NLTK_RESOURCES:
+            nltk.data.find(name)
+    except LookupError:
+        return False
+    return True
+
+
+def measure_cold_start(source: str, snapshot: str, repeat: int) -> Optional[Dict[str, float]]:
+    """
+    Median build time and peak RSS over `repeat` fresh interpreter processes.
+
+    :return: None if the source is unavailable offline
+    """
+    if source == "snapshot" and not os.path.exists(snapshot):
+        return None
+    if source == "nltk" and not _nltk_data_available():
+        return None
+    runs = []
+    for _ in range(repeat):
+        output = subprocess.run(
+            [sys.executable, "-m", "benchmarks.content", "--cold-start-child", source, "--snapshot", snapshot],
+            check=True, capture_output=True, text=True,
+        ).stdout
+        runs.append(json.loads(output.strip().splitlines()[-1]))
+    return {
+        "seconds": float(np.median([run["seconds"] for run in runs])),
+        "peak_rss_mb": float(np.median([run["peak_rss_mb"] for run in runs])),
+    }
+
+
+def measure_calls(fn: Callable[[], object], seconds: float, warmup: int = 20) -> Dict[str, float]:
+    """Call `fn` repeatedly for `seconds` and summarize per call latency and throughput."""
+    for _ in range(warmup):
+        fn()
+    latencies = []
+    start = time.perf_counter()
+    deadline = start + seconds
+    while True:
+        t0 = time.perf_counter_ns()
+        fn()
+        latencies.append(time.perf_counter_ns() - t0)
+        if time.perf_counter() >= deadline:
+            break
+    elapsed = time.perf_counter() - start
+    p50, p95, p99 = np.percentile(np.array(latencies) / 1000, [50, 95, 99])
+    return {"p50_us": float(p50), "p95_us": float(p95), "p99_us": float(p99), "ops_per_sec": len(latencies) / elapsed}
+
+
+def _flag_label(include_numbers: bool, include_punctuation: bool) -> str:
+    return f"numbers={int(include_numbers)},punctuation={int(include_punctuation)}"
+
+
+def call_cases(handler, count: int) -> List[Tuple[str, Callable[[], object]]]:
+    """Every benchmarked call, as (case name, zero-argument callable)."""
+    from app.api.v1.endpoints.tests.service import UserTestService
+
+    test_service = UserTestService(None, handler)
+    cases = []
+    for level, (numbers, punctuation) in itertools.product(LEVELS, FLAGS):
+        cases.append((
+            f"get_random_words/{level}/{_flag_label(numbers, punctuation)}",
+            lambda level=level, numbers=numbers, punctuation=punctuation:
+                handler.get_random_words(level, count, numbers, punctuation),
+        ))
+    for numbers in (False, True):
+        cases.append((
+            f"get_random_sentences/{_flag_label(numbers, False)}",
+            lambda numbers=numbers: handler.get_random_sentences(5, numbers),
+        ))
+
+    content_params = []
+    for mode in ("words", "custom"):
+        for level, (numbers, punctuation) in itertools.product(LEVELS, FLAGS):
+            content_params.append(dict(
+                mode=mode, count=count, level=level, include_numbers=numbers, include_punctuation=punctuation
+            ))
+    for layout in ("qwerty", "dvorak", "colemak"):
+        content_params.append(dict(mode="words", count=count, difficulty="40-60", layout=layout))
+    for numbers in (False, True):
+        content_params += [
+            dict(mode="sentences", include_numbers=numbers),
+            dict(mode="sentences", count=5, include_numbers=numbers),
+            dict(mode="sentences", target_chars=1000, include_numbers=numbers),
+            dict(mode="sentences", target_seconds=60, include_numbers=numbers),
+        ]
+    content_params += [dict(mode="zen"), dict(mode="zen", target_seconds=300)]
+    for level in (None,) + LEVELS:
+        content_params.append(dict(mode="code", level=level))
+    for params in content_params:
+        name = "get_test_content/" + ",".join(f"{key}={value}" for key, value in params.items())
+        cases.append((name, lambda params=params: test_service.get_test_content(**params)))
+    return cases
+
+
+def run(args: argparse.Namespace) -> Dict:
+    from app.api.v1.endpoints.tests.utils import NLTKTextHandler
+
+    results: Dict = {"cold_start": {}, "calls": {}}
+    for source in ("snapshot", "nltk"):
+        measured = measure_cold_start(source, args.snapshot, args.cold_start_repeat)
+        if measured is None:
+            print(f"cold start/{source:<8} skipped (not available offline)")
+            continue
+        results["cold_start"][source] = measured
+        print(f"cold start/{source:<8} {measured['seconds']:8.3f} s  peak RSS {measured['peak_rss_mb']:8.1f} MB")
+
+    handler = NLTKTextHandler(snapshot_path=args.snapshot)
+    results["fingerprint"] = handler.fingerprint
+    print(f"\n{'case':<96}{'p50 us':>10}{'p95 us':>10}{'p99 us':>10}{'ops/sec':>12}")
+    for name, fn in call_cases(handler, args.count):
+        if args.filter and args.filter not in name:
+            continue
+        measured = measure_calls(fn, args.seconds)
+        results["calls"][name] = measured
+        print(
+            f"{name:<96}{measured['p50_us']:>10.1f}{measured['p95_us']:>10.1f}"
+            f"{measured['p99_us']:>10.1f}{measured['ops_per_sec']:>12,.0f}"
+        )
+    return results
+
+
+def compare(results: Dict, baseline: Dict, threshold: float) -> List[str]:
+    """
+    List every metric worse than its baseline by more than `threshold`. Metrics missing
+    from either side are ignored.
+    """
+    regressions = []
+    for group in ("cold_start", "calls"):
+        for name, metrics in results[group].items():
+            for metric, value in metrics.items():
+                base = baseline.get(group, {}).get(name, {}).get(metric)
+                if not base:
+                    continue
+                if metric in LOWER_IS_BETTER:
+                    worse = value > base * (1 + threshold)
+                else:
+                    worse = value < base / (1 + threshold)
+                if worse:
+                    regressions.append(f"{group}/{name} {metric}: {value:,.2f} vs baseline {base:,.2f}")
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--snapshot", default=settings.CORPUS_SNAPSHOT_PATH)
+    parser.add_argument("--seconds", type=float, default=0.5, help="Measurement time per case")
+    parser.add_argument("--count", type=int, default=25, help="Words per test for word modes")
+    parser.add_argument("--cold-start-repeat", type=int, default=3)
+    parser.add_argument("--filter", default=None, help="Only run call cases whose name contains this")
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--check", action="store_true", help="Exit with status 1 if any metric regressed")
+    parser.add_argument("--threshold", type=float, default=0.25)
+    parser.add_argument("--cold-start-child", choices=("snapshot", "nltk"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.cold_start_child:
+        _cold_start_child(args.cold_start_child, args.snapshot)
+        return
+
+    results = run(args)
+    results["host"] = platform.node()
+
+    if args.save_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+        print(f"\nSaved baseline to {args.baseline}")
+
+    if args.check:
+        if not os.path.exists(args.baseline):
+            sys.exit(f"No baseline at {args.baseline}; run with --save-baseline first.")
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        if baseline.get("fingerprint") != results["fingerprint"]:
+            sys.exit(
+                f"Baseline was measured on corpus {baseline.get('fingerprint')}, "
+                f"not {results['fingerprint']}; refresh it with --save-baseline."
+            )
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) beyond {args.threshold:.0%}:")
+            for line in regressions:
+                print(f"  {line}")
+            sys.exit(1)
+        print(f"\nNo regressions beyond {args.threshold:.0%} (baseline from {baseline.get('host')}).")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""
+Keystroke stream size and decode throughput.
+
+Simulates typists at several speeds over corpus text (log-normal inter-key times,
+occasional errors followed by a correction) and prints, per stream length, the size
+of the encoded stream per keystroke (stored, and base64 in the request body) against
+plain JSON events, and how many keystrokes per second decode_keystrokes and
+keystroke_char_logs get through.
+
+Usage (from the backend directory)::
+
+    python -m benchmarks.keystrokes [--snapshot data/corpus.snap] [--seconds 1]
+"""
+import argparse
+import base64
+import json
+import time
+
+import numpy as np
+
+from app.core.config import settings
+from app.api.v1.endpoints.tests.codec import decode_keystrokes, encode_keystrokes, keystroke_char_logs
+from app.api.v1.endpoints.tests.utils import NLTKTextHandler
+
+WORD_COUNTS = (25, 100, 400)
+WPMS = (45, 90, 140)
+ERROR_RATE = 0.04
+
+
+def _simulate(text: str, wpm: int, rng: np.random.Generator):
+    """Keystrokes of a typist at `wpm` typing `text`, each error followed by a retry."""
+    mean_ms = 60000 / (wpm * 5)
+    keys, correct = [], []
+    for char in text:
+        if rng.random() < ERROR_RATE:
+            keys.append(char)
+            correct.append(False)
+        keys.append(char)
+        correct.append(True)
+    deltas = rng.lognormal(np.log(mean_ms), 0.45, len(keys)).astype(np.int64)
+    deltas[0] = 0
+    return keys, deltas.tolist(), correct
+
+
+def _calls_per_second(fn, seconds: float) -> float:
+    calls = 0
+    start = time.perf_counter()
+    deadline = start + seconds
+    while time.perf_counter() < deadline:
+        fn()
+        calls += 1
+    return calls / (time.perf_counter() - start)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--snapshot", default=settings.CORPUS_SNAPSHOT_PATH)
+    parser.add_argument("--seconds", type=float, default=1.0, help="Measurement time per case")
+    args = parser.parse_args()
+
+    handler = NLTKTextHandler(snapshot_path=args.snapshot)
+    rng = np.random.default_rng(0)
+    print(
+        f"{'words':>6}{'wpm':>6}{'keystrokes':>12}{'B/key':>8}{'base64 B/key':>14}{'JSON B/key':>12}"
+        f"{'decode keys/s':>16}{'char logs keys/s':>18}"
+    )
+    for words in WORD_COUNTS:
+        for wpm in WPMS:
+            text = " ".join(handler.get_random_words("medium", words, False, False))
+            keys, deltas, correct = _simulate(text, wpm, rng)
+            blob = encode_keystrokes(keys, deltas, correct)
+            as_json = json.dumps([[key, delta, int(ok)] for key, delta, ok in zip(keys, deltas, correct)])
+            n = len(keys)
+            decode = _calls_per_second(lambda: decode_keystrokes(blob, settings.TEST_KEYSTROKES_MAX_EVENTS), args.seconds)
+            decoded = decode_keystrokes(blob, settings.TEST_KEYSTROKES_MAX_EVENTS)
+            aggregate = _calls_per_second(lambda: keystroke_char_logs(decoded), args.seconds)
+            print(
+                f"{words:>6}{wpm:>6}{n:>12,}{len(blob) / n:>8.2f}{len(base64.b64encode(blob)) / n:>14.2f}"
+                f"{len(as_json) / n:>12.2f}{decode * n:>16,.0f}{aggregate * n:>18,.0f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
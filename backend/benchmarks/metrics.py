@@ -0,0 +1,84 @@
+"""
+Metrics engine throughput: keystrokes per second through compute_metrics_batch at
+several batch sizes (1 is the submission path, large batches the recompute job),
+against a per-keystroke Python loop, and end to end with decoding the stored blobs.
+
+Usage (from the backend directory)::
+
+    python -m benchmarks.metrics [--tests 4000] [--keystrokes 500]
+"""
+import argparse
+import time
+
+import numpy as np
+
+from app.api.v1.endpoints.tests.codec import Keystrokes, decode_keystrokes, encode_keystrokes
+from app.api.v1.endpoints.tests.metrics import compute_metrics_batch
+
+BATCH_SIZES = (1, 100, 1000)
+
+
+def _python_metrics(stream: Keystrokes):
+    """Straightforward per-keystroke loop over the totals and the per-second series."""
+    elapsed = 0
+    seconds = {}
+    correct = 0
+    for delta, ok in zip(stream.delta_ms.tolist(), stream.correct.tolist()):
+        elapsed += delta
+        correct += ok
+        seconds[elapsed // 1000] = seconds.get(elapsed // 1000, 0) + 1
+    minutes = elapsed / 60000
+    series = [count * 12 for count in seconds.values()]
+    mean = sum(series) / len(series)
+    cv = (sum((x - mean) ** 2 for x in series) / len(series)) ** 0.5 / mean
+    return correct / 5 / minutes, len(stream.delta_ms) / 5 / minutes, correct * 100 / len(stream.delta_ms), 100 * (1 - cv)
+
+
+def _timed(fn) -> float:
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tests", type=int, default=4000)
+    parser.add_argument("--keystrokes", type=int, default=500, help="Keystrokes per test")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    streams = [
+        Keystrokes(
+            keys=["a"],
+            key_index=np.zeros(args.keystrokes, dtype=np.uint8),
+            delta_ms=rng.lognormal(np.log(150), 0.45, args.keystrokes).astype(np.uint32),
+            correct=rng.random(args.keystrokes) > 0.04
+        ) for _ in range(args.tests)
+    ]
+    total = args.tests * args.keystrokes
+    print(f"{args.tests:,} tests x {args.keystrokes} keystrokes = {total:,} keystrokes")
+    print(f"{'':<24}{'batch':>8}{'keystrokes/s':>16}{'tests/s':>12}")
+
+    sample = streams[:max(1, args.tests // 20)]
+    seconds = _timed(lambda: [_python_metrics(stream) for stream in sample])
+    rate = len(sample) / seconds
+    print(f"{'python loop':<24}{1:>8}{rate * args.keystrokes:>16,.0f}{rate:>12,.0f}")
+
+    for batch in BATCH_SIZES:
+        seconds = _timed(lambda: [
+            compute_metrics_batch(streams[start:start + batch]) for start in range(0, len(streams), batch)
+        ])
+        print(f"{'compute_metrics_batch':<24}{batch:>8}{total / seconds:>16,.0f}{args.tests / seconds:>12,.0f}")
+
+    blobs = [
+        encode_keystrokes(["a"] * args.keystrokes, stream.delta_ms, stream.correct) for stream in streams
+    ]
+    seconds = _timed(lambda: [
+        compute_metrics_batch([decode_keystrokes(blob, args.keystrokes) for blob in blobs[start:start + 1000]])
+        for start in range(0, len(blobs), 1000)
+    ])
+    print(f"{'decode + compute':<24}{1000:>8}{total / seconds:>16,.0f}{args.tests / seconds:>12,.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+"""
+Progress chart and heatmap cost for a user with years of tests: daily and weekly
+averages computed from the full test history (GET /me/typing, aggregated by the
+client) against reading the rollup buckets (GET /me/progress), and per-character
+totals from every test's character logs (include=char_logs) against user_char_stats
+(GET /me/heatmap). Also prints the cost the aggregates add to a submission.
+
+Usage (from the backend directory)::
+
+    python -m benchmarks.progress                          # temporary SQLite file
+    python -m benchmarks.progress --database-url postgresql+psycopg://...
+
+Against a real server, point --database-url at a scratch database: tables are created
+if missing and the benchmark user and its tests are deleted afterwards.
+"""
+import argparse
+import os
+import random
+import string
+import tempfile
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta, UTC
+from uuid import uuid4
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.db.base import Base
+from app.api.v1.endpoints.user.models import User
+from app.api.v1.endpoints.tests import models, schemas
+from app.api.v1.endpoints.tests.ids import uuid7
+from app.api.v1.endpoints.tests.repository import UserTestRepository, rollup_bucket
+from app.api.v1.endpoints.tests.service import UserTestService
+
+
+# (granularity, filters) of each measured chart
+CHARTS = (("day", {}), ("week", {}), ("day", {"test_type": "time", "duration": 60}))
+
+
+def _history_progress(service: UserTestService, user_id: str, granularity: str, **filters):
+    """What the client does today: fetch every test and average them per bucket."""
+    tests, _ = service.get_test_history(user_id)
+    buckets = defaultdict(list)
+    for test in tests:
+        if any(getattr(test, name) != value for name, value in filters.items()):
+            continue
+        buckets[(rollup_bucket(granularity, test.timestamp.date()), test.test_type, test.duration)].append(test.wpm)
+    return {key: sum(wpms) / len(wpms) for key, wpms in buckets.items()}
+
+
+def _history_heatmap(service: UserTestService, user_id: str):
+    """Per-character totals over every test's character logs, as the client does today."""
+    tests, _ = service.get_test_history(user_id, include="char_logs")
+    totals = defaultdict(lambda: [0, 0, 0])
+    for test in tests:
+        for log in test.char_logs:
+            entry = totals[log.char]
+            entry[0] += log.attempts
+            entry[1] += log.errors
+            entry[2] += log.total_time
+    return totals
+
+
+def _best_ms(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", default=None, help="Defaults to a temporary SQLite file")
+    parser.add_argument("--tests", type=int, default=20000)
+    parser.add_argument("--years", type=float, default=3.0, help="Span of the history")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    tmp_dir = None
+    url = args.database_url
+    if url is None:
+        tmp_dir = tempfile.TemporaryDirectory()
+        url = f"sqlite:///{os.path.join(tmp_dir.name, 'progress.db')}"
+    engine = create_engine(url)
+    Base.metadata.create_all(engine)
+    Session = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+    user_id = str(uuid4())
+    rng = random.Random(0)
+    start = datetime.now(UTC) - timedelta(days=365 * args.years)
+    step = timedelta(days=365 * args.years) / args.tests
+    try:
+        with Session() as db:
+            db.add(User(id=user_id, email=f"{user_id}@bench.local", username=f"bench-{user_id[:8]}"))
+            db.commit()
+            repository = UserTestRepository(db)
+            tests = [
+                (uuid7(), user_id, schemas.UserTestCreate(
+                    wpm=rng.uniform(40, 120), raw_wpm=rng.uniform(60, 130), accuracy=rng.uniform(85, 100),
+                    consistency=rng.uniform(60, 95), test_type=rng.choice(["time", "words"]),
+                    duration=rng.choice([15, 30, 60]), chars={"correct": 200, "incorrect": 5},
+                    timestamp=start + step * i, char_logs=[
+                        schemas.UserTestCharLogCreate(
+                            char=char, attempts=10, errors=rng.randint(0, 3), total_time=rng.randint(1000, 3000)
+                        )
+                        for char in rng.sample(string.ascii_lowercase, 20)
+                    ]
+                )) for i in range(args.tests)
+            ]
+            insert_ms = _best_ms(lambda: repository.insert_tests(tests[:1000]), 1) / 1000
+            for offset in range(1000, len(tests), 1000):
+                repository.insert_tests(tests[offset:offset + 1000])
+
+            service = UserTestService(db)
+            print(f"{engine.dialect.name}: {args.tests:,} tests over {args.years:g} years")
+            print(f"{'':<16}{'history rows':>14}{'history ms':>12}{'rollup rows':>13}{'rollups ms':>12}{'speedup':>10}")
+            for granularity, filters in CHARTS:
+                history = _best_ms(lambda: _history_progress(service, user_id, granularity, **filters), args.repeat)
+                rows = len(service.get_progress(user_id, granularity, **filters))
+                rollups = _best_ms(lambda: service.get_progress(user_id, granularity, **filters), args.repeat)
+                label = granularity + (", one mode" if filters else "")
+                print(f"{label:<16}{args.tests:>14,}{history:>12.1f}{rows:>13,}{rollups:>12.2f}{history / rollups:>9.0f}x")
+            history = _best_ms(lambda: _history_heatmap(service, user_id), args.repeat)
+            rows = len(service.get_char_heatmap(user_id).chars)
+            aggregate = _best_ms(lambda: service.get_char_heatmap(user_id), args.repeat)
+            print(f"{'heatmap':<16}{args.tests:>14,}{history:>12.1f}{rows:>13,}{aggregate:>12.2f}{history / aggregate:>9.0f}x")
+            print(f"insert with stats, rollups and char stats: {insert_ms:.3f} ms per test (batches of 1000)")
+    finally:
+        with Session() as db:
+            db.query(models.UserCharStats).filter(models.UserCharStats.user_id == user_id).delete(synchronize_session=False)
+            db.query(models.UserTestRollup).filter(models.UserTestRollup.user_id == user_id).delete(synchronize_session=False)
+            db.query(models.UserStats).filter(models.UserStats.user_id == user_id).delete(synchronize_session=False)
+            db.query(models.UserTest).filter(models.UserTest.user_id == user_id).delete(synchronize_session=False)
+            db.query(User).filter(User.id == user_id).delete(synchronize_session=False)
+            db.commit()
+        engine.dispose()
+        if tmp_dir is not None:
+            tmp_dir.cleanup()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+"""
+Test submission throughput: UserTestRepository.create_test (one transaction, one row
+with packed character logs) vs. the original per-row ORM insert (commit, refresh, one
+row per character log in a separate table and a second commit), at 50-100 character
+logs per test. Also prints the size of the packed logs.
+
+Usage (from the backend directory)::
+
+    python -m benchmarks.submissions                          # temporary SQLite file
+    python -m benchmarks.submissions --database-url postgresql+psycopg://...
+
+Against a real server, point --database-url at a scratch database: tables are created
+if missing and the benchmark user and its tests are deleted afterwards.
+"""
+import argparse
+import os
+import random
+import string
+import tempfile
+import time
+from datetime import datetime, UTC
+from uuid import uuid4
+
+from sqlalchemy import Column, Integer, MetaData, String, Table, create_engine, insert
+from sqlalchemy.orm import sessionmaker
+
+from app.db.base import Base
+from app.api.v1.endpoints.user.models import User
+from app.api.v1.endpoints.tests import models, schemas
+from app.api.v1.endpoints.tests.codec import pack_char_logs
+from app.api.v1.endpoints.tests.repository import UserTestRepository
+
+CHAR_LOG_COUNTS = (50, 75, 100)
+
+# The former user_test_char_logs table (minus its foreign key), for the per-row comparison
+legacy_metadata = MetaData()
+legacy_char_logs = Table(
+    "bench_legacy_char_logs", legacy_metadata,
+    Column("id", String, primary_key=True, index=True),
+    Column("test_id", String, nullable=False, index=True),
+    Column("char", String, nullable=False),
+    Column("attempts", Integer, nullable=False),
+    Column("errors", Integer, nullable=False),
+    Column("total_time", Integer, nullable=False),
+)
+
+
+def _sample_test(n_logs: int, rng: random.Random) -> schemas.UserTestCreate:
+    chars = (string.ascii_letters + string.digits + string.punctuation)[:n_logs]
+    char_logs = []
+    for char in chars:
+        attempts = rng.randint(1, 40)
+        char_logs.append(schemas.UserTestCharLogCreate(
+            char=char, attempts=attempts, errors=rng.randint(0, attempts), total_time=rng.randint(100, 9000)
+        ))
+    return schemas.UserTestCreate(
+        wpm=92.5, raw_wpm=97.0, accuracy=96.4, consistency=81.0, test_type="words", duration=60,
+        char_logs=char_logs, chars={"correct": 460, "incorrect": 12}
+    )
+
+
+def _create_test_per_row(db, user_id: str, test: schemas.UserTestCreate) -> None:
+    """The original implementation of UserTestRepository.create_test, for comparison."""
+    db_test = models.UserTest(
+        id=str(uuid4()), user_id=user_id, wpm=test.wpm, raw_wpm=test.raw_wpm, accuracy=test.accuracy,
+        consistency=test.consistency, test_type=test.test_type, language=test.language,
+        duration=test.duration, chars=test.chars, restarts=test.restarts,
+        timestamp=test.timestamp or datetime.now(UTC)
+    )
+    db.add(db_test)
+    db.commit()
+    db.refresh(db_test)
+    for log in test.char_logs:
+        db.execute(insert(legacy_char_logs).values(
+            id=str(uuid4()), test_id=db_test.id, char=log.char, attempts=log.attempts,
+            errors=log.errors, total_time=log.total_time
+        ))
+    db.commit()
+
+
+def _submissions_per_second(submit, seconds: float) -> float:
+    calls = 0
+    start = time.perf_counter()
+    deadline = start + seconds
+    while time.perf_counter() < deadline:
+        submit()
+        calls += 1
+    return calls / (time.perf_counter() - start)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", default=None, help="Defaults to a temporary SQLite file")
+    parser.add_argument("--seconds", type=float, default=2.0, help="Measurement time per case")
+    args = parser.parse_args()
+
+    tmp_dir = None
+    url = args.database_url
+    if url is None:
+        tmp_dir = tempfile.TemporaryDirectory()
+        url = f"sqlite:///{os.path.join(tmp_dir.name, 'submissions.db')}"
+    engine = create_engine(url)
+    Base.metadata.create_all(engine)
+    legacy_metadata.create_all(engine)
+    Session = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+    user_id = str(uuid4())
+    with Session() as db:
+        db.add(User(id=user_id, email=f"{user_id}@bench.local", username=f"bench-{user_id[:8]}"))
+        db.commit()
+
+    rng = random.Random(0)
+    print(f"{engine.dialect.name}: {'char logs':>10}{'per-row ORM/s':>16}{'packed/s':>12}{'speedup':>10}{'packed bytes':>14}")
+    try:
+        for n_logs in CHAR_LOG_COUNTS:
+            test = _sample_test(n_logs, rng)
+            with Session() as db:
+                per_row = _submissions_per_second(lambda: _create_test_per_row(db, user_id, test), args.seconds)
+            with Session() as db:
+                repository = UserTestRepository(db)
+                packed = _submissions_per_second(lambda: repository.create_test(user_id, test), args.seconds)
+            packed_bytes = len(pack_char_logs([
+                (log.char, log.attempts, log.errors, log.total_time) for log in test.char_logs
+            ]))
+            print(
+                f"{'':<{len(engine.dialect.name) + 2}}{n_logs:>10}{per_row:>16,.0f}{packed:>12,.0f}"
+                f"{packed / per_row:>9.1f}x{packed_bytes:>14,}"
+            )
+    finally:
+        legacy_metadata.drop_all(engine)
+        with Session() as db:
+            db.query(models.UserTest).filter(models.UserTest.user_id == user_id).delete(synchronize_session=False)
+            db.query(User).filter(User.id == user_id).delete(synchronize_session=False)
+            db.commit()
+        engine.dispose()
+        if tmp_dir is not None:
+            tmp_dir.cleanup()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+"""
+Word sampler throughput: one test per call vs. vectorized batches.
+
+Usage (from the backend directory)::
+
+    python -m benchmarks.word_sampler [--snapshot data/corpus.snap] [--seconds 2]
+"""
+import argparse
+import time
+
+from app.core.config import settings
+from app.api.v1.endpoints.tests.utils import NLTKTextHandler
+
+
+def _tests_per_second(fn, tests_per_call: int, seconds: float) -> float:
+    calls = 0
+    start = time.perf_counter()
+    deadline = start + seconds
+    while time.perf_counter() < deadline:
+        fn()
+        calls += 1
+    return calls * tests_per_call / (time.perf_counter() - start)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--snapshot", default=settings.CORPUS_SNAPSHOT_PATH)
+    parser.add_argument("--seconds", type=float, default=2.0)
+    parser.add_argument("--count", type=int, default=25)
+    args = parser.parse_args()
+
+    handler = NLTKTextHandler(snapshot_path=args.snapshot)
+    print(f"{'level':<8}{'flags':<8}{'batch':>6}{'tests/sec':>14}")
+    for level in ("easy", "medium", "hard"):
+        for flags in ((False, False), (True, True)):
+            label = "n+p" if flags[0] else "-"
+            rate = _tests_per_second(
+                lambda: handler.get_random_words(level, args.count, *flags), 1, args.seconds
+            )
+            print(f"{level:<8}{label:<8}{1:>6}{rate:>14,.0f}")
+            for batch in (16, 64):
+                rate = _tests_per_second(
+                    lambda: handler.sample_words_batch(level, args.count, batch, *flags), batch, args.seconds
+                )
+                print(f"{level:<8}{label:<8}{batch:>6}{rate:>14,.0f}")
+
+
+if __name__ == "__main__":
+    main()
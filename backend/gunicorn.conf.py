@@ -0,0 +1,21 @@
+"""
+Gunicorn configuration for serving the API with several worker processes::
+
+    gunicorn app.main:app -c gunicorn.conf.py
+
+The master prepares the corpus snapshot before forking, so workers start by mapping
+the same file and share its pages instead of each building the corpus in memory.
+Check per-worker private vs shared memory at GET /memory.
+"""
+import multiprocessing
+import os
+
+bind = os.getenv("BIND", "0.0.0.0:8000")
+workers = int(os.getenv("WEB_CONCURRENCY", multiprocessing.cpu_count()))
+worker_class = "uvicorn.workers.UvicornWorker"
+
+
+def on_starting(server):
+    from app.api.v1.endpoints.tests.utils import content_engine
+
+    content_engine.prepare_snapshot()
@@ -0,0 +1,154 @@
+"""
+Test setup: a temporary SQLite database and a small corpus snapshot built from
+generated text. The environment is set before anything from `app` is imported, since
+settings, the engine and the content engine are created at import time.
+"""
+import importlib.util
+import os
+import random
+import tempfile
+import uuid
+
+_tmp_dir = tempfile.mkdtemp(prefix="typer-tests-")
+os.environ["SQLALCHEMY_DATABASE_URI"] = f"sqlite:///{os.path.join(_tmp_dir, 'typer.db')}"
+os.environ["CORPUS_SNAPSHOT_PATH"] = os.path.join(_tmp_dir, "corpus.snap")
+os.environ["TEST_INGEST_WRITE_BEHIND"] = "false"
+os.environ["TEST_INGEST_SPILL_DIR"] = os.path.join(_tmp_dir, "ingest")
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.api.v1.endpoints.tests.utils.snapshot import build_text_snapshot
+
+
+def corpus_text(seed: int = 0, words: int = 1500, sentences: int = 3000) -> str:
+    """Sentences of made-up words with a skewed frequency, enough for every level."""
+    rng = random.Random(seed)
+    vocabulary = sorted({
+        "".join(rng.choice("abcdefghijklmnopqrstuvwxyz") for _ in range(rng.randint(2, 9))) for _ in range(words)
+    })
+    weights = [1 / (rank + 1) for rank in range(len(vocabulary))]
+    text = []
+    for _ in range(sentences):
+        sentence = " ".join(rng.choices(vocabulary, weights, k=rng.randint(4, 12)))
+        text.append(sentence.capitalize() + ".")
+    return " ".join(text)
+
+
+build_text_snapshot(
+    os.environ["CORPUS_SNAPSHOT_PATH"], [corpus_text()], "english",
+    easy_count=200, medium_count=400, hard_count=400
+)
+
+from app.db.base import Base
+from app.db.session import SessionLocal, engine
+from app.main import app  # Imports every model
+from app.api.v1.endpoints.tests.repository import UserTestRepository
+
+
+def sample_test(**fields) -> dict:
+    """Body of a test submission; keyword arguments override its fields."""
+    test = {
+        "wpm": 80.0, "raw_wpm": 85.0, "accuracy": 97.0, "consistency": 80.0, "test_type": "time", "duration": 30,
+        "char_logs": [
+            {"char": "q", "attempts": 20, "errors": 10, "total_time": 9000},
+            {"char": "e", "attempts": 200, "errors": 2, "total_time": 30000},
+        ],
+        "chars": {"correct": 100, "incorrect": 3, "extra": 0, "missed": 0},
+        "restarts": 0,
+    }
+    test.update(fields)
+    return test
+
+
+def char_logs(**chars) -> list:
+    """Char logs from char=(attempts, errors, total_time) keywords."""
+    return [dict(char=c, attempts=a, errors=e, total_time=t) for c, (a, e, t) in chars.items()]
+
+
+def create_test(client, headers, **fields) -> str:
+    """Save sample_test(**fields) and return its id."""
+    response = client.post("/api/v1/tests/me/typing", json=sample_test(**fields), headers=headers)
+    assert response.status_code == 201, response.text
+    return response.json()["id"]
+
+
+def load_migration(filename: str):
+    """Import an Alembic revision module from alembic/versions."""
+    path = os.path.join(os.path.dirname(__file__), "..", "alembic", "versions", filename)
+    spec = importlib.util.spec_from_file_location(filename[:-3], path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def assert_matches_rebuild(db, *models):
+    """The incrementally maintained rows of `models` equal what rebuild_stats() computes."""
+    def snapshot():
+        return [
+            sorted(
+                (tuple(getattr(row, column.name) for column in model.__table__.columns) for row in db.query(model)),
+                key=lambda row: [str(value) for value in row]
+            )
+            for model in models
+        ]
+    incremental = snapshot()
+    UserTestRepository(db).rebuild_stats()
+    db.commit()
+    for rebuilt_rows, rows in zip(snapshot(), incremental):
+        assert len(rebuilt_rows) == len(rows)
+        for rebuilt, row in zip(rebuilt_rows, rows):
+            # Sums of floats depend on the order they were added in
+            assert rebuilt == tuple(pytest.approx(value, rel=1e-9) if isinstance(value, float) else value for value in row)
+
+
+@pytest.fixture(autouse=True)
+def database():
+    """Fresh tables for every test."""
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    yield
+
+
+@pytest.fixture
+def db():
+    with SessionLocal() as session:
+        yield session
+
+
+@pytest.fixture(scope="session")
+def client():
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+@pytest.fixture
+def auth_headers(client):
+    """Authorization header of a newly registered user."""
+    name = f"user{uuid.uuid4().hex[:12]}"
+    response = client.post(
+        "/api/v1/users/register", json={"email": f"{name}@example.com", "username": name, "password": "password123"}
+    )
+    assert response.status_code == 200, response.text
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+@pytest.fixture
+def user_id(client, auth_headers):
+    return client.get("/api/v1/users/me", headers=auth_headers).json()["id"]
+
+
+@pytest.fixture
+def history(client, auth_headers):
+    """Tests over two weeks and two durations; returns their ids by name."""
+    return {
+        "mon": create_test(client, auth_headers, wpm=50, timestamp="2026-01-05T10:00:00Z", char_logs=char_logs(a=(10, 5, 3000))),
+        "wed": create_test(
+            client, auth_headers, wpm=90, timestamp="2026-01-07T10:00:00Z", char_logs=char_logs(a=(10, 0, 1000), b=(4, 1, 800))
+        ),
+        "wed_tz": create_test(
+            client, auth_headers, wpm=70, timestamp="2026-01-07T23:30:00-02:00", char_logs=char_logs(c=(3, 1, 900))
+        ),
+        "next": create_test(client, auth_headers, wpm=60, timestamp="2026-01-12T08:00:00Z"),
+        "long": create_test(client, auth_headers, wpm=40, duration=60, timestamp="2026-01-12T09:00:00Z"),
+    }
@@ -0,0 +1,70 @@
+import pytest
+import sqlalchemy as sa
+from alembic.migration import MigrationContext
+from alembic.operations import Operations
+
+from app.api.v1.endpoints.tests.codec import MAX_CHAR_LOGS, CodecError, pack_char_logs, unpack_char_logs
+from conftest import load_migration
+
+
+def test_char_logs_round_trip():
+    logs = [("a", 10, 2, 1500), ("é", 3, 0, 700), ("Shift", 1, 1, 0xFFFFFFFF), ("字", 0, 0, 0)]
+    assert unpack_char_logs(pack_char_logs(logs)) == logs
+    assert unpack_char_logs(pack_char_logs([])) == []
+
+
+def test_char_logs_limits():
+    pack_char_logs([("x" * 255, 1, 0, 1)])
+    with pytest.raises(ValueError):
+        pack_char_logs([("x" * 256, 1, 0, 1)])
+    with pytest.raises(ValueError):
+        pack_char_logs([("é" * 128, 1, 0, 1)])  # 256 bytes in UTF-8
+    with pytest.raises(ValueError):
+        pack_char_logs([("a", 1, 0, 1)] * (MAX_CHAR_LOGS + 1))
+    with pytest.raises(ValueError):
+        pack_char_logs([("a", 1, 0, 0x100000000)])
+    with pytest.raises(ValueError):
+        pack_char_logs([("a", -1, 0, 1)])
+
+
+def test_char_logs_corrupt():
+    packed = pack_char_logs([("a", 1, 0, 1), ("b", 2, 1, 3)])
+    with pytest.raises(CodecError):
+        unpack_char_logs(packed[:10])
+    with pytest.raises(CodecError):
+        unpack_char_logs(packed[:-1])
+    with pytest.raises(CodecError):
+        unpack_char_logs(b"\x02" + packed[1:])
+
+
+def test_pack_migration_skips_overlong_chars(tmp_path):
+    engine = sa.create_engine(f"sqlite:///{tmp_path / 'legacy.db'}")
+    metadata = sa.MetaData()
+    sa.Table("user_tests", metadata, sa.Column("id", sa.String, primary_key=True))
+    char_logs = sa.Table(
+        "user_test_char_logs", metadata,
+        sa.Column("id", sa.String, primary_key=True, index=True),
+        sa.Column("test_id", sa.String, index=True),
+        sa.Column("char", sa.String),
+        sa.Column("attempts", sa.Integer),
+        sa.Column("errors", sa.Integer),
+        sa.Column("total_time", sa.Integer),
+        sa.Index("ix_user_test_char_logs_test_char", "test_id", "char"),
+    )
+    metadata.create_all(engine)
+    with engine.begin() as connection:
+        connection.execute(sa.text("INSERT INTO user_tests (id) VALUES ('t1'), ('t2')"))
+        connection.execute(char_logs.insert(), [
+            dict(id="1", test_id="t1", char="a", attempts=3, errors=1, total_time=300),
+            dict(id="2", test_id="t1", char="x" * 300, attempts=1, errors=0, total_time=100),
+            dict(id="3", test_id="t1", char="é" * 16, attempts=2, errors=0, total_time=200),
+            dict(id="4", test_id="t2", char="y" * 33, attempts=1, errors=0, total_time=100),
+        ])
+
+    migration = load_migration("b81f4c2d9e07_pack_char_logs_into_user_tests.py")
+    with engine.begin() as connection, Operations.context(MigrationContext.configure(connection)):
+        migration.upgrade()
+    with engine.connect() as connection:
+        packed = dict(connection.execute(sa.text("SELECT id, char_logs_packed FROM user_tests")).all())
+    assert unpack_char_logs(packed["t1"]) == [("a", 3, 1, 300), ("é" * 16, 2, 0, 200)]
+    assert unpack_char_logs(packed["t2"]) == []
@@ -0,0 +1,107 @@
+import gc
+import weakref
+
+import pytest
+
+from app.api.v1.endpoints.tests.router import content_pool
+from app.api.v1.endpoints.tests.utils import language_registry
+from app.api.v1.endpoints.tests.utils.snapshot import build_text_snapshot
+from conftest import corpus_text
+
+
+def test_invalid_specs_are_not_pooled(client):
+    keys = content_pool.stats()["keys"]
+    for params in ({"mode": "words", "count": -3}, {"mode": "words", "count": 10**7}, {"mode": "nope"}):
+        assert client.get("/api/v1/tests/content", params=params).status_code == 400
+    assert content_pool.stats()["keys"] == keys
+    assert client.get("/api/v1/tests/content", params={"mode": "words", "count": 7}).status_code == 200
+    assert content_pool.stats()["keys"] == keys + 1
+
+
+def test_counts_are_bounded(client):
+    for params in (
+        {"mode": "words", "count": 0},
+        {"mode": "words", "count": -3},
+        {"mode": "words", "count": 201},  # easy pool of the test corpus holds 200 words
+        {"mode": "custom", "difficulty": "0-100", "count": 0},
+        {"mode": "sentences", "count": 0},
+        {"mode": "sentences", "count": 10**6},
+        {"mode": "code", "count": 0},
+    ):
+        response = client.get("/api/v1/tests/content", params=params)
+        assert response.status_code == 400, params
+        assert "count" in response.json()["detail"] or "Requested" in response.json()["detail"]
+    words = client.get("/api/v1/tests/content", params={"mode": "words", "count": 200}).json()
+    assert len(words["content"].split()) == 200
+    assert len(client.get("/api/v1/tests/content", params={"mode": "words"}).json()["content"].split()) == 25
+
+
+def test_content_ids_round_trip(client):
+    content = client.get("/api/v1/tests/content", params={"mode": "words", "count": 10}).json()
+    response = client.get(f"/api/v1/tests/content/{content['content_id']}")
+    assert response.status_code == 200
+    assert response.json()["content"] == content["content"]
+
+
+def test_out_of_range_content_ids_are_rejected(client):
+    fingerprint = client.get("/api/v1/tests/content", params={"mode": "words"}).json()["content_id"].split(".")[1]
+    valid = f"v1.{fingerprint}.1.100.99.words.easy.25"
+    assert client.get(f"/api/v1/tests/content/{valid}").status_code == 200
+    for content_id in (
+        f"v1.{fingerprint}.1.200000.0.words.hard.1000",  # n beyond MAX_BATCH_CONTENT
+        f"v1.{fingerprint}.1.101.0.words.easy.25",
+        f"v1.{fingerprint}.1.0.0.words.easy.25",
+        f"v1.{fingerprint}.1.5.5.words.easy.25",
+        f"v1.{fingerprint}.10000000000000000.1.0.words.easy.25",  # seed beyond 64 bits
+        f"v1.{fingerprint}.-1.1.0.words.easy.25",
+        f"v1.{fingerprint}.1.+1.0.words.easy.25",
+        f"v1.{fingerprint}.1.1.0.words.easy.-3",
+        f"v1.{fingerprint}.1.1.0.words.easy.0",
+        f"v1.{fingerprint}.1.1.0.words.easy.1000000",
+        f"v1.{fingerprint}.1.1.0.words.easy.1_0",
+        f"v1.{fingerprint}.1.1.0.sentences.-.{'9' * 5000}",
+        "v1.0000000000000000.1.1.0.words.easy.25",
+    ):
+        assert client.get(f"/api/v1/tests/content/{content_id}").status_code == 404, content_id
+
+
+def test_render_cache_does_not_keep_unloaded_languages(client, monkeypatch):
+    for language, seed in (("aa", 1), ("bb", 2)):
+        build_text_snapshot(
+            language_registry.snapshot_path(language), [corpus_text(seed)], language,
+            easy_count=200, medium_count=400, hard_count=400
+        )
+    monkeypatch.setattr(language_registry, "max_loaded", 1)
+    content = client.get("/api/v1/tests/content", params={"mode": "words", "language": "aa"}).json()
+    assert client.get(f"/api/v1/tests/content/{content['content_id']}").status_code == 200
+    handler = weakref.ref(language_registry.get_handler("aa"))
+
+    language_registry.get_handler("bb")  # Unloads "aa"
+    gc.collect()
+    assert handler() is None
+    # Served again by a newly loaded handler
+    response = client.get(f"/api/v1/tests/content/{content['content_id']}")
+    assert response.json()["content"] == content["content"]
+
+
+def test_adaptive_content_has_its_own_authenticated_route(client, auth_headers):
+    response = client.get("/api/v1/tests/content", params={"mode": "adaptive"}, headers=auth_headers)
+    assert response.status_code == 400
+    assert "/tests/content/adaptive" in response.json()["detail"]
+    assert client.get("/api/v1/tests/content/adaptive").status_code == 401
+    adaptive = client.get("/api/v1/tests/content/adaptive", params={"count": 10}, headers=auth_headers)
+    assert adaptive.status_code == 200
+    assert len(adaptive.json()["content"].split()) == 10
+    # the shared route ignores credentials entirely, even invalid ones
+    bogus = {"Authorization": "Bearer not-a-token"}
+    assert client.get("/api/v1/tests/content", params={"mode": "words"}, headers=bogus).status_code == 200
+
+
+@pytest.mark.parametrize("path", ["/api/v1/tests/content/pool", "/memory"])
+def test_operational_stats_require_admin(client, auth_headers, path):
+    assert client.get(path).status_code == 401
+    assert client.get(path, headers=auth_headers).status_code == 200  # First user is a superuser
+    other = client.post(
+        "/api/v1/users/register", json={"email": "other@example.com", "username": "other", "password": "password123"}
+    ).json()["access_token"]
+    assert client.get(path, headers={"Authorization": f"Bearer {other}"}).status_code == 403
@@ -0,0 +1,53 @@
+import pytest
+from alembic.migration import MigrationContext
+from alembic.operations import Operations
+
+from app.api.v1.endpoints.tests import models
+from app.db.session import engine
+from conftest import assert_matches_rebuild, char_logs, create_test, load_migration
+
+
+def _heatmap(client, headers):
+    return client.get("/api/v1/tests/me/heatmap", headers=headers).json()
+
+
+def test_char_stats_on_insert(client, auth_headers, history):
+    heatmap = _heatmap(client, auth_headers)
+    assert heatmap["chars"] == ["a", "b", "c", "e", "q"]
+    assert heatmap["attempts"][:3] == [20, 4, 3]
+    assert heatmap["errors"][:3] == [5, 1, 1]
+    assert heatmap["total_time"][:3] == [4000, 800, 900]
+    # Tests from January have all but decayed next to one taken now
+    create_test(client, auth_headers, char_logs=char_logs(a=(10, 0, 1000)))
+    heatmap = _heatmap(client, auth_headers)
+    assert heatmap["attempts"][0] == 30
+    assert heatmap["recent_attempts"][0] == pytest.approx(10, abs=0.01)
+
+
+def test_delete_corrects_char_stats(client, auth_headers, history, db):
+    assert client.delete(f"/api/v1/tests/me/typing/{history['wed']}", headers=auth_headers).status_code == 204
+    heatmap = _heatmap(client, auth_headers)
+    assert "b" not in heatmap["chars"]
+    assert heatmap["attempts"][heatmap["chars"].index("a")] == 10
+    assert_matches_rebuild(db, models.UserCharStats)
+
+    for test_id in history.values():
+        client.delete(f"/api/v1/tests/me/typing/{test_id}", headers=auth_headers)
+    assert _heatmap(client, auth_headers)["chars"] == []
+    assert db.query(models.UserCharStats).count() == 0
+
+
+def test_migration_backfills_char_stats(client, auth_headers, history, db):
+    expected = {(row.user_id, row.char): row for row in db.query(models.UserCharStats)}
+    db.close()
+    models.UserCharStats.__table__.drop(engine)
+    migration = load_migration("e4b7a2c9d051_add_user_char_stats.py")
+    with engine.begin() as connection, Operations.context(MigrationContext.configure(connection)):
+        migration.upgrade()
+    backfilled = {(row.user_id, row.char): row for row in db.query(models.UserCharStats)}
+    assert backfilled.keys() == expected.keys()
+    for key, row in backfilled.items():
+        for column in ("attempts", "errors", "total_time"):
+            assert getattr(row, column) == getattr(expected[key], column)
+        for column in ("recent_attempts", "recent_errors", "recent_total_time"):
+            assert getattr(row, column) == pytest.approx(getattr(expected[key], column), rel=1e-9)
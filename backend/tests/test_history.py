@@ -0,0 +1,69 @@
+from app.core.config import settings
+from conftest import sample_test
+
+
+def _submit(client, headers, timestamps):
+    response = client.post(
+        "/api/v1/tests/me/typing/batch", json=[sample_test(timestamp=t) for t in timestamps], headers=headers
+    )
+    assert [item["status"] for item in response.json()] == ["created"] * len(timestamps)
+    return [item["test"]["id"] for item in response.json()]
+
+
+def _pages(client, headers, limit, **params):
+    pages, cursor = [], None
+    while True:
+        query = {"limit": limit, **params, **({"before": cursor} if cursor else {})}
+        response = client.get("/api/v1/tests/me/typing", params=query, headers=headers)
+        assert response.status_code == 200, response.text
+        pages.append([test["id"] for test in response.json()])
+        cursor = response.headers.get("X-Next-Cursor")
+        if cursor is None:
+            return pages
+
+
+def test_pages_split_equal_timestamps(client, auth_headers):
+    same = "2026-03-01T12:00:00Z"
+    ids = _submit(client, auth_headers, ["2026-03-02T00:00:00Z"] + [same] * 7 + ["2026-02-28T00:00:00Z"])
+    expected = [ids[0]] + sorted(ids[1:8], reverse=True) + [ids[8]]
+    for limit in (1, 2, 3, 4, 9, 10):
+        pages = _pages(client, auth_headers, limit)
+        assert [test_id for page in pages for test_id in page] == expected
+        assert all(len(page) == limit for page in pages[:-1])
+    assert _pages(client, auth_headers, 9) == [expected]
+
+
+def test_new_tests_do_not_shift_pages(client, auth_headers):
+    _submit(client, auth_headers, [f"2026-03-01T12:00:0{i}Z" for i in range(6)])
+    first = client.get("/api/v1/tests/me/typing", params={"limit": 3}, headers=auth_headers)
+    _submit(client, auth_headers, ["2026-04-01T00:00:00Z"])
+    second = client.get(
+        "/api/v1/tests/me/typing", params={"limit": 3, "before": first.headers["X-Next-Cursor"]}, headers=auth_headers
+    )
+    assert [test["timestamp"] for test in second.json()] == [f"2026-03-01T12:00:0{i}" for i in (2, 1, 0)]
+    assert "X-Next-Cursor" not in second.headers
+
+
+def test_summaries_and_char_logs(client, auth_headers):
+    test_id = _submit(client, auth_headers, ["2026-03-01T12:00:00Z"])[0]
+    summary = client.get("/api/v1/tests/me/typing", headers=auth_headers).json()[0]
+    assert "char_logs" not in summary
+    full = client.get("/api/v1/tests/me/typing", params={"include": "char_logs"}, headers=auth_headers).json()[0]
+    assert [log["id"] for log in full["char_logs"]] == [f"{test_id}-0", f"{test_id}-1"]
+
+
+def test_bad_cursor_and_include(client, auth_headers):
+    assert client.get("/api/v1/tests/me/typing", params={"before": "zzz"}, headers=auth_headers).status_code == 400
+    assert client.get("/api/v1/tests/me/typing", params={"include": "x"}, headers=auth_headers).status_code == 400
+    assert client.get("/api/v1/tests/me/typing", params={"limit": 0}, headers=auth_headers).status_code == 422
+
+
+
+def test_history_is_paged_by_default(client, auth_headers):
+    page_size = settings.TEST_HISTORY_PAGE_SIZE
+    _submit(client, auth_headers, [f"2026-03-01T12:{i // 60:02}:{i % 60:02}Z" for i in range(page_size + 1)])
+    first = client.get("/api/v1/tests/me/typing", headers=auth_headers)
+    assert len(first.json()) == page_size
+    second = client.get("/api/v1/tests/me/typing", params={"before": first.headers["X-Next-Cursor"]}, headers=auth_headers)
+    assert [test["timestamp"] for test in second.json()] == ["2026-03-01T12:00:00"]
+    assert "X-Next-Cursor" not in second.headers
@@ -0,0 +1,196 @@
+import glob
+import json
+import os
+import threading
+import time
+
+import pytest
+from sqlalchemy.exc import DataError, OperationalError
+
+from app.api.v1.endpoints.tests import router, schemas
+from app.api.v1.endpoints.tests.ingest import IngestQueue, fcntl
+from app.api.v1.endpoints.tests.repository import UserTestRepository
+from app.db.session import SessionLocal
+from conftest import create_test, sample_test
+
+
+@pytest.fixture
+def queue(tmp_path):
+    queue = IngestQueue(SessionLocal, spill_dir=str(tmp_path), batch_size=10, flush_interval=0.01, retry_interval=0.01)
+    yield queue
+    queue.stop(timeout=5)
+
+
+def _wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.01)
+
+
+def _unpackable_test():
+    test = schemas.UserTestCreate.model_validate(sample_test())
+    test.char_logs[0].char = "x" * 300  # Past the schema, as if validated by an older release
+    return test
+
+
+def _failing_inserts(monkeypatch, error_for):
+    """Make insert_tests raise error_for(entries) whenever that returns an exception."""
+    insert_tests = UserTestRepository.insert_tests
+
+    def insert(repository, entries):
+        error = error_for(entries)
+        if error is not None:
+            raise error
+        return insert_tests(repository, entries)
+    monkeypatch.setattr(UserTestRepository, "insert_tests", insert)
+
+
+def test_writer_drops_rejected_entries_and_keeps_running(queue, user_id, db, monkeypatch):
+    bad_id = "01900000-0000-7000-8000-00000000000b"
+    _failing_inserts(monkeypatch, lambda entries: (
+        DataError("INSERT", {}, Exception("value too long")) if bad_id in [entry[0] for entry in entries] else None
+    ))
+    queue.start()
+    queue.submit(user_id, schemas.UserTestCreate.model_validate(sample_test(id=bad_id)))
+    good_id = queue.submit(user_id, schemas.UserTestCreate.model_validate(sample_test()))
+    _wait_for(lambda: queue.flushed == 2)
+    stats = queue.stats()
+    assert (stats["running"], stats["dropped"], stats["failures"]) == (True, 1, 0)
+    assert UserTestRepository(db).get_existing_test_ids([bad_id, good_id]) == {good_id}
+
+
+def test_writer_retries_other_failures(queue, user_id, db, monkeypatch):
+    failures = [RuntimeError("bug"), OperationalError("INSERT", {}, Exception("database is down"))]
+    _failing_inserts(monkeypatch, lambda entries: failures.pop(0) if failures else None)
+    queue.start()
+    test_id = queue.submit(user_id, schemas.UserTestCreate.model_validate(sample_test()))
+    _wait_for(lambda: queue.flushed == 1)
+    stats = queue.stats()
+    assert (stats["running"], stats["dropped"], stats["failures"]) == (True, 0, 2)
+    assert UserTestRepository(db).get_existing_test_ids([test_id]) == {test_id}
+
+
+def test_failed_writes_stay_journaled(queue, user_id, monkeypatch):
+    _failing_inserts(monkeypatch, lambda entries: RuntimeError("bug"))
+    queue.start()
+    queue.submit(user_id, schemas.UserTestCreate.model_validate(sample_test()))
+    journal_path = queue._journal_path
+    _wait_for(lambda: queue.failures > 0)
+    queue.stop(timeout=5)
+    assert (queue.dropped, queue.flushed) == (0, 0)
+    with open(journal_path) as journal:
+        assert len(journal.readlines()) == 1
+
+
+def test_journal_is_compacted_after_each_flush(tmp_path, user_id, monkeypatch):
+    queue = IngestQueue(SessionLocal, spill_dir=str(tmp_path), batch_size=2, flush_interval=0.01)
+    release = threading.Event()
+    write = queue._write
+    monkeypatch.setattr(queue, "_write", lambda entries: release.wait() and write(entries))
+    journal_lines = []
+    compact = queue._compact_journal
+
+    def compact_and_count():
+        compact()
+        with open(queue._journal_path, "rb") as journal:
+            journal_lines.append((len(journal.readlines()), len(queue._pending)))
+    monkeypatch.setattr(queue, "_compact_journal", compact_and_count)
+    queue.start()
+    for _ in range(5):
+        queue.submit(user_id, schemas.UserTestCreate.model_validate(sample_test()))
+    release.set()
+    _wait_for(lambda: queue.flushed == 5)
+    queue.stop(timeout=5)
+    assert journal_lines[0] == (3, 3)
+    assert journal_lines[-1] == (0, 0)
+    assert all(lines == pending for lines, pending in journal_lines)
+
+
+@pytest.mark.skipif(fcntl is None, reason="journals are locked with flock")
+def test_new_journals_are_never_replayed(queue, tmp_path):
+    queue.start()
+    with open(queue._journal_path, "rb") as journal:
+        with pytest.raises(OSError):
+            fcntl.flock(journal, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    other = IngestQueue(SessionLocal, spill_dir=str(tmp_path))
+    other.start()
+    other.stop(timeout=5)  # Its writer replays journals before it stops
+    assert os.path.exists(queue._journal_path)
+    assert glob.glob(str(tmp_path / "*.tmp")) == []
+
+
+def test_replay_skips_bad_entries(queue, user_id, db, tmp_path):
+    good = schemas.UserTestCreate.model_validate(sample_test())
+    lines = [
+        {"id": "01900000-0000-7000-8000-000000000001", "user_id": user_id, "test": _unpackable_test().model_dump(mode="json")},
+        {"id": "01900000-0000-7000-8000-000000000002", "user_id": user_id, "test": good.model_dump(mode="json")},
+    ]
+    (tmp_path / "tests-1-dead.jsonl").write_text("".join(json.dumps(line) + "\n" for line in lines))
+    queue.start()
+    _wait_for(lambda: not os.path.exists(tmp_path / "tests-1-dead.jsonl"))
+    assert queue.running
+    assert UserTestRepository(db).get_existing_test_ids([line["id"] for line in lines]) == {lines[1]["id"]}
+
+
+def test_replay_keeps_entries_of_removed_languages(queue, user_id, db, tmp_path):
+    line = {"id": "01900000-0000-7000-8000-000000000001", "user_id": user_id, "test": sample_test(language="klingon")}
+    (tmp_path / "tests-1-dead.jsonl").write_text(json.dumps(line) + "\n")
+    queue.start()
+    _wait_for(lambda: not os.path.exists(tmp_path / "tests-1-dead.jsonl"))
+    assert UserTestRepository(db).get_existing_test_ids([line["id"]]) == {line["id"]}
+
+
+def test_stop_keeps_journal_of_busy_writer(queue, user_id, monkeypatch):
+    release = threading.Event()
+    write = queue._write
+    monkeypatch.setattr(queue, "_write", lambda entries: release.wait() and write(entries))
+    queue.start()
+    queue.submit(user_id, schemas.UserTestCreate.model_validate(sample_test()))
+    journal_path = queue._journal_path
+    queue.stop(timeout=0.05)
+    assert not queue.running
+    assert not queue._journal.closed and os.path.getsize(journal_path) > 0
+
+    release.set()
+    queue.stop(timeout=5)
+    assert queue.flushed == 1
+    assert not os.path.exists(journal_path)
+
+
+def test_ingest_stats_require_admin(client, auth_headers):
+    assert client.get("/api/v1/tests/ingest").status_code == 401
+    assert client.get("/api/v1/tests/ingest", headers=auth_headers).status_code == 200  # First user is a superuser
+    other = client.post(
+        "/api/v1/users/register", json={"email": "other@example.com", "username": "other", "password": "password123"}
+    ).json()["access_token"]
+    assert client.get("/api/v1/tests/ingest", headers={"Authorization": f"Bearer {other}"}).status_code == 403
+
+
+@pytest.fixture
+def write_behind(queue, monkeypatch):
+    queue.start()
+    monkeypatch.setattr(router, "ingest_queue", queue)
+    return queue
+
+
+def test_queued_submissions_check_the_id_first(client, auth_headers, write_behind):
+    body = sample_test(id="01900000-0000-7000-8000-000000000002")
+    assert client.post("/api/v1/tests/me/typing", json=body, headers=auth_headers).status_code == 202
+    _wait_for(lambda: client.get("/api/v1/tests/me/typing", headers=auth_headers).json())
+    replayed = client.post("/api/v1/tests/me/typing", json=body, headers=auth_headers)
+    assert replayed.status_code == 201
+    assert replayed.headers["Idempotent-Replayed"] == "true"
+    other = client.post(
+        "/api/v1/users/register", json={"email": "other@example.com", "username": "other", "password": "password123"}
+    ).json()["access_token"]
+    taken = client.post("/api/v1/tests/me/typing", json=body, headers={"Authorization": f"Bearer {other}"})
+    assert taken.status_code == 409
+    assert write_behind.stats()["accepted"] == 1
+
+
+def test_stopped_queue_falls_back_to_a_direct_insert(client, auth_headers, write_behind, monkeypatch):
+    def stopped(user_id, test):
+        raise RuntimeError("The ingestion queue is not running")
+    monkeypatch.setattr(write_behind, "submit", stopped)
+    assert create_test(client, auth_headers)
@@ -0,0 +1,99 @@
+import base64
+import zlib
+
+import numpy as np
+import pytest
+
+from app.api.v1.endpoints.tests.codec import (
+    MAX_KEYSTROKE_KEYS, CodecError, decode_keystrokes, encode_keystrokes, keystroke_char_logs
+)
+from conftest import sample_test
+
+
+def test_keystrokes_round_trip():
+    keys = list("hello world") + ["é"]
+    deltas = [0, 120, 0xFFFE, 0xFFFF, 0x10000, 0xFFFFFFFF, 5, 5, 5, 5, 5, 5]
+    correct = [True, False] * 6
+    stream = decode_keystrokes(encode_keystrokes(keys, deltas, correct), max_events=len(keys))
+    assert [stream.keys[i] for i in stream.key_index.tolist()] == keys
+    assert stream.delta_ms.tolist() == deltas
+    assert stream.correct.tolist() == correct
+
+
+def test_keystroke_char_logs():
+    stream = decode_keystrokes(encode_keystrokes(list("aab"), [0, 100, 50], [True, False, True]), 10)
+    assert keystroke_char_logs(stream) == [("a", 2, 1, 100), ("b", 1, 0, 50)]
+
+
+def test_keystrokes_encode_limits():
+    with pytest.raises(ValueError):
+        encode_keystrokes(["a"], [1, 2], [True])
+    with pytest.raises(ValueError):
+        encode_keystrokes([chr(0x4E00 + i) for i in range(MAX_KEYSTROKE_KEYS + 1)], [1] * 257, [True] * 257)
+    with pytest.raises(ValueError):
+        encode_keystrokes(["a"], [-1], [True])
+    with pytest.raises(ValueError):
+        encode_keystrokes(["a"], [0x100000000], [True])
+
+
+def test_keystrokes_decode_limits():
+    blob = encode_keystrokes(["a"] * 100, [100] * 100, [True] * 100)
+    assert len(decode_keystrokes(blob, 100).delta_ms) == 100
+    with pytest.raises(CodecError):
+        decode_keystrokes(blob, 99)
+    with pytest.raises(CodecError):
+        decode_keystrokes(b"not zlib", 100)
+    with pytest.raises(CodecError):
+        decode_keystrokes(blob[:-4], 100)
+    with pytest.raises(CodecError):
+        decode_keystrokes(blob + zlib.compress(b"x"), 100)
+    # A small blob that inflates far beyond what 100 events can take
+    with pytest.raises(CodecError):
+        decode_keystrokes(zlib.compress(b"\x01" + bytes(10_000_000)), 100)
+
+
+def test_keystrokes_corrupt_body():
+    raw = zlib.decompress(encode_keystrokes(list("ab"), [0, 1], [True, True]))
+    with pytest.raises(CodecError):
+        decode_keystrokes(zlib.compress(raw + b"\x00"), 10)
+    with pytest.raises(CodecError):
+        decode_keystrokes(zlib.compress(b"\x02" + raw[1:]), 10)
+    bad_index = bytearray(raw)
+    bad_index[-7] = 5  # First key index, past the two-key table
+    with pytest.raises(CodecError):
+        decode_keystrokes(zlib.compress(bytes(bad_index)), 10)
+    assert np.array_equal(decode_keystrokes(zlib.compress(raw), 10).key_index, [0, 1])
+
+
+def _stream(events=200):
+    keys = list("the quick brown fox jumps over the lazy dog ") * (events // 44 + 1)
+    return keys[:events], [90 + i % 40 for i in range(events)], [i % 17 != 0 for i in range(events)]
+
+
+def _submit(client, headers, blob, **fields):
+    body = sample_test(keystrokes=base64.b64encode(blob).decode(), **fields)
+    body.pop("char_logs")
+    return client.post("/api/v1/tests/me/typing", json=body, headers=headers)
+
+
+def test_keystrokes_are_stored_and_decoded(client, auth_headers):
+    keys, deltas, correct = _stream()
+    blob = encode_keystrokes(keys, deltas, correct)
+    created = _submit(client, auth_headers, blob)
+    assert created.status_code == 201, created.text
+    expected_logs = keystroke_char_logs(decode_keystrokes(blob, len(keys)))
+    assert [(log["char"], log["attempts"], log["errors"], log["total_time"]) for log in created.json()["char_logs"]] == [
+        tuple(log) for log in expected_logs
+    ]
+    stored = client.get(f"/api/v1/tests/me/typing/{created.json()['id']}/keystrokes", headers=auth_headers).json()
+    assert (stored["keys"], stored["delta_ms"], stored["correct"]) == (keys, deltas, correct)
+
+    plain = client.post("/api/v1/tests/me/typing", json=sample_test(), headers=auth_headers).json()
+    assert client.get(f"/api/v1/tests/me/typing/{plain['id']}/keystrokes", headers=auth_headers).status_code == 404
+
+
+def test_keystrokes_over_budget_or_corrupt_are_422(client, auth_headers):
+    keys, deltas, correct = _stream(5000)
+    uncompressed = zlib.compress(zlib.decompress(encode_keystrokes(keys, deltas, correct)), 0)
+    assert _submit(client, auth_headers, uncompressed).status_code == 422
+    assert _submit(client, auth_headers, b"not a keystroke stream").status_code == 422
@@ -0,0 +1,40 @@
+import pytest
+
+from app.api.v1.endpoints.tests import models
+from conftest import assert_matches_rebuild
+
+
+def _progress(client, headers, **params):
+    return client.get("/api/v1/tests/me/progress", params=params, headers=headers).json()
+
+
+def test_rollups_on_insert(client, auth_headers, history):
+    days = _progress(client, auth_headers, duration=30)
+    # 23:30 at UTC-2 is the next day in UTC
+    assert [(d["bucket_start"], d["test_count"]) for d in days] == [
+        ("2026-01-05", 1), ("2026-01-07", 1), ("2026-01-08", 1), ("2026-01-12", 1)
+    ]
+    weeks = _progress(client, auth_headers, granularity="week")
+    assert [(w["bucket_start"], w["duration"], w["test_count"], w["best_wpm"]) for w in weeks] == [
+        ("2026-01-05", 30, 3, 90), ("2026-01-12", 30, 1, 60), ("2026-01-12", 60, 1, 40)
+    ]
+    assert weeks[0]["avg_wpm"] == pytest.approx(70)
+    ranged = _progress(client, auth_headers, **{"granularity": "week", "from": "2026-01-11", "to": "2026-01-11"})
+    assert [w["bucket_start"] for w in ranged] == ["2026-01-05"]
+
+
+def test_delete_corrects_rollups(client, auth_headers, history, db):
+    assert client.delete(f"/api/v1/tests/me/typing/{history['wed']}", headers=auth_headers).status_code == 204
+    weeks = _progress(client, auth_headers, granularity="week", duration=30)
+    assert [(w["test_count"], w["best_wpm"]) for w in weeks] == [(2, 70), (1, 60)]  # Best recomputed
+    assert "2026-01-07" not in [d["bucket_start"] for d in _progress(client, auth_headers, duration=30)]
+    assert_matches_rebuild(db, models.UserTestRollup)
+
+    for test_id in history.values():
+        client.delete(f"/api/v1/tests/me/typing/{test_id}", headers=auth_headers)
+    assert _progress(client, auth_headers) == []
+    assert db.query(models.UserTestRollup).count() == 0
+
+
+def test_invalid_granularity(client, auth_headers):
+    assert client.get("/api/v1/tests/me/progress", params={"granularity": "month"}, headers=auth_headers).status_code == 400
@@ -0,0 +1,89 @@
+import math
+
+import pytest
+
+from app.api.v1.endpoints.tests import models
+from app.api.v1.endpoints.tests.repository import UserTestRepository
+from conftest import sample_test
+
+
+def _snapshot(db):
+    """Every aggregate row, ordered by key."""
+    def rows(model, columns):
+        return sorted(
+            (tuple(getattr(r, c) for c in columns) for r in db.query(model)), key=lambda row: [str(v) for v in row]
+        )
+    return (
+        rows(models.UserStats, [c.name for c in models.UserStats.__table__.columns]),
+        rows(models.UserTestRollup, [c.name for c in models.UserTestRollup.__table__.columns]),
+        rows(models.UserCharStats, [c.name for c in models.UserCharStats.__table__.columns]),
+    )
+
+
+def _stats(client, headers, **params):
+    return client.get("/api/v1/users/me/stats", params=params, headers=headers).json()
+
+
+def test_stats_on_insert(client, auth_headers, history):
+    stats = _stats(client, auth_headers, duration=30)[0]
+    wpms = [50, 90, 70, 60]
+    mean = sum(wpms) / 4
+    assert stats["test_count"] == 4
+    assert stats["avg_wpm"] == pytest.approx(mean)
+    assert stats["wpm_stddev"] == pytest.approx(math.sqrt(sum((w - mean) ** 2 for w in wpms) / 4))
+    assert stats["best_wpm"] == 90
+    assert stats["last_test_at"] == "2026-01-12T08:00:00"
+    assert [s["duration"] for s in _stats(client, auth_headers)] == [30, 60]
+
+
+def test_replay_is_not_counted(client, auth_headers):
+    body = sample_test(id="01900000-0000-7000-8000-000000000001")
+    for _ in range(2):
+        client.post("/api/v1/tests/me/typing", json=body, headers=auth_headers)
+    client.post("/api/v1/tests/me/typing/batch", json=[body], headers=auth_headers)
+    assert _stats(client, auth_headers)[0]["test_count"] == 1
+
+
+def test_delete_corrects_every_aggregate(client, auth_headers, history, db):
+    headers = auth_headers
+    assert client.delete(f"/api/v1/tests/me/typing/{history['wed']}", headers=headers).status_code == 204
+    assert client.delete(f"/api/v1/tests/me/typing/{history['wed']}", headers=headers).status_code == 404
+
+    stats = _stats(client, headers, duration=30)[0]
+    assert (stats["test_count"], stats["best_wpm"]) == (3, 70)  # Best recomputed without the deleted test
+    assert stats["avg_wpm"] == pytest.approx(60)
+
+    # The incremental state matches a rebuild from user_tests
+    incremental = _snapshot(db)
+    UserTestRepository(db).rebuild_stats()
+    db.commit()
+    rebuilt = _snapshot(db)
+    for table, expected in zip(rebuilt, incremental):
+        assert [row[:2] for row in table] == [row[:2] for row in expected]
+        for row, expected_row in zip(table, expected):
+            for value, expected_value in zip(row, expected_row):
+                assert value == (pytest.approx(expected_value, rel=1e-9) if isinstance(value, float) else expected_value)
+
+
+def test_delete_last_tests_removes_rows(client, auth_headers, history, db):
+    for test_id in history.values():
+        assert client.delete(f"/api/v1/tests/me/typing/{test_id}", headers=auth_headers).status_code == 204
+    assert _stats(client, auth_headers) == []
+    assert _snapshot(db)[:2] == ([], [])
+
+
+def test_delete_other_users_test(client, auth_headers, history):
+    other = client.post(
+        "/api/v1/users/register", json={"email": "other@example.com", "username": "other", "password": "password123"}
+    ).json()["access_token"]
+    response = client.delete(f"/api/v1/tests/me/typing/{history['mon']}", headers={"Authorization": f"Bearer {other}"})
+    assert response.status_code == 404
+    assert _stats(client, auth_headers, duration=30)[0]["test_count"] == 4
+
+
+def test_recompute_metrics_rebuilds_stats(client, auth_headers, history, db):
+    rows = [dict(test_id=history["wed"], wpm=10.0, raw_wpm=20.0, accuracy=50.0, consistency=50.0)]
+    UserTestRepository(db).update_metrics(rows)
+    stats = _stats(client, auth_headers, duration=30)[0]
+    assert stats["best_wpm"] == 70
+    assert stats["avg_wpm"] == pytest.approx((50 + 10 + 70 + 60) / 4)
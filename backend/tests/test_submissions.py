@@ -0,0 +1,74 @@
+import pytest
+
+from app.api.v1.endpoints.tests.codec import MAX_CHAR_LOGS
+from app.api.v1.endpoints.tests.repository import UserTestRepository
+from conftest import sample_test
+
+
+def _log(char="a", **fields):
+    return {"char": char, "attempts": 1, "errors": 0, "total_time": 100, **fields}
+
+
+@pytest.mark.parametrize("char_logs", [
+    [_log("x" * 300)],
+    [_log("é" * 17)],  # 34 bytes
+    [_log("")],
+    [_log(attempts=2**32)],
+    [_log(total_time=2**32)],
+    [_log()] * (MAX_CHAR_LOGS + 1),
+])
+def test_unpackable_char_logs_are_422(client, auth_headers, char_logs):
+    response = client.post("/api/v1/tests/me/typing", json=sample_test(char_logs=char_logs), headers=auth_headers)
+    assert response.status_code == 422
+
+
+def test_key_names_are_accepted(client, auth_headers):
+    char_logs = [_log("Backspace"), _log("é"), _log("x" * 32)]
+    response = client.post("/api/v1/tests/me/typing", json=sample_test(char_logs=char_logs), headers=auth_headers)
+    assert response.status_code == 201
+    assert [log["char"] for log in response.json()["char_logs"]] == ["Backspace", "é", "x" * 32]
+
+
+def test_batch_reports_unpackable_items_individually(client, auth_headers):
+    batch = [sample_test(), sample_test(char_logs=[_log("x" * 300)]), sample_test(wpm=-1), sample_test()]
+    response = client.post("/api/v1/tests/me/typing/batch", json=batch, headers=auth_headers)
+    assert response.status_code == 200
+    items = response.json()
+    assert [item["status"] for item in items] == ["created", "invalid", "invalid", "created"]
+    assert items[1]["error"].startswith("char_logs.0.char:")
+    assert items[2]["error"].startswith("wpm:")
+    history = client.get("/api/v1/tests/me/typing", headers=auth_headers).json()
+    assert sorted(test["id"] for test in history) == sorted([items[0]["test"]["id"], items[3]["test"]["id"]])
+    assert client.get("/api/v1/users/me/stats", headers=auth_headers).json()[0]["test_count"] == 2
+
+
+def test_timestamps_are_returned_as_stored(client, auth_headers):
+    body = sample_test(id="01900000-0000-7000-8000-000000000001", timestamp="2026-01-07T23:30:00-02:00")
+    created = client.post("/api/v1/tests/me/typing", json=body, headers=auth_headers)
+    replayed = client.post("/api/v1/tests/me/typing", json=body, headers=auth_headers)
+    batch = client.post(
+        "/api/v1/tests/me/typing/batch", json=[sample_test(timestamp="2026-01-07T23:30:00+01:00")], headers=auth_headers
+    )
+    history = client.get("/api/v1/tests/me/typing", headers=auth_headers).json()
+    assert created.json()["timestamp"] == replayed.json()["timestamp"] == "2026-01-08T01:30:00"
+    assert batch.json()[0]["test"]["timestamp"] == "2026-01-07T22:30:00"
+    assert [test["timestamp"] for test in history] == ["2026-01-08T01:30:00", "2026-01-07T22:30:00"]
+
+
+def test_conflict_with_a_deleted_test_is_409(client, auth_headers, monkeypatch):
+    # The insert hit an existing id, which was deleted before it could be read back
+    monkeypatch.setattr(UserTestRepository, "create_test", lambda repository, user_id, test: None)
+    body = sample_test(id="01900000-0000-7000-8000-000000000003")
+    response = client.post("/api/v1/tests/me/typing", json=body, headers=auth_headers)
+    assert response.status_code == 409
+    assert "deleted" in response.json()["detail"]
+
+
+def test_unknown_languages_are_422(client, auth_headers):
+    response = client.post("/api/v1/tests/me/typing", json=sample_test(language="klingon"), headers=auth_headers)
+    assert response.status_code == 422
+    assert "Unsupported language 'klingon'" in response.text
+    batch = client.post("/api/v1/tests/me/typing/batch", json=[sample_test(language="klingon")], headers=auth_headers)
+    assert batch.json()[0]["error"].startswith("language:")
+    created = client.post("/api/v1/tests/me/typing", json=sample_test(language="English"), headers=auth_headers)
+    assert created.json()["language"] == "english"